@@ -0,0 +1,4 @@
+"""
+基准测试包
+corpus生成可复现的合成Markdown语料，harness对各转换阶段计时并记录峰值内存
+"""
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+简繁转换后端基准测试
+比较opencc与预编译词典后端的初始化耗时和转换耗时，并校验两者输出完全一致
+
+用法:
+    python benchmarks/bench_chinese_backends.py [目录或文件 ...] [--conversion s2t] [--repeat 3]
+"""
+
+import os
+import sys
+import glob
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules import chinese_converter
+from src.modules.chinese_converter import create_chinese_converter, BACKEND_OPENCC, BACKEND_COMPILED
+
+def load_corpus(paths):
+    """
+    /**
+     * 读取基准语料
+     *
+     * @param {List[str]} paths - Markdown/HTML文件或目录列表
+     * @returns {List[str]} 文本列表
+     */
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for pattern in ('*.md', '*.html'):
+                files.extend(glob.glob(os.path.join(path, '**', pattern), recursive=True))
+        elif os.path.isfile(path):
+            files.append(path)
+    texts = []
+    for file_path in sorted(set(files)):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            texts.append(f.read())
+    return texts
+
+def time_call(func, repeat):
+    """
+    /**
+     * 多次执行并返回最短耗时
+     *
+     * @param {Callable} func - 被测函数
+     * @param {int} repeat - 重复次数
+     * @returns {Tuple[float, Any]} 最短耗时（秒）和最后一次的返回值
+     */
+    """
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def create_uncached(conversion, backend, cache_dir):
+    """
+    /**
+     * 创建转换后端，清空进程内词典缓存以测量从磁盘加载的耗时
+     */
+    """
+    chinese_converter._loaded_tables.clear()
+    return create_chinese_converter(conversion, backend, cache_dir)
+
+def main():
+    root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description='简繁转换后端基准测试')
+    parser.add_argument('paths', nargs='*', default=[os.path.join(root_dir, 'md')], help='语料文件或目录，默认为md目录')
+    parser.add_argument('--conversion', default='s2t', help='OpenCC转换配置名，默认s2t')
+    parser.add_argument('--repeat', type=int, default=3, help='每项测试的重复次数')
+    args = parser.parse_args()
+
+    texts = load_corpus(args.paths)
+    if not texts:
+        print('没有找到语料文件')
+        return 1
+    total_chars = sum(len(text) for text in texts)
+    print(f"语料: {len(texts)} 个文件, {total_chars} 个字符, 转换配置: {args.conversion}")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # 首次编译词典（冷缓存）
+        start = time.perf_counter()
+        create_uncached(args.conversion, BACKEND_COMPILED, cache_dir)
+        compile_time = time.perf_counter() - start
+
+        init_times = {}
+        outputs = {}
+        convert_times = {}
+        for backend in (BACKEND_OPENCC, BACKEND_COMPILED):
+            init_times[backend], converter = time_call(
+                lambda: create_uncached(args.conversion, backend, cache_dir), args.repeat)
+            convert_times[backend], outputs[backend] = time_call(
+                lambda: [converter.convert(text) for text in texts], args.repeat)
+
+    print(f"预编译词典首次编译: {compile_time * 1000:.1f} ms")
+    print(f"{'后端':<10}{'初始化(ms)':>12}{'转换(ms)':>12}{'字符/秒':>14}")
+    for backend in (BACKEND_OPENCC, BACKEND_COMPILED):
+        rate = total_chars / convert_times[backend] if convert_times[backend] else 0
+        print(f"{backend:<10}{init_times[backend] * 1000:>12.1f}{convert_times[backend] * 1000:>12.1f}{rate:>14.0f}")
+
+    mismatches = [i for i, (a, b) in enumerate(zip(outputs[BACKEND_OPENCC], outputs[BACKEND_COMPILED])) if a != b]
+    if mismatches:
+        print(f"输出不一致: {len(mismatches)} 个文件")
+        return 1
+    print('两个后端输出完全一致')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
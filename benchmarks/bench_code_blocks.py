@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+超长代码块基准测试
+生成1000、10000、100000行的代码块，比较代码块处理器逐行add_run并设置字体属性的写法与
+从run模板批量构建的写法的耗时，检查两种写法生成的XML相同，并测量按页拆分单元格时的耗时
+
+用法:
+    python benchmarks/bench_code_blocks.py [--lines 1000 10000 100000] [--max-lines-per-cell 50] [--repeat 3]
+"""
+
+import os
+import sys
+import time
+import types
+import logging
+import argparse
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+from docx import Document
+from docx.shared import Pt, RGBColor
+from lxml import etree
+
+from src.config import Config
+from src.modules.html_to_word.document_style import DocumentStyleManager
+from src.modules.html_to_word.processors.code import CodeProcessor
+
+def listing(lines: int) -> str:
+    """生成lines行的代码块HTML，包含缩进、空行、制表符和需要转义的字符"""
+    patterns = ['def func_{i}(value):', '    total = value * {i}  ', '', '\tif total &lt; {i} and flag:',
+                '        return "结果 {i}"', '    return total']
+    body = '\n'.join(patterns[i % len(patterns)].format(i=i) for i in range(lines))
+    return f'<pre><code>{body}</code></pre>'
+
+def legacy_write_text_runs(self, paragraph, lines: List[str]):
+    """逐行add_run并逐个设置字体属性（批量写入之前的实现）"""
+    for i, line in enumerate(lines):
+        if i > 0:
+            paragraph.add_run("\n")
+        run = paragraph.add_run(line)
+        run.font.name = self.style_manager.code_font
+        run.font.size = Pt(self.style_manager.code_size)
+        run.font.color.rgb = RGBColor(255, 255, 255)
+
+def render(config: dict, html: str, legacy: bool = False):
+    """
+    /**
+     * 用代码块处理器渲染一个代码块
+     *
+     * @param {dict} config - 配置字典
+     * @param {str} html - 代码块HTML
+     * @param {bool} legacy - 是否使用逐行写入
+     * @returns {Tuple[float, bytes]} (耗时秒, 文档主体XML)
+     */
+    """
+    style_manager = DocumentStyleManager(config)
+    document = style_manager.setup_document(Document())
+    processor = CodeProcessor(document, style_manager)
+    if legacy:
+        processor._write_text_runs = types.MethodType(legacy_write_text_runs, processor)
+    element = BeautifulSoup(html, 'html.parser').pre
+    start = time.perf_counter()
+    processor.process(element)
+    elapsed = time.perf_counter() - start
+    return elapsed, etree.tostring(document.element.body)
+
+def best_of(func, repeat: int):
+    """返回repeat次执行中耗时最短的一次结果"""
+    return min((func() for _ in range(repeat)), key=lambda result: result[0])
+
+def main():
+    parser = argparse.ArgumentParser(description='超长代码块基准测试')
+    parser.add_argument('--lines', type=int, nargs='+', default=[1000, 10000, 100000], help='代码行数，默认1000 10000 100000')
+    parser.add_argument('--max-lines-per-cell', type=int, default=50, help='拆分单元格时每个单元格的行数，默认50')
+    parser.add_argument('--repeat', type=int, default=3, help='计时次数，取最短耗时，默认3')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    config = Config().config
+    config['code_blocks'] = dict(config.get('code_blocks', {}), rendering='text', max_lines_per_cell=0)
+    split_config = dict(config, code_blocks=dict(config['code_blocks'], max_lines_per_cell=args.max_lines_per_cell))
+
+    mismatched = 0
+    print(f"{'行数':>8}{'逐行(s)':>12}{'批量(s)':>12}{'加速':>8}{'拆分单元格(s)':>16}")
+    for lines in args.lines:
+        html = listing(lines)
+        legacy_time, legacy_xml = best_of(lambda: render(config, html, legacy=True), args.repeat)
+        bulk_time, bulk_xml = best_of(lambda: render(config, html), args.repeat)
+        split_time, _ = best_of(lambda: render(split_config, html), args.repeat)
+        if legacy_xml != bulk_xml:
+            mismatched += 1
+        print(f"{lines:>8}{legacy_time:>12.3f}{bulk_time:>12.3f}{legacy_time / bulk_time:>7.1f}x{split_time:>16.3f}")
+    if mismatched:
+        print(f"警告: {mismatched} 个代码块两种写法生成的XML不同")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Markdown实例复用基准测试
+在大量小文档上比较每篇文档调用markdown.markdown（每次新建Markdown实例并重新注册扩展）
+与复用同一个Markdown实例、每篇文档之前调用reset()的耗时，并检查两种方式的输出一致
+
+用法:
+    python benchmarks/bench_markdown_instance.py [--count 5000] [--repeat 3] [--input-dir 目录]
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import markdown
+
+from src.config import Config
+from src.modules.markdown_to_html import MarkdownToHtml
+
+def small_documents(count: int, seed: int) -> List[str]:
+    """
+    /**
+     * 生成小文档：标题、段落、列表、引用链接，部分文档带表格和代码块
+     *
+     * @param {int} count - 文档数量
+     * @param {int} seed - 随机种子
+     * @returns {List[str]} Markdown文本列表
+     */
+    """
+    rng = random.Random(seed)
+    documents = []
+    for i in range(count):
+        parts = [f"# 文档 {i}", '', f"第{i}篇说明文字，参见[链接][ref{i}]和`inline code`。", '']
+        parts += [f"- 列表项 {j}" for j in range(rng.randint(1, 4))]
+        if rng.random() < 0.3:
+            parts += ['', '| 名称 | 数值 |', '|---|---|', f"| 甲 | {i} |"]
+        if rng.random() < 0.2:
+            parts += ['', '```python', f"print({i})", '```']
+        parts += ['', f"[ref{i}]: https://example.com/{i}", '']
+        documents.append('\n'.join(parts))
+    return documents
+
+def read_documents(input_dir: str) -> List[str]:
+    """
+    /**
+     * 读取目录中所有Markdown文件
+     *
+     * @param {str} input_dir - 目录路径
+     * @returns {List[str]} Markdown文本列表
+     */
+    """
+    documents = []
+    for root, _, files in os.walk(input_dir):
+        for name in sorted(files):
+            if name.lower().endswith(('.md', '.markdown')):
+                with open(os.path.join(root, name), 'r', encoding='utf-8') as f:
+                    documents.append(f.read())
+    return documents
+
+def best_of(func, repeat: int) -> float:
+    """返回repeat次执行中的最短耗时（秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description='Markdown实例复用基准测试')
+    parser.add_argument('--count', type=int, default=5000, help='生成的小文档数量，默认5000')
+    parser.add_argument('--seed', type=int, default=1, help='随机种子，默认1')
+    parser.add_argument('--repeat', type=int, default=3, help='计时次数，取最短耗时，默认3')
+    parser.add_argument('--input-dir', help='使用目录中的Markdown文件代替生成的文档')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    documents = read_documents(args.input_dir) if args.input_dir else small_documents(args.count, args.seed)
+    if not documents:
+        print('没有找到Markdown文档')
+        return 1
+
+    # 扩展配置与转换器相同
+    md_to_html = MarkdownToHtml(Config().config)
+    extensions = md_to_html._get_markdown_extensions()
+    shared = md_to_html._get_markdown()
+
+    def per_document():
+        return [markdown.markdown(text, extensions=extensions) for text in documents]
+
+    def reused():
+        return [shared.reset().convert(text) for text in documents]
+
+    mismatched = sum(1 for old, new in zip(per_document(), reused()) if old != new)
+    old_time = best_of(per_document, args.repeat)
+    new_time = best_of(reused, args.repeat)
+    count = len(documents)
+
+    print(f"文档数: {count}, 平均大小: {sum(len(text) for text in documents) / count:.0f} 字符")
+    print(f"{'方式':<24}{'总耗时(s)':>12}{'每篇(ms)':>12}")
+    print(f"{'每篇新建Markdown实例':<24}{old_time:>12.3f}{old_time / count * 1000:>12.3f}")
+    print(f"{'复用实例并reset':<24}{new_time:>12.3f}{new_time / count * 1000:>12.3f}")
+    print(f"每篇节省: {(old_time - new_time) / count * 1000:.3f}ms ({1 - new_time / old_time:.1%})")
+    if mismatched:
+        print(f"警告: {mismatched} 篇文档两种方式的输出不同")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
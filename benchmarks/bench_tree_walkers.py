@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+文档树遍历基准测试
+生成深层嵌套（默认10000层）和大量兄弟节点（默认100000个）的HTML夹具，
+测量中文间距、简繁转换和HTML到Word各阶段的耗时，验证遍历不会超出递归深度限制
+
+用法:
+    python benchmarks/bench_tree_walkers.py [--depth 10000] [--siblings 100000] [--fixture 名称]
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from src.modules.markdown_to_html import MarkdownToHtml
+from src.modules.html_to_word import HtmlToWordConverter
+
+def deep_list(depth: int) -> str:
+    """生成嵌套depth层的无序列表"""
+    return '<ul>' + '<li>第a层<ul>' * (depth - 1) + '<li>最深1层</li>' + '</ul></li>' * (depth - 1) + '</ul>'
+
+def deep_blockquote(depth: int) -> str:
+    """生成嵌套depth层的引用块"""
+    return '<blockquote><p>引用a</p>' * depth + '</blockquote>' * depth
+
+def deep_div(depth: int) -> str:
+    """生成嵌套depth层的div，最内层为段落"""
+    return '<div>' * depth + '<p>最深的段落a</p>' + '</div>' * depth
+
+def deep_inline(depth: int) -> str:
+    """生成嵌套depth层的内联元素"""
+    return '<p>' + '<span>文本a' * depth + '</span>' * depth + '</p>'
+
+def wide_inline(siblings: int) -> str:
+    """生成包含siblings个兄弟节点的段落，文本与粗体交替"""
+    return '<p>' + '中文a<strong>b</strong>' * (siblings // 2) + '</p>'
+
+def wide_blocks(siblings: int) -> str:
+    """生成siblings个并列的段落"""
+    return '<p>段落a</p>' * siblings
+
+FIXTURES = {
+    'deep_list': (deep_list, 'depth'),
+    'deep_blockquote': (deep_blockquote, 'depth'),
+    'deep_div': (deep_div, 'depth'),
+    'deep_inline': (deep_inline, 'depth'),
+    'wide_inline': (wide_inline, 'siblings'),
+    'wide_blocks': (wide_blocks, 'siblings'),
+}
+
+def run_fixture(name: str, html: str, md_to_html: MarkdownToHtml, html_to_word: HtmlToWordConverter) -> dict:
+    """
+    /**
+     * 对一个夹具执行各阶段并计时
+     *
+     * @param {str} name - 夹具名称
+     * @param {str} html - 夹具HTML
+     * @param {MarkdownToHtml} md_to_html - Markdown到HTML转换器
+     * @param {HtmlToWordConverter} html_to_word - HTML到Word转换器
+     * @returns {dict} 各阶段耗时（秒）
+     */
+    """
+    timings = {}
+    start = time.perf_counter()
+    soup = BeautifulSoup(f'<html><body>{html}</body></html>', 'html.parser')
+    timings['parse'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    md_to_html._optimize_chinese_spacing(soup)
+    timings['spacing'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    md_to_html._convert_chinese(soup)
+    timings['opencc'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    doc = html_to_word.convert_html(soup)
+    timings['word'] = time.perf_counter() - start
+    timings['paragraphs'] = len(doc.paragraphs)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description='文档树遍历基准测试')
+    parser.add_argument('--depth', type=int, default=10000, help='嵌套层数，默认10000')
+    parser.add_argument('--siblings', type=int, default=100000, help='兄弟节点数，默认100000')
+    parser.add_argument('--fixture', choices=sorted(FIXTURES), action='append', help='只运行指定夹具，可重复指定')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    config = {'chinese': {'convert_to_traditional': True}}
+    md_to_html = MarkdownToHtml(config)
+    html_to_word = HtmlToWordConverter(config)
+
+    print(f"递归深度限制: {sys.getrecursionlimit()}, 嵌套层数: {args.depth}, 兄弟节点数: {args.siblings}")
+    print(f"{'夹具':<18}{'解析':>9}{'间距':>9}{'简繁':>9}{'Word':>9}{'段落数':>9}")
+    for name in args.fixture or FIXTURES:
+        build, size_arg = FIXTURES[name]
+        html = build(getattr(args, size_arg))
+        t = run_fixture(name, html, md_to_html, html_to_word)
+        print(f"{name:<18}{t['parse']:>9.2f}{t['spacing']:>9.2f}{t['opencc']:>9.2f}{t['word']:>9.2f}{t['paragraphs']:>9}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
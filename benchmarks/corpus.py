@@ -0,0 +1,302 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+合成Markdown语料生成器
+按随机种子生成可复现的文档：中英混排段落、大表格、深层列表、长代码块和大量本地图片，
+同一种子、配置和缩放系数总是生成字节相同的语料
+
+用法:
+    python -m benchmarks.corpus 输出目录 [--profile mixed] [--seed 1] [--scale 1.0]
+"""
+
+import os
+import sys
+import zlib
+import struct
+import random
+import hashlib
+import argparse
+from typing import Dict, Any, List, Optional
+
+# 语料格式版本，生成规则变化时递增，不同版本的基准结果不可比较
+CORPUS_VERSION = 1
+
+# 文档配置：各类内容的数量，数值会乘以缩放系数
+PROFILES: Dict[str, Dict[str, int]] = {
+    'prose': {'paragraphs': 600, 'headings': 40},
+    'tables': {'paragraphs': 20, 'tables': 3, 'table_rows': 1500, 'table_cols': 6},
+    'lists': {'paragraphs': 20, 'lists': 40, 'list_items': 30, 'list_depth': 12},
+    'code': {'paragraphs': 20, 'code_blocks': 30, 'code_lines': 400},
+    'images': {'paragraphs': 40, 'images': 60},
+    'mixed': {
+        'paragraphs': 200, 'headings': 20, 'tables': 2, 'table_rows': 300, 'table_cols': 5,
+        'lists': 10, 'list_items': 20, 'list_depth': 6, 'code_blocks': 8, 'code_lines': 120,
+        'images': 15,
+    },
+}
+
+# 以下数量不随缩放系数变化
+UNSCALED_KEYS = ('table_cols', 'list_depth')
+
+CJK_WORDS = (
+    '文档', '转换', '格式', '段落', '表格', '列表', '图片', '代码', '标题', '引用',
+    '中文', '排版', '字体', '样式', '项目', '配置', '性能', '测试', '数据', '系统',
+    '用户', '功能', '模块', '处理', '结果', '方案', '计划', '资助', '申请', '说明',
+    '简体', '繁体', '内容', '页面', '服务', '平台', '技术', '开发', '管理', '分析',
+)
+LATIN_WORDS = (
+    'markdown', 'Word', 'docx', 'Python', 'HTML', 'API', 'table', 'list', 'image', 'code',
+    'render', 'parser', 'style', 'font', 'layout', 'cache', 'batch', 'version', 'v1.0', '2024',
+)
+CODE_LINES = (
+    'def process(items, limit=10):',
+    '    result = [item.strip() for item in items if item]',
+    '    for index, value in enumerate(result):',
+    '        if index > limit:',
+    '            break',
+    '    return {"count": len(result), "items": result}',
+    'class Handler(object):',
+    '    # 处理请求并返回结果',
+    '    value = compute(x, y) * 2 + offset',
+    'print(f"done: {total} 个文件")',
+)
+
+def _scaled(spec: Dict[str, int], scale: float) -> Dict[str, int]:
+    """
+    /**
+     * 按缩放系数调整文档配置
+     *
+     * @param {Dict[str, int]} spec - 文档配置
+     * @param {float} scale - 缩放系数
+     * @returns {Dict[str, int]} 调整后的配置
+     */
+    """
+    return {
+        key: value if key in UNSCALED_KEYS else max(1, round(value * scale)) if value else 0
+        for key, value in spec.items()
+    }
+
+def _sentence(rng: random.Random, words: int) -> str:
+    """
+    /**
+     * 生成中英混排句子，偶尔包含粗体、行内代码和链接
+     *
+     * @param {random.Random} rng - 随机数生成器
+     * @param {int} words - 词数
+     * @returns {str} 句子文本
+     */
+    """
+    parts = []
+    for _ in range(words):
+        if rng.random() < 0.25:
+            word = rng.choice(LATIN_WORDS)
+        else:
+            word = ''.join(rng.choice(CJK_WORDS) for _ in range(rng.randint(1, 3)))
+        roll = rng.random()
+        if roll < 0.04:
+            word = f"**{word}**"
+        elif roll < 0.07:
+            word = f"`{word}`"
+        elif roll < 0.08:
+            word = f"[{word}](https://example.com/{rng.randint(1, 999)})"
+        parts.append(word)
+    # 中文词之间不加空格，拉丁词两侧加空格，与真实文档一致
+    text = ''
+    for part in parts:
+        if text and (part[-1].isascii() or text[-1].isascii()):
+            text += ' '
+        text += part
+    return text + '。'
+
+def _paragraph(rng: random.Random) -> str:
+    """生成由2到6个句子组成的段落"""
+    return ''.join(_sentence(rng, rng.randint(6, 20)) for _ in range(rng.randint(2, 6)))
+
+def _table(rng: random.Random, rows: int, cols: int) -> str:
+    """生成rows行cols列的表格"""
+    lines = ['| ' + ' | '.join(f"{rng.choice(CJK_WORDS)}{col + 1}" for col in range(cols)) + ' |',
+             '|' + '---|' * cols]
+    for _ in range(rows):
+        cells = []
+        for _ in range(cols):
+            if rng.random() < 0.3:
+                cells.append(f"{rng.randint(0, 100000) / 100:.2f}")
+            else:
+                cells.append(_sentence(rng, rng.randint(1, 4)).rstrip('。'))
+        lines.append('| ' + ' | '.join(cells) + ' |')
+    return '\n'.join(lines)
+
+def _nested_list(rng: random.Random, items: int, depth: int) -> str:
+    """生成items项、最深depth层的嵌套列表，有序与无序交替"""
+    lines = []
+    level = 0
+    for _ in range(items):
+        level = max(0, min(depth - 1, level + rng.choice((-1, 0, 1, 1))))
+        marker = '1.' if level % 2 else '-'
+        lines.append('    ' * level + f"{marker} {_sentence(rng, rng.randint(3, 10))}")
+    return '\n'.join(lines)
+
+def _code_block(rng: random.Random, lines: int) -> str:
+    """生成lines行的Python代码块"""
+    body = [rng.choice(CODE_LINES) for _ in range(lines)]
+    return '```python\n' + '\n'.join(body) + '\n```'
+
+def generate_markdown(seed: int, profile: str = 'mixed', scale: float = 1.0,
+                      images: Optional[List[str]] = None) -> str:
+    """
+    /**
+     * 生成一篇合成Markdown文档
+     *
+     * @param {int} seed - 随机种子
+     * @param {str} profile - 文档配置名称，见PROFILES
+     * @param {float} scale - 缩放系数
+     * @param {Optional[List[str]]} images - 可引用的图片路径或URL，为空时不插入图片
+     * @returns {str} Markdown文本
+     */
+    """
+    rng = random.Random(f"{CORPUS_VERSION}:{profile}:{seed}")
+    spec = _scaled(PROFILES[profile], scale)
+
+    # 先确定各块的类型，再打乱顺序，使不同内容交错出现
+    blocks = ['paragraph'] * spec.get('paragraphs', 0)
+    blocks += ['heading'] * spec.get('headings', 0)
+    blocks += ['table'] * spec.get('tables', 0)
+    blocks += ['list'] * spec.get('lists', 0)
+    blocks += ['code'] * spec.get('code_blocks', 0)
+    if images:
+        blocks += ['image'] * spec.get('images', 0)
+    rng.shuffle(blocks)
+
+    parts = [f"# {profile} 基准文档 {seed}"]
+    image_index = 0
+    for block in blocks:
+        if block == 'paragraph':
+            parts.append(_paragraph(rng))
+        elif block == 'heading':
+            parts.append('#' * rng.randint(2, 4) + ' ' + _sentence(rng, rng.randint(2, 6)).rstrip('。'))
+        elif block == 'table':
+            parts.append(_table(rng, spec['table_rows'], spec['table_cols']))
+        elif block == 'list':
+            parts.append(_nested_list(rng, spec['list_items'], spec['list_depth']))
+        elif block == 'code':
+            parts.append(_code_block(rng, spec['code_lines']))
+        elif block == 'image':
+            parts.append(f"![图{image_index + 1}]({images[image_index % len(images)]})")
+            image_index += 1
+    return '\n\n'.join(parts) + '\n'
+
+def write_png(path: str, width: int, height: int, seed: int):
+    """
+    /**
+     * 写入确定性的渐变PNG图片，不依赖Pillow
+     *
+     * @param {str} path - 输出路径
+     * @param {int} width - 宽度（像素）
+     * @param {int} height - 高度（像素）
+     * @param {int} seed - 决定颜色的种子
+     */
+    """
+    r0, g0, b0 = (seed * 53) % 256, (seed * 97) % 256, (seed * 193) % 256
+    rows = []
+    for y in range(height):
+        row = bytearray(b'\x00')
+        for x in range(width):
+            row += bytes(((r0 + x) % 256, (g0 + y) % 256, (b0 + x + y) % 256))
+        rows.append(bytes(row))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b'IDAT', zlib.compress(b''.join(rows), 6)))
+        f.write(chunk(b'IEND', b''))
+
+def generate_images(image_dir: str, count: int, width: int = 640, height: int = 400) -> List[str]:
+    """
+    /**
+     * 在目录中生成图片，已存在的同名图片直接复用
+     *
+     * @param {str} image_dir - 图片目录
+     * @param {int} count - 图片数量
+     * @param {int} width - 宽度（像素）
+     * @param {int} height - 高度（像素）
+     * @returns {List[str]} 图片文件名列表
+     */
+    """
+    os.makedirs(image_dir, exist_ok=True)
+    names = []
+    for index in range(count):
+        name = f"img_{index:03d}_{width}x{height}.png"
+        path = os.path.join(image_dir, name)
+        if not os.path.exists(path):
+            write_png(path, width, height, index)
+        names.append(name)
+    return names
+
+def generate_corpus(output_dir: str, profiles: Optional[List[str]] = None, seed: int = 1,
+                    scale: float = 1.0, image_base: Optional[str] = None) -> Dict[str, Any]:
+    """
+    /**
+     * 生成语料目录：每个配置一篇文档，图片放在images子目录中
+     *
+     * @param {str} output_dir - 输出目录
+     * @param {Optional[List[str]]} profiles - 文档配置名称列表，默认为全部
+     * @param {int} seed - 随机种子
+     * @param {float} scale - 缩放系数
+     * @param {Optional[str]} image_base - 图片地址前缀（如本地HTTP服务地址），默认使用图片的绝对路径
+     * @returns {Dict[str, Any]} 语料描述：版本、种子、缩放系数、整体摘要以及每篇文档的路径、大小和摘要
+     */
+    """
+    profiles = profiles or list(PROFILES)
+    os.makedirs(output_dir, exist_ok=True)
+    image_dir = os.path.join(output_dir, 'images')
+    image_count = max(_scaled(PROFILES[name], scale).get('images', 0) for name in profiles)
+    names = generate_images(image_dir, min(image_count, 32)) if image_count else []
+    if image_base:
+        image_refs = [f"{image_base.rstrip('/')}/{name}" for name in names]
+    else:
+        image_refs = [os.path.abspath(os.path.join(image_dir, name)) for name in names]
+
+    documents = {}
+    sha = hashlib.sha256()
+    for name in profiles:
+        text = generate_markdown(seed, name, scale, image_refs)
+        path = os.path.join(output_dir, f"{name}.md")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        # 摘要中不包含图片地址，本地路径或服务端口不同的语料仍然可比较
+        digest_text = text
+        for ref, image_name in zip(image_refs, names):
+            digest_text = digest_text.replace(ref, image_name)
+        digest = hashlib.sha256(digest_text.encode('utf-8')).hexdigest()
+        sha.update(name.encode('utf-8') + b'\0' + digest.encode('ascii'))
+        documents[name] = {'path': path, 'bytes': len(text.encode('utf-8')), 'digest': digest}
+
+    return {
+        'version': CORPUS_VERSION,
+        'seed': seed,
+        'scale': scale,
+        'digest': sha.hexdigest(),
+        'image_dir': image_dir,
+        'documents': documents,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='生成可复现的合成Markdown语料')
+    parser.add_argument('output', help='输出目录')
+    parser.add_argument('--profile', choices=sorted(PROFILES), action='append', help='只生成指定配置，可重复指定')
+    parser.add_argument('--seed', type=int, default=1, help='随机种子，默认1')
+    parser.add_argument('--scale', type=float, default=1.0, help='内容数量缩放系数，默认1.0')
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.output, args.profile, args.seed, args.scale)
+    for name, info in corpus['documents'].items():
+        print(f"{name:<8}{info['bytes']:>12} 字节  {info['path']}")
+    print(f"语料摘要: {corpus['digest']}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
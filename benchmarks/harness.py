@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+转换性能基准测试
+在合成语料上分别测量Markdown到HTML、HTML到Word和端到端文件转换的耗时与峰值内存，
+结果写入JSON并可与之前的结果比较，用于判断版本之间是否出现性能退化
+
+用法:
+    python -m benchmarks.harness [--profile mixed] [--seed 1] [--scale 1.0] [--repeat 3]
+                                 [--serve-images] [--output 结果.json] [--compare 基准.json]
+"""
+
+import os
+import sys
+import copy
+import time
+import json
+import logging
+import platform
+import argparse
+import tempfile
+import threading
+import statistics
+import tracemalloc
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from typing import Dict, Any, List, Optional, Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import PROFILES, generate_corpus
+from src.config import Config
+from src.modules.converter import Converter
+from src.modules.markdown_to_html import MarkdownToHtml
+from src.modules.html_to_word import HtmlToWordConverter
+
+# 结果格式版本
+RESULT_VERSION = 1
+
+# 测量的阶段
+STAGES = ('markdown_to_html', 'html_to_word', 'end_to_end')
+
+# 记录版本号的依赖包
+PACKAGES = ('python-docx', 'markdown', 'beautifulsoup4', 'opencc-python-reimplemented', 'Pygments', 'lxml', 'Pillow')
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    """不输出访问日志的静态文件处理器"""
+
+    def log_message(self, format, *args):
+        pass
+
+def serve_directory(directory: str) -> ThreadingHTTPServer:
+    """
+    /**
+     * 在后台线程中以HTTP提供目录下的文件，端口随机分配
+     *
+     * @param {str} directory - 目录路径
+     * @returns {ThreadingHTTPServer} 服务对象，使用完毕后调用shutdown
+     */
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(_QuietHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def benchmark_config() -> Dict[str, Any]:
+    """
+    /**
+     * 获取基准测试使用的配置：默认配置，关闭耗时日志和持久图片缓存，保证每次测量条件相同
+     *
+     * @returns {Dict[str, Any]} 配置字典
+     */
+    """
+    config = copy.deepcopy(Config().config)
+    config.setdefault('debug', {})['timing'] = False
+    config.setdefault('image_cache', {})['enabled'] = False
+    return config
+
+def measure(func: Callable[[], Any], repeat: int, warmup: int) -> Dict[str, Any]:
+    """
+    /**
+     * 多次执行并统计耗时，最后单独执行一次测量峰值内存
+     *
+     * tracemalloc会显著拖慢执行，所以计时和内存测量分开进行
+     *
+     * @param {Callable} func - 被测函数
+     * @param {int} repeat - 计时次数
+     * @param {int} warmup - 不计时的预热次数
+     * @returns {Dict[str, Any]} 最短、中位耗时（秒），每次耗时和峰值内存（MB）
+     */
+    """
+    for _ in range(warmup):
+        func()
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'min': round(min(runs), 6),
+        'median': round(statistics.median(runs), 6),
+        'runs': [round(run, 6) for run in runs],
+        'peak_mb': round(peak / (1024 * 1024), 3),
+    }
+
+def run_document(path: str, config: Dict[str, Any], work_dir: str, repeat: int, warmup: int) -> Dict[str, Any]:
+    """
+    /**
+     * 测量一篇文档各阶段的耗时与峰值内存
+     *
+     * @param {str} path - Markdown文件路径
+     * @param {Dict[str, Any]} config - 配置字典
+     * @param {str} work_dir - 输出文件目录
+     * @param {int} repeat - 计时次数
+     * @param {int} warmup - 预热次数
+     * @returns {Dict[str, Any]} 各阶段的测量结果
+     */
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        md_content = f.read()
+    md_to_html = MarkdownToHtml(config)
+    html_to_word = HtmlToWordConverter(config)
+    converter = Converter(config)
+    html_content = md_to_html.convert_text(md_content)
+    output_file = os.path.join(work_dir, os.path.basename(path) + '.docx')
+
+    return {
+        'markdown_to_html': measure(lambda: md_to_html.convert_text(md_content), repeat, warmup),
+        'html_to_word': measure(lambda: html_to_word.convert_html(html_content), repeat, warmup),
+        'end_to_end': measure(lambda: converter.convert_file(path, output_file), repeat, warmup),
+    }
+
+def environment() -> Dict[str, Any]:
+    """
+    /**
+     * 记录运行环境，比较结果时用于判断两次测量是否可比
+     *
+     * @returns {Dict[str, Any]} Python版本、平台和依赖包版本
+     */
+    """
+    from importlib import metadata
+    packages = {}
+    for name in PACKAGES:
+        try:
+            packages[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            packages[name] = None
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'packages': packages,
+    }
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    /**
+     * 与基准结果比较，按最短耗时判断退化
+     *
+     * @param {Dict[str, Any]} results - 本次结果
+     * @param {Dict[str, Any]} baseline - 基准结果
+     * @param {float} threshold - 允许的相对变慢比例，如0.1表示10%
+     * @returns {List[str]} 退化项列表，格式为"配置/阶段"
+     */
+    """
+    base_documents = baseline.get('corpus', {}).get('documents', {})
+    changed = [
+        name for name, info in results['corpus']['documents'].items()
+        if name in base_documents and base_documents[name].get('digest') != info['digest']
+    ]
+    if changed:
+        print(f"警告: 文档 {', '.join(changed)} 与基准的语料摘要不同（种子、缩放系数或生成规则不同），比较结果仅供参考")
+    if baseline.get('corpus', {}).get('images') != results['corpus']['images']:
+        print(f"警告: 图片来源不同 ({baseline.get('corpus', {}).get('images')} -> {results['corpus']['images']})，图片相关耗时不可比较")
+    if baseline.get('environment', {}).get('python') != results['environment']['python']:
+        print(f"警告: Python版本不同 ({baseline.get('environment', {}).get('python')} -> {results['environment']['python']})")
+
+    regressions = []
+    print(f"\n{'配置/阶段':<28}{'基准(s)':>10}{'本次(s)':>10}{'比值':>8}{'内存比':>8}")
+    for profile, stages in results['results'].items():
+        base_stages = baseline.get('results', {}).get(profile)
+        if not base_stages:
+            continue
+        for stage in STAGES:
+            if stage not in stages or stage not in base_stages:
+                continue
+            old, new = base_stages[stage], stages[stage]
+            ratio = new['min'] / old['min'] if old['min'] else float('inf')
+            memory_ratio = new['peak_mb'] / old['peak_mb'] if old['peak_mb'] else float('inf')
+            flag = ''
+            if ratio > 1 + threshold:
+                flag = '  退化'
+                regressions.append(f"{profile}/{stage}")
+            print(f"{profile + '/' + stage:<28}{old['min']:>10.3f}{new['min']:>10.3f}{ratio:>8.2f}{memory_ratio:>8.2f}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='转换性能基准测试')
+    parser.add_argument('--profile', choices=sorted(PROFILES), action='append', help='只测量指定配置，可重复指定，默认为全部')
+    parser.add_argument('--seed', type=int, default=1, help='语料随机种子，默认1')
+    parser.add_argument('--scale', type=float, default=1.0, help='语料缩放系数，默认1.0')
+    parser.add_argument('--repeat', type=int, default=3, help='每个阶段的计时次数，默认3')
+    parser.add_argument('--warmup', type=int, default=1, help='每个阶段的预热次数，默认1')
+    parser.add_argument('--serve-images', action='store_true', help='通过本地HTTP服务提供图片，测量远程图片下载路径')
+    parser.add_argument('--corpus-dir', help='语料目录，默认使用临时目录')
+    parser.add_argument('--output', help='将结果写入JSON文件')
+    parser.add_argument('--compare', help='与之前的JSON结果比较')
+    parser.add_argument('--threshold', type=float, default=0.1, help='判定为退化的相对变慢比例，默认0.1')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    config = benchmark_config()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        corpus_dir = args.corpus_dir or os.path.join(temp_dir, 'corpus')
+        work_dir = os.path.join(temp_dir, 'output')
+        os.makedirs(work_dir)
+
+        server = None
+        image_base = None
+        if args.serve_images:
+            server = serve_directory(os.path.join(corpus_dir, 'images'))
+            image_base = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            corpus = generate_corpus(corpus_dir, args.profile, args.seed, args.scale, image_base)
+            print(f"语料: 种子 {args.seed}, 缩放 {args.scale}, 摘要 {corpus['digest'][:16]}, "
+                  f"图片 {'HTTP' if server else '本地文件'}")
+            print(f"{'配置':<10}{'大小(KB)':>10}" + ''.join(f"{stage:>20}" for stage in STAGES))
+
+            results = {}
+            for profile, info in corpus['documents'].items():
+                stages = run_document(info['path'], config, work_dir, args.repeat, args.warmup)
+                results[profile] = stages
+                cells = ''.join(f"{stages[stage]['min']:>9.3f}s {stages[stage]['peak_mb']:>7.1f}MB" for stage in STAGES)
+                print(f"{profile:<10}{info['bytes'] / 1024:>10.1f}{cells}")
+        finally:
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+
+    data = {
+        'version': RESULT_VERSION,
+        'corpus': {
+            'version': corpus['version'],
+            'seed': corpus['seed'],
+            'scale': corpus['scale'],
+            'digest': corpus['digest'],
+            'images': 'http' if args.serve_images else 'file',
+            'documents': {
+                name: {'bytes': info['bytes'], 'digest': info['digest']}
+                for name, info in corpus['documents'].items()
+            },
+        },
+        'repeat': args.repeat,
+        'environment': environment(),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        print(f"结果已写入: {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(data, baseline, args.threshold)
+        if regressions:
+            print(f"\n性能退化超过 {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+        print('\n没有超过阈值的性能退化')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+命令行启动耗时检查
+在子进程中用 python -X importtime 运行run.py，统计导入耗时和总耗时，
+并检查不需要的重量级依赖（requests、opencc、多进程等）没有被提前导入。
+编辑器插件每次保存都会启动一次命令行，启动耗时直接决定交互延迟
+
+预算不是绝对毫秒数，而是相对于同一次运行中测得的参考耗时：
+run.py自身带来的导入耗时（减去空解释器 python -c pass 的导入耗时）
+不应超过 预算系数 × 参考耗时，参考耗时为关闭site时导入一组固定标准库模块的耗时，
+只反映机器速度，与site-packages中的.pth等环境差异无关
+
+用法:
+    python -m benchmarks.startup [--repeat 5] [--budget-factor 1.0]
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+from typing import Dict, Any, List, Set, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE_MARKDOWN = """# 启动耗时测试
+
+这是一个没有图片和代码块的简单文档，用于测量 CLI 启动耗时。
+
+- 列表项一
+- 列表项二
+
+| 名称 | 数值 |
+|---|---|
+| 甲 | 1 |
+"""
+
+# 参考耗时使用的标准库模块
+REFERENCE_MODULES = ('json', 'decimal', 'argparse', 'logging', 'email.message', 'xml.etree.ElementTree',
+                     'zipfile', 'tempfile', 'subprocess')
+
+# 各场景：命令行参数、导入耗时预算（参考耗时的倍数）、不应导入的模块
+SCENARIOS: Dict[str, Dict[str, Any]] = {
+    'cli_help': {
+        'args': ['--help'],
+        'budget': 0.8,
+        'forbidden': ('docx', 'bs4', 'markdown', 'lxml', 'requests', 'opencc', 'pygments', 'multiprocessing'),
+    },
+    'convert_simplified': {
+        'args': ['-i', '{input}', '-o', '{output}', '-n', '-s'],
+        'budget': 5.0,
+        'forbidden': ('requests', 'opencc', 'pygments', 'multiprocessing'),
+    },
+    'convert_traditional': {
+        'args': ['-i', '{input}', '-o', '{output}', '-n'],
+        'budget': 5.0,
+        'forbidden': ('requests', 'pygments', 'multiprocessing'),
+    },
+}
+
+_IMPORT_LINE_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+def parse_importtime(stderr: str) -> Tuple[float, Set[str]]:
+    """
+    /**
+     * 解析 -X importtime 的输出
+     *
+     * @param {str} stderr - 子进程的标准错误输出
+     * @returns {Tuple[float, Set[str]]} 导入总耗时（毫秒）和已导入的模块名集合
+     */
+    """
+    total_us = 0
+    modules = set()
+    for line in stderr.splitlines():
+        match = _IMPORT_LINE_RE.match(line)
+        if not match:
+            continue
+        total_us += int(match.group(1))
+        modules.add(match.group(4))
+    return total_us / 1000, modules
+
+def run_python(args: List[str]) -> Tuple[float, float, Set[str]]:
+    """
+    /**
+     * 在子进程中用 -X importtime 运行一次Python
+     *
+     * @param {List[str]} args - 解释器参数
+     * @returns {Tuple[float, float, Set[str]]} 总耗时（毫秒）、导入耗时（毫秒）和已导入的模块名集合
+     */
+    """
+    command = [sys.executable, '-X', 'importtime'] + args
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=ROOT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                            text=True, encoding='utf-8', errors='replace')
+    wall_ms = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"退出码 {result.returncode}: {' '.join(args)}\n{result.stderr[-2000:]}")
+    import_ms, modules = parse_importtime(result.stderr)
+    return wall_ms, import_ms, modules
+
+def run_scenario(args: List[str]) -> Tuple[float, float, Set[str]]:
+    """
+    /**
+     * 在子进程中运行一次run.py
+     *
+     * @param {List[str]} args - 命令行参数
+     * @returns {Tuple[float, float, Set[str]]} 总耗时（毫秒）、导入耗时（毫秒）和已导入的模块名集合
+     */
+    """
+    return run_python([os.path.join(ROOT_DIR, 'run.py')] + args)
+
+def best_import_ms(args: List[str], repeat: int) -> float:
+    """
+    /**
+     * 多次运行取最短导入耗时
+     *
+     * @param {List[str]} args - 解释器参数
+     * @param {int} repeat - 运行次数
+     * @returns {float} 导入耗时（毫秒）
+     */
+    """
+    return min(run_python(args)[1] for _ in range(repeat))
+
+def measure_reference(repeat: int) -> Tuple[float, float]:
+    """
+    /**
+     * 测量空解释器的导入耗时和参考耗时
+     *
+     * @param {int} repeat - 运行次数
+     * @returns {Tuple[float, float]} (python -c pass 的导入耗时, 关闭site时导入参考模块的耗时)，单位毫秒
+     */
+    """
+    bare = best_import_ms(['-c', 'pass'], repeat)
+    bare_no_site = best_import_ms(['-S', '-c', 'pass'], repeat)
+    reference = best_import_ms(['-S', '-c', f"import {', '.join(REFERENCE_MODULES)}"], repeat)
+    return bare, max(reference - bare_no_site, 1.0)
+
+def main():
+    parser = argparse.ArgumentParser(description='命令行启动耗时检查')
+    parser.add_argument('--repeat', type=int, default=5, help='每个场景的运行次数，取最短耗时，默认5')
+    parser.add_argument('--budget-factor', type=float, default=1.0, help='预算缩放系数，需要放宽或收紧检查时调整')
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), action='append', help='只运行指定场景，可重复指定')
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_file = os.path.join(temp_dir, 'startup.md')
+        output_file = os.path.join(temp_dir, 'startup.docx')
+        with open(input_file, 'w', encoding='utf-8') as f:
+            f.write(SAMPLE_MARKDOWN)
+
+        bare_ms, reference_ms = measure_reference(args.repeat)
+        print(f"空解释器导入 {bare_ms:.0f}ms, 参考耗时 {reference_ms:.0f}ms\n")
+        print(f"{'场景':<22}{'总耗时(ms)':>12}{'导入(ms)':>10}{'自身(ms)':>10}{'预算(ms)':>10}")
+        for name in args.scenario or SCENARIOS:
+            scenario = SCENARIOS[name]
+            command_args = [arg.format(input=input_file, output=output_file) for arg in scenario['args']]
+            best_wall = best_import = float('inf')
+            modules: Set[str] = set()
+            for _ in range(args.repeat):
+                wall_ms, import_ms, modules = run_scenario(command_args)
+                best_wall = min(best_wall, wall_ms)
+                best_import = min(best_import, import_ms)
+
+            own_import = max(best_import - bare_ms, 0.0)
+            budget = scenario['budget'] * reference_ms * args.budget_factor
+            loaded = sorted(module for module in scenario['forbidden'] if module in modules)
+            status = ''
+            if own_import > budget:
+                status = '  超出预算'
+                failures.append(f"{name}: 自身导入耗时 {own_import:.0f}ms > {budget:.0f}ms")
+            if loaded:
+                status += f"  提前导入: {', '.join(loaded)}"
+                failures.append(f"{name}: 不应导入 {', '.join(loaded)}")
+            print(f"{name:<22}{best_wall:>12.0f}{best_import:>10.0f}{own_import:>10.0f}{budget:>10.0f}{status}")
+
+    if failures:
+        print('\n启动检查未通过:')
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print('\n启动检查通过')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -10,40 +10,9 @@ import os
 import sys
 import argparse
 import logging
+import contextlib
 from pathlib import Path
-import traceback # 导入 traceback 模块
-
-# --- BEGIN DIAGNOSTICS ---
-print("--- run.py 启动诊断信息 ---", file=sys.stderr)
-print(f"Python Executable: {sys.executable}", file=sys.stderr)
-print(f"Python Version: {sys.version}", file=sys.stderr)
-print("sys.path:", file=sys.stderr)
-for p in sys.path:
-    print(f"  - {p}", file=sys.stderr)
-
-# 尝试导入关键模块
-try:
-    import markdown2docx
-    print("成功导入 'markdown2docx'", file=sys.stderr)
-except ModuleNotFoundError as e:
-    print("!!! 错误：无法导入 'markdown2docx' !!!", file=sys.stderr)
-    traceback.print_exc(file=sys.stderr) # 打印完整的 traceback
-except Exception as e:
-    print(f"!!! 导入 'markdown2docx' 时发生其他错误: {e} !!!", file=sys.stderr)
-    traceback.print_exc(file=sys.stderr)
-
-try:
-    import docx
-    print("成功导入 'docx' (来自 python-docx)", file=sys.stderr)
-except ModuleNotFoundError as e:
-    print("!!! 错误：无法导入 'docx' (来自 python-docx) !!!", file=sys.stderr)
-    traceback.print_exc(file=sys.stderr)
-except Exception as e:
-    print(f"!!! 导入 'docx' 时发生其他错误: {e} !!!", file=sys.stderr)
-    traceback.print_exc(file=sys.stderr)
-
-print("--- 诊断信息结束 ---", file=sys.stderr)
-# --- END DIAGNOSTICS ---
+import importlib.util
 
 # 将当前目录添加到系统路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -65,6 +34,26 @@ def setup_logging(log_level=logging.INFO):
         handlers=[logging.StreamHandler()] # 注意：StreamHandler 默认输出到 stderr
     )
 
+def print_diagnostics():
+    """
+    输出启动诊断信息（仅在调试模式下）
+    
+    只检查依赖是否可以找到，不实际导入，避免拖慢启动
+    """
+    print("--- run.py 启动诊断信息 ---", file=sys.stderr)
+    print(f"Python Executable: {sys.executable}", file=sys.stderr)
+    print(f"Python Version: {sys.version}", file=sys.stderr)
+    print("sys.path:", file=sys.stderr)
+    for p in sys.path:
+        print(f"  - {p}", file=sys.stderr)
+    for module_name in ('docx', 'markdown', 'bs4', 'yaml', 'opencc', 'requests', 'pygments'):
+        try:
+            found = importlib.util.find_spec(module_name) is not None
+        except (ImportError, ValueError):
+            found = False
+        print(f"{'找到' if found else '!!! 未找到'} '{module_name}'", file=sys.stderr)
+    print("--- 诊断信息结束 ---", file=sys.stderr)
+
 def find_config_file():
     """
     查找配置文件
@@ -94,12 +83,21 @@ def parse_args():
     """
     parser = argparse.ArgumentParser(description='将Markdown文件转换为Word文档')
     parser.add_argument('--input', '-i', type=str, default=DEFAULT_INPUT_DIR, help=f'输入文件或目录路径（默认：{DEFAULT_INPUT_DIR}）')
-    parser.add_argument('--output', '-o', type=str, default=DEFAULT_OUTPUT_DIR, help=f'输出文件或目录路径（默认：{DEFAULT_OUTPUT_DIR}）')
+    parser.add_argument('--output', '-o', type=str, default=DEFAULT_OUTPUT_DIR, help=f'输出文件或目录路径，单个文件转换时 - 表示写入标准输出（默认：{DEFAULT_OUTPUT_DIR}）')
     parser.add_argument('--batch', '-b', action='store_true', help='批量处理模式')
     parser.add_argument('--config', '-c', type=str, help='配置文件路径')
     parser.add_argument('--simplified', '-s', action='store_true', help='保持简体中文')
     parser.add_argument('--debug', '-d', action='store_true', help='启用调试模式')
     parser.add_argument('--no-html', '-n', action='store_true', help='不保留中间HTML文件')
+    parser.add_argument('--jobs', '-j', type=int, help='批量处理时的并行进程数（0表示使用全部CPU核心，默认读取配置batch.jobs）')
+    parser.add_argument('--incremental', action='store_true', default=None, help='批量处理时只转换发生变化的文件，并删除源文件已不存在的输出')
+    parser.add_argument('--watch', '-w', action='store_true', help='监视输入文件或目录，文件修改后自动重新转换')
+    parser.add_argument('--serve', action='store_true', help='以常驻服务模式运行，通过标准输入输出接收JSON-RPC转换请求')
+    parser.add_argument('--socket', type=str, metavar='PATH', help='以常驻服务模式运行，通过指定的Unix套接字接收请求')
+    parser.add_argument('--max-concurrency', type=int, help='服务模式下同时执行的转换数（默认读取配置server.max_concurrency）')
+    parser.add_argument('--compression', choices=['stored', 'fast', 'default', 'max'], help='docx压缩级别，stored不压缩保存最快，max文件最小（默认读取配置output.compression）')
+    parser.add_argument('--template', '-t', type=str, metavar='PATH', help='使用指定的Word模板（.dotx/.docx）的样式和页面设置')
+    parser.add_argument('--timing-report', type=str, metavar='DIR', help='启用耗时统计并将JSON耗时报告写入指定目录')
     return parser.parse_args()
 
 def main():
@@ -114,11 +112,12 @@ def main():
     setup_logging(log_level)
     logger = logging.getLogger('main')
     logger.info('开始执行World MD转换工具')
+    if args.debug:
+        print_diagnostics()
 
-    # 导入必要的模块 (现在放到 main 里面，确保诊断先运行)
+    # 转换器在真正处理文件时才导入，这里只导入配置模块
     try:
         from src.config import Config
-        from src.modules.converter import Converter
         logger.debug('成功导入 src 模块')
     except ImportError as e:
         logger.error(f'无法导入 src 模块: {e}')
@@ -151,12 +150,39 @@ def main():
         config.set('chinese.convert_to_traditional', False)
         logger.info('设置为保持简体中文')
     
+    # 设置Word模板
+    if args.template:
+        config.set('document.template', args.template)
+    
+    # 设置docx压缩级别
+    if args.compression:
+        config.set('output.compression', args.compression)
+    
+    # 设置耗时报告目录
+    if args.timing_report:
+        config.set('debug.timing', True)
+        config.set('debug.timing_report_dir', args.timing_report)
+    
+    # 服务模式：不处理--input/--output，由请求指定
+    if args.serve or args.socket:
+        serve(config, args.socket, args.max_concurrency)
+        return
+    
     # 确保输入路径存在
     input_path = Path(args.input)
     if not input_path.exists():
         logger.error(f'输入路径不存在: {input_path}')
         sys.exit(1)
     
+    # 输出到标准输出：只支持单个文件转换
+    if args.output == '-':
+        if args.batch or args.watch or input_path.is_dir():
+            logger.error('只有单个文件转换支持输出到标准输出')
+            sys.exit(1)
+        process_single_file(args.input, args.output, config, not args.no_html)
+        logger.info('转换完成')
+        return
+    
     # 确保输出目录存在
     output_path = Path(args.output)
     output_dir = output_path if output_path.is_dir() else output_path.parent
@@ -168,8 +194,17 @@ def main():
     logger.info('准备处理转换...')
     
     # 处理转换
-    if args.batch or input_path.is_dir():
-        process_batch(args.input, args.output, config, keep_html)
+    if args.watch:
+        if input_path.is_dir() or args.batch:
+            output_file = args.output
+        elif output_path.is_dir():
+            base_name = os.path.splitext(os.path.basename(input_path))[0]
+            output_file = os.path.join(args.output, f"{base_name}.docx")
+        else:
+            output_file = args.output
+        watch(args.input, output_file, config, keep_html)
+    elif args.batch or input_path.is_dir():
+        process_batch(args.input, args.output, config, keep_html, args.jobs, args.incremental)
     else:
         # 如果输出路径是目录，则生成默认输出文件名
         if output_path.is_dir():
@@ -181,6 +216,32 @@ def main():
     
     logger.info('转换完成')
 
+def watch(input_path, output_path, config, keep_html=DEFAULT_KEEP_HTML):
+    """
+    监视输入文件或目录并自动重新转换
+    """
+    from src.modules.converter import Converter
+    from src.modules.watcher import DocumentWatcher
+    
+    # 整个监视期间复用同一个转换器
+    converter = Converter(config.config)
+    try:
+        DocumentWatcher(converter, input_path, output_path, keep_html).run()
+    finally:
+        converter.cleanup()
+
+def serve(config, socket_path=None, max_concurrency=None):
+    """
+    以常驻服务模式运行
+    """
+    from src.modules.server import ConversionServer
+    
+    server = ConversionServer(config.config, max_concurrency)
+    if socket_path:
+        server.serve_unix(socket_path)
+    else:
+        server.serve_stdio()
+
 def process_single_file(input_path, output_path, config, keep_html=DEFAULT_KEEP_HTML):
     """
     处理单个文件
@@ -195,13 +256,21 @@ def process_single_file(input_path, output_path, config, keep_html=DEFAULT_KEEP_
     
     # 进行转换
     try:
+        if output_path == '-':
+            # 转换期间的普通输出改写到标准错误，标准输出只写入docx字节
+            stdout_fd = sys.stdout.fileno()
+            sys.stdout.flush()
+            with contextlib.redirect_stdout(sys.stderr):
+                converter.convert_file(input_path, stdout_fd, keep_html)
+            logger.info('Word文档已写入标准输出')
+            return
         converter.convert_file(input_path, output_path, keep_html)
         logger.info(f'Word文档已生成: {output_path}')
     finally:
         # 清理临时资源
         converter.cleanup()
 
-def process_batch(input_dir, output_dir, config, keep_html=DEFAULT_KEEP_HTML):
+def process_batch(input_dir, output_dir, config, keep_html=DEFAULT_KEEP_HTML, jobs=None, incremental=None):
     """
     批量处理目录
     """
@@ -215,7 +284,7 @@ def process_batch(input_dir, output_dir, config, keep_html=DEFAULT_KEEP_HTML):
     
     try:
         # 进行批量转换
-        results = converter.batch_convert(input_dir, output_dir, keep_html)
+        results = converter.batch_convert(input_dir, output_dir, keep_html, jobs, incremental)
         
         # 计算统计信息
         success_count = sum(1 for v in results.values() if v)
@@ -5,15 +5,29 @@
 World MD - Markdown到Word文档转换工具
 """
 
-# 使用绝对导入替代相对导入
-try:
-    # 当作为包安装时使用
-    from src.modules.converter import Converter
-    from src.config import Config
-except ImportError:
-    # 当在本地直接运行时使用
-    from modules.converter import Converter
-    from config import Config
+import importlib
+
+# 导出的类及其所在的模块，第一次访问时才导入，只读取配置时不必加载整个转换流程
+_EXPORTS = {
+    'Converter': 'modules.converter',
+    'Config': 'config',
+}
+
+def __getattr__(name):
+    """
+    /**
+     * 按需导入导出的类
+     * 
+     * @param {str} name - 属性名
+     * @returns {type} 导出的类
+     */
+    """
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
 
 __version__ = '1.0.0'
 __all__ = ['Converter', 'Config']
@@ -30,12 +44,10 @@ def convert_md_to_word(input_file, output_file, config=None, keep_html=False):
      * @returns {Document} Word文档对象
      */
     """
+    from .config import Config
+    from .modules.converter import Converter
+    
     if config is None:
-        # 使用绝对导入
-        try:
-            from src.config import Config
-        except ImportError:
-            from config import Config
         config = Config().config
     elif isinstance(config, Config):
         config = config.config
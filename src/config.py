@@ -62,8 +62,11 @@ class Config:
             # 中文配置
             'chinese': {
                 'convert_to_traditional': True,
-                'punctuation_spacing': True,
+                'punctuation_spacing': True,  # 删除全角标点两侧多余的空格
                 'auto_spacing': True,  # 自动在中英文之间添加空格
+                'conversion_cache_size': 4096,  # 简繁转换文本片段缓存条目数
+                'backend': 'compiled',         # 简繁转换后端: compiled（预编译词典）, opencc
+                'dictionary_cache_dir': '',    # 预编译词典缓存目录，留空使用 ~/.cache/world_md
             },
             
             # 表格样式配置
@@ -129,6 +132,66 @@ class Config:
                 'header': '',
                 'footer': '',
                 'generate_toc': True,
+                'style_mode': 'direct',        # 格式渲染方式: direct（每个段落和文本直接写入格式）, styles（引用命名样式）
+                'template': '',                # Word模板文件（.dotx/.docx），留空使用默认模板
+            },
+            
+            # 代码块配置
+            'code_blocks': {
+                'rendering': 'text',           # 代码块渲染方式: text（白色纯文本）, tokens（按Pygments词法单元着色）
+                'pygments_style': 'monokai',   # tokens模式的配色方案
+                'token_cache_size': 1024,      # 缓存词法分析结果的代码块数量，0表示不缓存
+                'max_lines_per_cell': 0,       # 超长代码块每个单元格的最大行数，0表示不拆分（tokens模式或缩进代码块）
+            },
+            
+            # 输出配置
+            'output': {
+                'compression': 'default',      # docx压缩级别: stored（不压缩，最快）, fast, default, max（文件最小）
+                'atomic': True,                # 先写临时文件再重命名，输出目录中不会出现写了一半的文档
+            },
+            
+            # 批量处理配置
+            'batch': {
+                'jobs': 1,                     # 并行工作进程数，0表示使用全部CPU核心
+                'incremental': False,          # 是否增量转换，只处理内容、配置或引用图片变化的文件
+            },
+            
+            # 远程图片缓存配置
+            'image_cache': {
+                'enabled': True,               # 是否缓存下载的远程图片
+                'cache_dir': '',               # 缓存目录，留空使用 ~/.cache/world_md/images
+                'max_size_mb': 200,            # 缓存大小上限（MB），超过后淘汰最久未使用的图片，0表示不限制
+                'revalidate_after': 3600,      # 缓存多少秒后向服务器重新验证（ETag/Last-Modified）
+                'timeout': 10,                 # 下载超时时间（秒）
+                'prefetch_workers': 8,         # 并发预取远程图片的线程数
+                'per_host_limit': 4,           # 同一主机的最大并发下载数
+            },
+            
+            # 图片规范化配置（需要安装Pillow）
+            'image_normalize': {
+                'enabled': False,              # 是否在嵌入前按显示宽度缩小并重新压缩图片
+                'dpi': 150,                    # 目标分辨率，图片宽度超过 显示宽度×dpi 时缩小
+                'jpeg_quality': 85,            # JPEG重新压缩质量（1-95）
+                'png_optimize': True,          # PNG是否使用optimize压缩
+                'cache_dir': '',               # 规范化图片缓存目录，留空使用 ~/.cache/world_md/normalized
+            },
+            
+            # HTML解析配置
+            'html': {
+                'parser': 'auto',              # HTML解析器: auto（安装了lxml时使用lxml）, lxml, html.parser
+            },
+            
+            # 监视模式配置
+            'watch': {
+                'interval': 0.25,              # 监视模式的轮询间隔（秒）
+                'debounce': 0.3,               # 文件稳定多少秒后才重新转换
+            },
+            
+            # 服务模式配置
+            'server': {
+                'max_concurrency': 2,          # 服务模式下同时执行的转换数
+                'max_pending': 16,             # 等待执行的请求数上限，超出时返回服务繁忙错误
+                'max_converters': 4,           # 保留的空闲转换器数，按配置指纹复用
             },
             
             # 调试配置
@@ -140,6 +203,7 @@ class Config:
                 'print_html_structure': False, # 是否打印HTML结构
                 'verbose_element_info': False, # 是否打印详细的元素信息
                 'timing': True,                # 是否输出处理时间统计
+                'timing_report_dir': '',       # 耗时JSON报告目录，为空则只输出日志
             },
         }
     
@@ -64,6 +64,8 @@ def parse_args():
     parser.add_argument('--simplified', '-s', action='store_true', help='保持简体中文')
     parser.add_argument('--debug', '-d', action='store_true', help='启用调试模式')
     parser.add_argument('--no-html', '-n', action='store_true', help='不保留中间HTML文件')
+    parser.add_argument('--jobs', '-j', type=int, help='批量处理时的并行进程数（0表示使用全部CPU核心，默认读取配置batch.jobs）')
+    parser.add_argument('--incremental', action='store_true', default=None, help='批量处理时只转换发生变化的文件，并删除源文件已不存在的输出')
     return parser.parse_args()
 
 def find_config_file():
@@ -116,7 +118,7 @@ def process_single_file(input_path, output_path, config, keep_html=DEFAULT_KEEP_
         # 清理临时资源
         converter.cleanup()
 
-def process_batch(input_dir, output_dir, config, keep_html=DEFAULT_KEEP_HTML):
+def process_batch(input_dir, output_dir, config, keep_html=DEFAULT_KEEP_HTML, jobs=None, incremental=None):
     """
     /**
      * 批量处理目录中的Markdown文件
@@ -125,6 +127,8 @@ def process_batch(input_dir, output_dir, config, keep_html=DEFAULT_KEEP_HTML):
      * @param {str} output_dir - 输出目录路径
      * @param {Config} config - 配置对象
      * @param {bool} keep_html - 是否保留中间HTML文件
+     * @param {Optional[int]} jobs - 并行进程数，None表示读取配置
+     * @param {Optional[bool]} incremental - 是否增量转换，None表示读取配置
      */
     """
     logger = logging.getLogger('process_batch')
@@ -135,7 +139,7 @@ def process_batch(input_dir, output_dir, config, keep_html=DEFAULT_KEEP_HTML):
     
     try:
         # 进行批量转换
-        results = converter.batch_convert(input_dir, output_dir, keep_html)
+        results = converter.batch_convert(input_dir, output_dir, keep_html, jobs, incremental)
         
         # 计算统计信息
         success_count = sum(1 for v in results.values() if v)
@@ -209,7 +213,7 @@ def main():
     
     # 处理转换
     if args.batch or input_path.is_dir():
-        process_batch(args.input, args.output, config, keep_html)
+        process_batch(args.input, args.output, config, keep_html, args.jobs, args.incremental)
     else:
         # 如果输出路径是目录，则生成默认输出文件名
         if output_path.is_dir():
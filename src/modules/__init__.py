@@ -3,25 +3,30 @@ World MD 模块包
 提供Markdown到Word文档转换功能
 """
 
-# 使用try-except处理不同的导入场景
-try:
-    # 相对导入（作为包的一部分被导入时）
-    from .converter import Converter
-    from .markdown_to_html import MarkdownToHtml
-    from .html_to_word import HtmlToWordConverter
-    from .html_elements_processor import HtmlElementsProcessor
-except ImportError:
-    # 绝对导入（直接运行时）
-    try:
-        from src.modules.converter import Converter
-        from src.modules.markdown_to_html import MarkdownToHtml
-        from src.modules.html_to_word import HtmlToWordConverter
-        from src.modules.html_elements_processor import HtmlElementsProcessor
-    except ImportError:
-        # 当前目录导入
-        from converter import Converter
-        from markdown_to_html import MarkdownToHtml
-        from html_to_word import HtmlToWordConverter
-        from html_elements_processor import HtmlElementsProcessor
+import importlib
 
-__all__ = ['Converter', 'MarkdownToHtml', 'HtmlToWordConverter', 'HtmlElementsProcessor'] 
\ No newline at end of file
+# 导出的类及其所在的子模块，第一次访问时才导入，只使用单个子模块时不必加载整个转换流程
+_EXPORTS = {
+    'Converter': 'converter',
+    'MarkdownToHtml': 'markdown_to_html',
+    'HtmlToWordConverter': 'html_to_word',
+    'HtmlElementsProcessor': 'html_elements_processor',
+}
+
+def __getattr__(name):
+    """
+    /**
+     * 按需导入导出的类
+     * 
+     * @param {str} name - 属性名
+     * @returns {type} 导出的类
+     */
+    """
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+__all__ = ['Converter', 'MarkdownToHtml', 'HtmlToWordConverter', 'HtmlElementsProcessor']
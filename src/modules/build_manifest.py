@@ -0,0 +1,281 @@
+"""
+增量构建清单模块
+记录批量转换中每个源文件的内容摘要，用于跳过未变化的文件
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+from typing import Dict, Any, Optional, List, Iterable
+
+# 清单文件名，保存在输出目录中
+MANIFEST_FILENAME = '.world_md_manifest.json'
+
+# 清单格式版本，格式变化时递增以使旧清单失效
+MANIFEST_VERSION = 1
+
+# 不影响转换结果的配置节，计算配置指纹时忽略
+_NON_OUTPUT_CONFIG_KEYS = ('batch', 'debug')
+
+# Markdown图片语法与HTML img标签
+_MD_IMAGE_PATTERN = re.compile(r'!\[[^\]]*\]\(\s*<?([^)\s>]+)')
+_HTML_IMAGE_PATTERN = re.compile(r'<img\b[^>]*?\bsrc\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+
+def config_fingerprint(config: Dict[str, Any], exclude: Iterable[str] = _NON_OUTPUT_CONFIG_KEYS) -> str:
+    """
+    /**
+     * 计算配置指纹
+     *
+     * 默认忽略不影响转换结果的配置节（批量处理、调试），用于判断输出是否需要重新生成；
+     * 需要区分全部配置时（如服务模式按配置复用转换器）传入空的exclude
+     *
+     * @param {Dict[str, Any]} config - 配置参数字典
+     * @param {Iterable[str]} exclude - 计算时忽略的顶级配置节
+     * @returns {str} 配置的SHA-256摘要
+     */
+    """
+    exclude = frozenset(exclude)
+    effective = {k: v for k, v in config.items() if k not in exclude}
+    payload = json.dumps(effective, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def find_image_references(md_content: str) -> List[str]:
+    """
+    /**
+     * 查找Markdown内容中引用的图片地址
+     *
+     * @param {str} md_content - Markdown文本
+     * @returns {List[str]} 图片地址列表，按出现顺序去重
+     */
+    """
+    refs = _MD_IMAGE_PATTERN.findall(md_content) + _HTML_IMAGE_PATTERN.findall(md_content)
+    return list(dict.fromkeys(refs))
+
+def image_candidates(src: str, search_dirs: Iterable[str], base_dir: Optional[str] = None) -> List[str]:
+    """
+    /**
+     * 按图片处理器的查找顺序列出本地图片可能的路径
+     *
+     * @param {str} src - 图片地址
+     * @param {Iterable[str]} search_dirs - 配置中的图片搜索目录
+     * @param {Optional[str]} base_dir - Markdown文件所在目录
+     * @returns {List[str]} 候选路径列表，远程地址返回空列表
+     */
+    """
+    if src.startswith(('http://', 'https://')):
+        return []
+    candidates = [src]
+    candidates.extend(os.path.join(d, src) for d in search_dirs)
+    if base_dir:
+        candidates.append(os.path.join(base_dir, src))
+    return candidates
+
+def resolve_image_path(src: str, search_dirs: Iterable[str], base_dir: Optional[str] = None) -> Optional[str]:
+    """
+    /**
+     * 按图片处理器的查找顺序解析本地图片路径
+     *
+     * @param {str} src - 图片地址
+     * @param {Iterable[str]} search_dirs - 配置中的图片搜索目录
+     * @param {Optional[str]} base_dir - Markdown文件所在目录
+     * @returns {Optional[str]} 找到的本地文件路径，远程地址或找不到时返回None
+     */
+    """
+    for path in image_candidates(src, search_dirs, base_dir):
+        if os.path.isfile(path):
+            return path
+    return None
+
+def _file_digest(path: str) -> str:
+    """
+    /**
+     * 计算文件内容的SHA-256摘要
+     *
+     * @param {str} path - 文件路径
+     * @returns {str} 十六进制摘要
+     */
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """
+    /**
+     * 增量构建清单
+     *
+     * 将每个源文件（相对路径）映射到其内容、有效配置（包括是否保留HTML）和所引用图片的组合摘要，
+     * 以及对应的输出文件，用于判断文件是否需要重新转换
+     */
+    """
+
+    def __init__(self, output_dir: str, config: Dict[str, Any], keep_html: bool = False):
+        """
+        /**
+         * 初始化构建清单
+         *
+         * @param {str} output_dir - 输出目录，清单文件保存在该目录中
+         * @param {Dict[str, Any]} config - 配置参数字典
+         * @param {bool} keep_html - 是否保留中间HTML文件，变化时需要重新转换以生成或不再生成HTML文件
+         */
+        """
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, MANIFEST_FILENAME)
+        self.config_hash = config_fingerprint(dict(config, keep_html=keep_html))
+        self.search_dirs = config.get('images', {}).get('search_dirs', [])
+        self.entries: Dict[str, Dict[str, str]] = {}
+        self._image_digests: Dict[str, str] = {}
+        self.logger = logging.getLogger('BuildManifest')
+
+    def load(self) -> 'BuildManifest':
+        """
+        /**
+         * 从输出目录加载清单，清单不存在或版本不符时视为空清单
+         *
+         * @returns {BuildManifest} 当前清单对象
+         */
+        """
+        self.entries = {}
+        if not os.path.exists(self.path):
+            return self
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                self.entries = data.get('files', {})
+            else:
+                self.logger.info(f"清单版本不匹配，将全部重新转换: {self.path}")
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"读取构建清单失败，将全部重新转换: {e}")
+        return self
+
+    def save(self):
+        """
+        /**
+         * 保存清单到输出目录，先写临时文件再替换，避免留下损坏的清单
+         */
+        """
+        data = {
+            'version': MANIFEST_VERSION,
+            'files': dict(sorted(self.entries.items())),
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def source_hash(self, file_path: str) -> str:
+        """
+        /**
+         * 计算源文件的组合摘要：文件内容、配置指纹和所引用的图片
+         *
+         * @param {str} file_path - Markdown文件路径
+         * @returns {str} 十六进制摘要
+         */
+        """
+        with open(file_path, 'rb') as f:
+            content = f.read()
+
+        digest = hashlib.sha256()
+        digest.update(content)
+        digest.update(self.config_hash.encode('ascii'))
+
+        md_content = content.decode('utf-8', errors='replace')
+        base_dir = os.path.dirname(file_path)
+        for src in find_image_references(md_content):
+            digest.update(b'\0' + src.encode('utf-8') + b'\0')
+            image_path = resolve_image_path(src, self.search_dirs, base_dir)
+            if image_path:
+                digest.update(self._image_digest(image_path).encode('ascii'))
+
+        return digest.hexdigest()
+
+    def _image_digest(self, image_path: str) -> str:
+        """
+        /**
+         * 获取图片内容摘要，同一批次中共享的图片只计算一次
+         *
+         * @param {str} image_path - 图片文件路径
+         * @returns {str} 十六进制摘要
+         */
+        """
+        key = os.path.abspath(image_path)
+        if key not in self._image_digests:
+            self._image_digests[key] = _file_digest(image_path)
+        return self._image_digests[key]
+
+    def forget_image(self, image_path: str):
+        """
+        /**
+         * 丢弃已计算的图片摘要，图片修改后需要重新计算
+         *
+         * @param {str} image_path - 图片文件路径
+         */
+        """
+        self._image_digests.pop(os.path.abspath(image_path), None)
+
+    def is_up_to_date(self, rel_path: str, source_hash: str, output_file: str) -> bool:
+        """
+        /**
+         * 判断源文件是否无需重新转换
+         *
+         * @param {str} rel_path - 源文件相对路径
+         * @param {str} source_hash - 当前组合摘要
+         * @param {str} output_file - 输出文件路径
+         * @returns {bool} 摘要未变化且输出文件存在时返回True
+         */
+        """
+        entry = self.entries.get(rel_path)
+        return bool(entry) and entry.get('hash') == source_hash and os.path.exists(output_file)
+
+    def record(self, rel_path: str, source_hash: str, output_file: str):
+        """
+        /**
+         * 记录转换成功的文件
+         *
+         * @param {str} rel_path - 源文件相对路径
+         * @param {str} source_hash - 组合摘要
+         * @param {str} output_file - 输出文件路径
+         */
+        """
+        self.entries[rel_path] = {
+            'hash': source_hash,
+            'output': os.path.relpath(output_file, self.output_dir),
+        }
+
+    def forget(self, rel_path: str):
+        """
+        /**
+         * 移除文件记录，下次构建时会重新转换
+         *
+         * @param {str} rel_path - 源文件相对路径
+         */
+        """
+        self.entries.pop(rel_path, None)
+
+    def remove_stale(self, current_sources: Iterable[str]) -> List[str]:
+        """
+        /**
+         * 删除源文件已不存在的输出文件，并移除对应记录
+         *
+         * @param {Iterable[str]} current_sources - 当前存在的源文件相对路径
+         * @returns {List[str]} 被删除的输出文件路径列表
+         */
+        """
+        current = set(current_sources)
+        removed = []
+        for rel_path in sorted(set(self.entries) - current):
+            entry = self.entries.pop(rel_path)
+            output_file = os.path.join(self.output_dir, entry.get('output', ''))
+            if entry.get('output') and os.path.isfile(output_file):
+                try:
+                    os.remove(output_file)
+                    removed.append(output_file)
+                except OSError as e:
+                    self.logger.warning(f"删除过期输出文件失败: {output_file}: {e}")
+        return removed
@@ -0,0 +1,397 @@
+"""
+简繁转换后端模块
+提供可替换的中文转换后端，包括opencc-python-reimplemented和预编译词典后端
+"""
+
+import os
+import re
+import json
+import marshal
+import hashlib
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Optional, List, Tuple
+
+# 预编译词典格式版本，格式或匹配规则变化时递增
+COMPILED_FORMAT_VERSION = 2
+
+# 可选的转换后端名称
+BACKEND_OPENCC = 'opencc'
+BACKEND_COMPILED = 'compiled'
+
+# 与opencc-python-reimplemented相同的分句符，分句符不会出现在词典条目中
+_SPLIT_CHARS_RE = re.compile(
+    r'(\s+|-|,|\.|\?|!|\*|　|，|。|、|；|：|？|！|…|“|”|‘|’|『|』|「|」|﹁|﹂|—|－|（|）|《|》|〈|〉|～|．|／|＼|︒|︑|︔|︓|︿|﹀|︹|︺|︙|︐|［|﹇|］|﹈|︕|︖|︰|︳|︴|︽|︾|︵|︶|｛|︷|｝|︸|﹃|﹄|【|︻|】|︼)')
+
+# 词典表：(条目字典, 最大键长)。条目字典同时保存键的所有前缀，前缀对应的值为None
+DictTable = Tuple[Dict[str, Optional[str]], int]
+
+# 进程内已加载的预编译词典，同一进程中的多个转换器共享
+_loaded_tables: Dict[str, Tuple[List[List[DictTable]], bool]] = {}
+_loaded_tables_lock = threading.Lock()
+
+def _default_cache_dir() -> str:
+    """
+    /**
+     * 获取默认缓存目录
+     *
+     * @returns {str} 缓存目录路径
+     */
+    """
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'world_md')
+
+
+class ChineseConverterBackend(ABC):
+    """
+    /**
+     * 中文转换后端基类
+     */
+    """
+
+    name = ''
+
+    @abstractmethod
+    def convert(self, text: str) -> str:
+        """
+        /**
+         * 转换文本
+         *
+         * @param {str} text - 待转换文本
+         * @returns {str} 转换后的文本
+         */
+        """
+        pass
+
+
+class OpenCCBackend(ChineseConverterBackend):
+    """
+    /**
+     * 基于opencc-python-reimplemented的转换后端
+     */
+    """
+
+    name = BACKEND_OPENCC
+
+    def __init__(self, conversion: str):
+        """
+        /**
+         * 初始化OpenCC转换后端
+         *
+         * @param {str} conversion - OpenCC转换配置名，例如s2t
+         */
+        """
+        import opencc
+        self._cc = opencc.OpenCC(conversion)
+
+    def convert(self, text: str) -> str:
+        return self._cc.convert(text)
+
+
+class CompiledDictBackend(ChineseConverterBackend):
+    """
+    /**
+     * 预编译词典转换后端
+     *
+     * 从OpenCC的文本词典编译出扁平的前缀表，用marshal格式缓存到磁盘，
+     * 之后的进程只需读取缓存文件。匹配规则与opencc-python-reimplemented完全一致：
+     * 每个分句内先取最长（同长取最左）的词典条目，再分别处理其左右两侧，
+     * 词典组中前一个词典未匹配的部分才交给后一个词典
+     */
+    """
+
+    name = BACKEND_COMPILED
+
+    def __init__(self, conversion: str, cache_dir: Optional[str] = None):
+        """
+        /**
+         * 初始化预编译词典转换后端
+         *
+         * @param {str} conversion - OpenCC转换配置名，例如s2t
+         * @param {Optional[str]} cache_dir - 预编译词典缓存目录，为None时使用默认缓存目录
+         */
+        """
+        self.conversion = conversion
+        self.cache_dir = cache_dir or _default_cache_dir()
+        self.logger = logging.getLogger('CompiledDictBackend')
+        self.chain, self.ascii_passthrough = self._load_chain()
+
+    def _load_chain(self) -> Tuple[List[List[DictTable]], bool]:
+        """
+        /**
+         * 加载转换链，优先使用进程内缓存和磁盘上的预编译文件
+         *
+         * @returns {Tuple[List[List[DictTable]], bool]} (转换链, 纯ASCII文本是否可直接跳过)，
+         *          转换链每一步是一组按顺序尝试的词典表
+         */
+        """
+        chain_files = _resolve_opencc_chain(self.conversion)
+        digest = _source_digest(chain_files)
+        cache_file = os.path.join(self.cache_dir, f"opencc-{self.conversion}-{digest[:16]}.marshal")
+
+        with _loaded_tables_lock:
+            chain = _loaded_tables.get(cache_file)
+            if chain is not None:
+                return chain
+
+            chain = self._read_compiled(cache_file, digest)
+            if chain is None:
+                tables = [[_compile_dictionary(path) for path in group] for group in chain_files]
+                # 词典中没有包含ASCII字符的条目时，纯ASCII分句可以直接跳过
+                ascii_passthrough = not any(
+                    char.isascii() for group in tables for entries, _ in group for key in entries for char in key
+                )
+                chain = (tables, ascii_passthrough)
+                self._write_compiled(cache_file, digest, chain)
+            _loaded_tables[cache_file] = chain
+            return chain
+
+    def _read_compiled(self, cache_file: str, digest: str) -> Optional[Tuple[List[List[DictTable]], bool]]:
+        """
+        /**
+         * 读取预编译词典文件
+         *
+         * @param {str} cache_file - 缓存文件路径
+         * @param {str} digest - 源词典摘要
+         * @returns {Optional[Tuple[List[List[DictTable]], bool]]} 转换链，文件不存在或无效时返回None
+         */
+        """
+        try:
+            # 整体读入后再反序列化，比直接从文件对象读取快得多
+            with open(cache_file, 'rb') as f:
+                data = marshal.loads(f.read())
+            if not isinstance(data, dict):
+                raise ValueError('预编译词典格式错误')
+            if data.get('version') == COMPILED_FORMAT_VERSION and data.get('digest') == digest:
+                tables = [[tuple(table) for table in group] for group in data['chain']]
+                return tables, data['ascii_passthrough']
+        except FileNotFoundError:
+            pass
+        except (OSError, EOFError, ValueError, TypeError, KeyError) as e:
+            self.logger.warning(f"预编译词典无效，将重新编译: {cache_file}: {e}")
+        return None
+
+    def _write_compiled(self, cache_file: str, digest: str, chain: Tuple[List[List[DictTable]], bool]):
+        """
+        /**
+         * 写入预编译词典文件，先写临时文件再替换，保证并发进程不会读到半个文件
+         *
+         * @param {str} cache_file - 缓存文件路径
+         * @param {str} digest - 源词典摘要
+         * @param {Tuple[List[List[DictTable]], bool]} chain - (转换链, 纯ASCII文本是否可直接跳过)
+         */
+        """
+        tables, ascii_passthrough = chain
+        data = {
+            'version': COMPILED_FORMAT_VERSION,
+            'digest': digest,
+            'chain': [[list(table) for table in group] for group in tables],
+            'ascii_passthrough': ascii_passthrough,
+        }
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_file, 'wb') as f:
+                marshal.dump(data, f)
+            os.replace(tmp_file, cache_file)
+            self.logger.info(f"已生成预编译词典: {cache_file}")
+        except OSError as e:
+            # 缓存目录不可写时仍可使用内存中的词典
+            self.logger.warning(f"写入预编译词典失败: {e}")
+
+    def convert(self, text: str) -> str:
+        """
+        /**
+         * 转换文本
+         *
+         * @param {str} text - 待转换文本
+         * @returns {str} 转换后的文本
+         */
+        """
+        if self.ascii_passthrough and text.isascii():
+            return text
+        parts = _SPLIT_CHARS_RE.split(text)
+        for i in range(0, len(parts), 2):
+            segment = parts[i]
+            if segment and not (self.ascii_passthrough and segment.isascii()):
+                for group in self.chain:
+                    segment = _convert_with_group(segment, group)
+                parts[i] = segment
+        return ''.join(parts)
+
+
+def _resolve_opencc_chain(conversion: str) -> List[List[str]]:
+    """
+    /**
+     * 解析OpenCC配置文件中的转换链
+     *
+     * @param {str} conversion - OpenCC转换配置名
+     * @returns {List[List[str]]} 转换链，每一步是一组词典文件路径
+     */
+    """
+    import opencc
+    package_dir = os.path.dirname(opencc.__file__)
+    config_file = os.path.join(package_dir, 'config', f"{conversion}.json")
+    with open(config_file, encoding='utf-8') as f:
+        setting = json.load(f)
+
+    def collect(dict_config: Dict[str, Any]) -> List[str]:
+        if dict_config.get('type') == 'group':
+            files = []
+            for item in dict_config.get('dicts', []):
+                files.extend(collect(item))
+            return files
+        return [os.path.join(package_dir, 'dictionary', dict_config.get('file'))]
+
+    return [collect(step.get('dict')) for step in setting.get('conversion_chain', [])]
+
+def _source_digest(chain_files: List[List[str]]) -> str:
+    """
+    /**
+     * 计算源词典的摘要，词典更新后自动重新编译
+     *
+     * @param {List[List[str]]} chain_files - 转换链词典文件
+     * @returns {str} 十六进制摘要
+     */
+    """
+    digest = hashlib.sha256(str(COMPILED_FORMAT_VERSION).encode('ascii'))
+    for group in chain_files:
+        digest.update(b'|')
+        for path in group:
+            stat = os.stat(path)
+            digest.update(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns};".encode('utf-8'))
+    return digest.hexdigest()
+
+def _compile_dictionary(path: str) -> DictTable:
+    """
+    /**
+     * 将OpenCC文本词典编译为前缀表
+     *
+     * @param {str} path - 词典文件路径
+     * @returns {DictTable} (条目字典, 最大键长)
+     */
+    """
+    mapping = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            key, value = line.strip().split('\t')
+            # 一对多的条目与OpenCC一样取第一个
+            mapping[key] = value.split(' ')[0]
+
+    entries: Dict[str, Optional[str]] = {}
+    max_len = 1
+    for key, value in mapping.items():
+        max_len = max(max_len, len(key))
+        for end in range(1, len(key)):
+            entries.setdefault(key[:end], None)
+        entries[key] = value
+    return entries, max_len
+
+def _convert_with_group(text: str, group: List[DictTable]) -> str:
+    """
+    /**
+     * 使用一组词典转换一个分句
+     *
+     * @param {str} text - 分句文本
+     * @param {List[DictTable]} group - 按顺序尝试的词典表
+     * @returns {str} 转换后的文本
+     */
+    """
+    # 已确定的片段：起始位置 -> 替换文本
+    pieces: Dict[int, str] = {}
+    pending = [(0, len(text))]
+
+    for entries, max_len in group:
+        if max_len == 1:
+            # 单字词典不存在重叠匹配，逐字替换与最长匹配结果相同，未匹配的字符留给下一个词典
+            unmatched = []
+            for lo, hi in pending:
+                run_start = lo
+                for i in range(lo, hi):
+                    value = entries.get(text[i])
+                    if value is not None:
+                        pieces[i] = value
+                        if run_start < i:
+                            unmatched.append((run_start, i))
+                        run_start = i + 1
+                if run_start < hi:
+                    unmatched.append((run_start, hi))
+            pending = unmatched
+            continue
+        match_lengths = _match_lengths(text, pending, entries, max_len)
+        unmatched = []
+        stack = list(pending)
+        while stack:
+            lo, hi = stack.pop()
+            best_start, best_len = -1, 0
+            for i in range(lo, hi):
+                # 每个位置取能放进当前区间的最长条目，同长时保留更靠左的位置
+                for length in match_lengths.get(i, ()):
+                    if i + length <= hi:
+                        if length > best_len:
+                            best_start, best_len = i, length
+                        break
+            if best_len == 0:
+                unmatched.append((lo, hi))
+                continue
+            pieces[best_start] = entries[text[best_start:best_start + best_len]]
+            if best_start > lo:
+                stack.append((lo, best_start))
+            if best_start + best_len < hi:
+                stack.append((best_start + best_len, hi))
+        pending = unmatched
+
+    for lo, hi in pending:
+        pieces[lo] = text[lo:hi]
+    return ''.join(pieces[start] for start in sorted(pieces))
+
+def _match_lengths(text: str, ranges: List[Tuple[int, int]], entries: Dict[str, Optional[str]],
+                   max_len: int) -> Dict[int, List[int]]:
+    """
+    /**
+     * 计算每个位置可匹配的词典条目长度
+     *
+     * @param {str} text - 分句文本
+     * @param {List[Tuple[int, int]]} ranges - 待匹配的区间
+     * @param {Dict[str, Optional[str]]} entries - 条目字典
+     * @param {int} max_len - 最大键长
+     * @returns {Dict[int, List[int]]} 位置 -> 可匹配长度列表（从长到短）
+     */
+    """
+    result = {}
+    for lo, hi in ranges:
+        for i in range(lo, hi):
+            lengths = []
+            limit = min(hi - i, max_len)
+            length = 1
+            while length <= limit:
+                value = entries.get(text[i:i + length], entries)
+                if value is entries:
+                    # 不是任何条目的前缀，更长的子串也不可能匹配
+                    break
+                if value is not None:
+                    lengths.append(length)
+                length += 1
+            if lengths:
+                lengths.reverse()
+                result[i] = lengths
+    return result
+
+def create_chinese_converter(conversion: str, backend: str = BACKEND_COMPILED,
+                             cache_dir: Optional[str] = None) -> ChineseConverterBackend:
+    """
+    /**
+     * 创建中文转换后端
+     *
+     * @param {str} conversion - OpenCC转换配置名，例如s2t
+     * @param {str} backend - 后端名称：compiled或opencc
+     * @param {Optional[str]} cache_dir - 预编译词典缓存目录
+     * @returns {ChineseConverterBackend} 转换后端
+     */
+    """
+    if backend == BACKEND_OPENCC:
+        return OpenCCBackend(conversion)
+    if backend == BACKEND_COMPILED:
+        return CompiledDictBackend(conversion, cache_dir)
+    raise ValueError(f"未知的中文转换后端: {backend}")
@@ -4,8 +4,10 @@
 """
 
 import os
+import time
 import codecs
-from typing import Dict, Any, Optional, List, Union
+import logging
+from typing import Dict, Any, Optional, List, Union, Tuple
 from docx import Document
 
 # 使用try-except处理不同的导入场景
@@ -13,18 +15,24 @@ try:
     # 相对导入（作为包的一部分被导入时）
     from .markdown_to_html import MarkdownToHtml
     from .html_to_word import HtmlToWordConverter
-    from .html_elements_processor import HtmlElementsProcessor
+    from .html_to_word.docx_writer import STDOUT, Target
+    from .build_manifest import BuildManifest
+    from . import timing
 except ImportError:
     try:
         # 绝对导入
         from src.modules.markdown_to_html import MarkdownToHtml
         from src.modules.html_to_word import HtmlToWordConverter
-        from src.modules.html_elements_processor import HtmlElementsProcessor
+        from src.modules.html_to_word.docx_writer import STDOUT, Target
+        from src.modules.build_manifest import BuildManifest
+        from src.modules import timing
     except ImportError:
         # 从当前目录导入
         from markdown_to_html import MarkdownToHtml
         from html_to_word import HtmlToWordConverter
-        from html_elements_processor import HtmlElementsProcessor
+        from html_to_word.docx_writer import STDOUT, Target
+        from build_manifest import BuildManifest
+        import timing
 
 class Converter:
     """
@@ -47,15 +55,21 @@ class Converter:
         self.config = config
         self.md_to_html = MarkdownToHtml(config)
         self.html_to_word = HtmlToWordConverter(config)
-        self.html_processor = HtmlElementsProcessor(config)
+        self.logger = logging.getLogger('Converter')
         
-    def convert_file(self, input_file: str, output_file: str, keep_html: bool = False) -> Document:
+        # 耗时统计：启用后记录每个文件各阶段和各元素处理器的耗时，配置了报告目录时写入JSON报告
+        debug_config = config.get('debug', {})
+        self.timing_enabled = debug_config.get('timing', False)
+        self.timing_report_dir = debug_config.get('timing_report_dir', '')
+        self.last_timing_report: Optional[Dict[str, Any]] = None
+        
+    def convert_file(self, input_file: str, output_file: Target, keep_html: bool = False) -> Document:
         """
         /**
          * 转换单个Markdown文件为Word文档
          * 
          * @param {str} input_file - 输入Markdown文件路径
-         * @param {str} output_file - 输出Word文件路径
+         * @param {Target} output_file - 输出Word文件路径、'-'（标准输出）、文件描述符或可写的二进制流
          * @param {bool} keep_html - 是否保留中间HTML文件
          * @returns {Document} 生成的Word文档对象
          */
@@ -72,42 +86,43 @@ class Converter:
             os.makedirs(html_dir, exist_ok=True)
             html_file = os.path.join(html_dir, f"{base_name}.html")
             
-        # 转换Markdown到HTML
-        html_content = self.md_to_html.convert_file(input_file, html_file)
-        
-        # 转换HTML到Word
-        if html_file:
-            doc = self.html_to_word.convert_file(html_file, output_file)
-        else:
-            doc = self.html_to_word.convert_html(html_content)
-            doc.save(output_file)
+        doc, report = self._convert_document(input_file, output_file, html_file)
+        if report is not None and self.timing_report_dir:
+            # 输出到标准输出或流时按输入文件命名报告
+            if isinstance(output_file, str) and output_file != STDOUT:
+                report_name = os.path.basename(output_file)
+            else:
+                report_name = f"{os.path.splitext(os.path.basename(input_file))[0]}.docx"
+            report_file = os.path.join(self.timing_report_dir, f"{report_name}.timing.json")
+            timing.write_report(report_file, report)
             
         return doc
         
-    def convert_text(self, md_content: str, output_file: Optional[str] = None) -> Union[str, Document]:
+    def convert_text(self, md_content: str, output_file: Optional[Target] = None) -> Union[str, Document]:
         """
         /**
          * 转换Markdown文本内容
          * 
          * @param {str} md_content - Markdown格式的文本
-         * @param {Optional[str]} output_file - 输出Word文件路径，如果不提供则不保存文件
+         * @param {Optional[Target]} output_file - 输出Word文件路径、文件描述符或可写的二进制流，如果不提供则不保存文件
          * @returns {Union[str, Document]} 如果提供output_file则返回Document对象，否则返回HTML内容
          */
         """
-        # 转换Markdown到HTML
-        html_content = self.md_to_html.convert_text(md_content)
+        # 转换Markdown到HTML文档树
+        soup = self.md_to_html.convert_to_soup(md_content)
         
         # 如果没有指定输出文件，直接返回HTML内容
-        if not output_file:
-            return html_content
+        if output_file is None or output_file == '':
+            return str(soup)
             
         # 转换HTML到Word并保存
-        doc = self.html_to_word.convert_html(html_content)
-        doc.save(output_file)
+        doc = self.html_to_word.convert_html(soup)
+        self.html_to_word.save(doc, output_file)
         
         return doc
         
-    def batch_convert(self, input_dir: str, output_dir: str, keep_html: bool = False) -> Dict[str, bool]:
+    def batch_convert(self, input_dir: str, output_dir: str, keep_html: bool = False,
+                      jobs: Optional[int] = None, incremental: Optional[bool] = None) -> Dict[str, bool]:
         """
         /**
          * 批量转换目录中的Markdown文件
@@ -115,7 +130,9 @@ class Converter:
          * @param {str} input_dir - 输入目录路径
          * @param {str} output_dir - 输出目录路径
          * @param {bool} keep_html - 是否保留中间HTML文件
-         * @returns {Dict[str, bool]} 文件转换结果字典，键为文件名，值为转换是否成功
+         * @param {Optional[int]} jobs - 并行工作进程数，None表示使用配置batch.jobs，0表示使用全部CPU核心
+         * @param {Optional[bool]} incremental - 是否增量转换，None表示使用配置batch.incremental
+         * @returns {Dict[str, bool]} 文件转换结果字典，键为文件名，值为转换是否成功（跳过的文件视为成功）
          */
         """
         if not os.path.exists(input_dir):
@@ -132,12 +149,108 @@ class Converter:
             os.makedirs(html_dir, exist_ok=True)
             
         # 查找所有Markdown文件
-        results = {}
         files = self._find_markdown_files(input_dir)
+        tasks = self._build_batch_tasks(files, input_dir, output_dir, html_dir)
+        total_files = len(tasks)
+        
+        # 增量模式下只转换内容、配置或引用图片发生变化的文件
+        if incremental is None:
+            incremental = self.config.get('batch', {}).get('incremental', False)
+        manifest = None
+        source_hashes = {}
+        pending = tasks
+        if incremental:
+            manifest = BuildManifest(output_dir, self.config, keep_html).load()
+            for removed in manifest.remove_stale(task[0] for task in tasks):
+                print(f"删除过期输出: {removed}")
+            pending = []
+            for task in tasks:
+                rel_path, file_path, output_file, _ = task
+                try:
+                    source_hashes[rel_path] = manifest.source_hash(file_path)
+                except OSError:
+                    source_hashes[rel_path] = None
+                if not manifest.is_up_to_date(rel_path, source_hashes[rel_path], output_file):
+                    pending.append(task)
+            print(f"增量模式: 共 {total_files} 个文件, 需要转换 {len(pending)} 个, 跳过 {total_files - len(pending)} 个未变化的文件")
+        
+        # 确定工作进程数
+        jobs = self._resolve_jobs(jobs, len(pending))
         
         # 转换每个文件
-        total_files = len(files)
-        for idx, file_path in enumerate(files, 1):
+        batch_start = time.perf_counter()
+        if jobs > 1:
+            print(f"使用 {jobs} 个工作进程并行转换 {len(pending)} 个文件")
+            outcomes, reports = self._run_parallel(pending, jobs)
+        else:
+            outcomes, reports = self._run_sequential(pending)
+        batch_wall = time.perf_counter() - batch_start
+        
+        # 按文件顺序汇总结果，保证输出与完成顺序无关，未变化的文件视为成功
+        converted = {task[0]: success for task, success in zip(pending, outcomes)}
+        results = {}
+        for rel_path, _, output_file, _ in tasks:
+            results[rel_path] = converted.get(rel_path, True)
+            if manifest is not None and rel_path in converted:
+                if converted[rel_path] and source_hashes[rel_path]:
+                    manifest.record(rel_path, source_hashes[rel_path], output_file)
+                else:
+                    manifest.forget(rel_path)
+        
+        if manifest is not None:
+            manifest.save()
+                
+        # 输出统计信息
+        success_count = sum(1 for v in results.values() if v)
+        print(f"\n转换完成: 共 {total_files} 个文件, 成功 {success_count} 个, 失败 {total_files - success_count} 个")
+        
+        if self.timing_enabled:
+            self._report_batch_timing(pending, reports, batch_wall)
+        
+        return results
+    
+    def _report_batch_timing(self, tasks: List[Tuple[str, str, str, Optional[str]]],
+                             reports: List[Optional[Dict[str, Any]]], batch_wall: float):
+        """
+        /**
+         * 汇总批量转换的耗时，配置了报告目录时写入每个文件的报告和汇总报告
+         * 
+         * @param {List[Tuple[str, str, str, Optional[str]]]} tasks - 已执行的任务列表
+         * @param {List[Optional[Dict[str, Any]]]} reports - 与任务顺序一致的耗时报告，失败的文件为None
+         * @param {float} batch_wall - 批量转换实际经过的墙钟时间（秒）
+         */
+        """
+        completed = [(task, report) for task, report in zip(tasks, reports) if report is not None]
+        summary = timing.aggregate((report for _, report in completed), wall=batch_wall)
+        print(f"耗时统计: {len(completed)} 个文件, 实际耗时 {batch_wall:.3f}秒, 各文件{timing.aggregate_summary(summary)}")
+        
+        if self.timing_report_dir:
+            for (rel_path, _, _, _), report in completed:
+                timing.write_report(os.path.join(self.timing_report_dir, f"{rel_path}.timing.json"), report)
+            summary_file = os.path.join(self.timing_report_dir, 'batch.timing.json')
+            timing.write_report(summary_file, summary)
+            print(f"耗时报告已写入: {summary_file}")
+    
+    def _build_batch_tasks(self, files: List[str], input_dir: str, output_dir: str,
+                           html_dir: Optional[str]) -> List[Tuple[str, str, str, Optional[str]]]:
+        """
+        /**
+         * 构建批量转换任务列表
+         * 
+         * HTML中间文件只按文件名命名，不同子目录中的同名文件会写入同一个HTML文件。
+         * 这里只让最后一个同名文件写入HTML，使结果与顺序执行时一致，且不会被并发写入。
+         * 
+         * @param {List[str]} files - Markdown文件路径列表
+         * @param {str} input_dir - 输入目录路径
+         * @param {str} output_dir - 输出目录路径
+         * @param {Optional[str]} html_dir - HTML中间文件目录，为None则不保留HTML
+         * @returns {List[Tuple[str, str, str, Optional[str]]]} 任务列表，每项为(相对路径, 输入文件, 输出文件, HTML文件)
+         */
+        """
+        tasks = []
+        html_owner = {}
+        
+        for file_path in files:
             # 计算相对路径，用于构建输出路径
             rel_path = os.path.relpath(file_path, input_dir)
             file_base_name = os.path.basename(os.path.splitext(rel_path)[0])
@@ -151,36 +264,139 @@ class Converter:
             
             # 构建HTML文件路径（如果需要）
             html_file = None
-            if keep_html:
+            if html_dir:
                 html_file = os.path.join(html_dir, f"{file_base_name}.html")
+                html_owner[html_file] = len(tasks)
                 
-            # 转换文件并记录结果
-            try:
-                # 输出进度信息
-                print(f"处理文件 {idx}/{total_files}: {rel_path}")
-                
-                # 转换Markdown到HTML
-                html_content = self.md_to_html.convert_file(file_path, html_file)
-                
-                # 转换HTML到Word
-                if html_file:
-                    doc = self.html_to_word.convert_file(html_file, output_file)
-                else:
-                    doc = self.html_to_word.convert_html(html_content)
-                    doc.save(output_file)
-                    
-                results[rel_path] = True
-                print(f"  完成: {output_file}")
-                
-            except Exception as e:
-                results[rel_path] = False
-                print(f"  失败: {str(e)}")
+            tasks.append((rel_path, file_path, output_file, html_file))
+        
+        # 同名HTML文件只由最后一个任务写入
+        for idx, (rel_path, file_path, output_file, html_file) in enumerate(tasks):
+            if html_file and html_owner[html_file] != idx:
+                tasks[idx] = (rel_path, file_path, output_file, None)
                 
-        # 输出统计信息
-        success_count = sum(1 for v in results.values() if v)
-        print(f"\n转换完成: 共 {total_files} 个文件, 成功 {success_count} 个, 失败 {total_files - success_count} 个")
+        return tasks
+    
+    def _resolve_jobs(self, jobs: Optional[int], task_count: int) -> int:
+        """
+        /**
+         * 确定批量转换使用的工作进程数
+         * 
+         * @param {Optional[int]} jobs - 指定的进程数，None表示读取配置，0表示使用全部CPU核心
+         * @param {int} task_count - 待转换文件数
+         * @returns {int} 实际使用的进程数
+         */
+        """
+        if jobs is None:
+            jobs = self.config.get('batch', {}).get('jobs', 1)
+        jobs = int(jobs or 0)
+        if jobs <= 0:
+            jobs = os.cpu_count() or 1
+        return max(1, min(jobs, task_count))
+    
+    def _run_sequential(self, tasks: List[Tuple[str, str, str, Optional[str]]]) -> Tuple[List[bool], List[Optional[Dict[str, Any]]]]:
+        """
+        /**
+         * 在当前进程中逐个转换文件
+         * 
+         * @param {List[Tuple[str, str, str, Optional[str]]]} tasks - 任务列表
+         * @returns {Tuple[List[bool], List[Optional[Dict[str, Any]]]]} 与任务列表顺序一致的转换结果和耗时报告
+         */
+        """
+        outcomes = []
+        reports = []
+        total_files = len(tasks)
+        for idx, (rel_path, file_path, output_file, html_file) in enumerate(tasks, 1):
+            # 输出进度信息
+            print(f"处理文件 {idx}/{total_files}: {rel_path}")
+            success, error, report = _convert_task(self, file_path, output_file, html_file)
+            _report_task(output_file, success, error)
+            outcomes.append(success)
+            reports.append(report)
+        return outcomes, reports
+    
+    def _run_parallel(self, tasks: List[Tuple[str, str, str, Optional[str]]], jobs: int) -> Tuple[List[bool], List[Optional[Dict[str, Any]]]]:
+        """
+        /**
+         * 使用进程池并行转换文件
+         * 
+         * 每个工作进程只创建一次转换器实例并在其生命周期内复用，
+         * 结果按任务顺序收集，与各进程的完成先后无关
+         * 
+         * @param {List[Tuple[str, str, str, Optional[str]]]} tasks - 任务列表
+         * @param {int} jobs - 工作进程数
+         * @returns {Tuple[List[bool], List[Optional[Dict[str, Any]]]]} 与任务列表顺序一致的转换结果和耗时报告
+         */
+        """
+        outcomes = []
+        reports = []
+        total_files = len(tasks)
         
-        return results
+        # 使用spawn启动方式，避免fork继承父进程中的日志处理器和临时目录等状态
+        # 进程池只在并行批量转换时才需要，延迟导入以加快启动
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=context,
+                                 initializer=_init_batch_worker, initargs=(self.config,)) as executor:
+            futures = [
+                executor.submit(_convert_in_worker, file_path, output_file, html_file)
+                for _, file_path, output_file, html_file in tasks
+            ]
+            for idx, ((rel_path, _, output_file, _), future) in enumerate(zip(tasks, futures), 1):
+                try:
+                    success, error, report = future.result()
+                except Exception as e:
+                    # 工作进程异常退出等情况
+                    success, error, report = False, str(e), None
+                print(f"处理文件 {idx}/{total_files}: {rel_path}")
+                _report_task(output_file, success, error)
+                outcomes.append(success)
+                reports.append(report)
+        return outcomes, reports
+    
+    def _convert_batch_item(self, file_path: str, output_file: str,
+                            html_file: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        /**
+         * 转换批量任务中的单个文件
+         * 
+         * @param {str} file_path - 输入Markdown文件路径
+         * @param {str} output_file - 输出Word文件路径
+         * @param {Optional[str]} html_file - HTML中间文件路径，为None则不保存
+         * @returns {Optional[Dict[str, Any]]} 耗时报告，未启用耗时统计时为None
+         */
+        """
+        _, report = self._convert_document(file_path, output_file, html_file)
+        return report
+    
+    def _convert_document(self, input_file: str, output_file: Target,
+                          html_file: Optional[str]) -> Tuple[Document, Optional[Dict[str, Any]]]:
+        """
+        /**
+         * 转换并保存单个文件，启用耗时统计时记录各阶段耗时
+         * 
+         * @param {str} input_file - 输入Markdown文件路径
+         * @param {Target} output_file - 输出Word文件路径、'-'（标准输出）、文件描述符或可写的二进制流
+         * @param {Optional[str]} html_file - HTML中间文件路径，为None则不保存
+         * @returns {Tuple[Document, Optional[Dict[str, Any]]]} (Word文档对象, 耗时报告)
+         */
+        """
+        report = timing.TimingReport(input_file) if self.timing_enabled else None
+        with timing.activate(report):
+            # 转换Markdown到HTML文档树，仅在需要保留HTML时序列化到文件
+            soup = self.md_to_html.convert_file_to_soup(input_file, html_file)
+            
+            # 将文档树直接转换为Word
+            doc = self.html_to_word.convert_html(soup)
+            with timing.stage('save'):
+                self.html_to_word.save(doc, output_file)
+        
+        if report is None:
+            return doc, None
+        self.logger.info(f"耗时统计 {input_file}: {report.summary()}")
+        self.last_timing_report = report.to_dict()
+        return doc, self.last_timing_report
     
     def _find_markdown_files(self, directory: str) -> List[str]:
         """
@@ -197,7 +413,9 @@ class Converter:
             for file in files:
                 if file.lower().endswith(('.md', '.markdown')):
                     md_files.append(os.path.join(root, file))
-                    
+        
+        # 排序以保证不同文件系统下的处理顺序一致
+        md_files.sort()
         return md_files
     
     def cleanup(self):
@@ -206,5 +424,71 @@ class Converter:
          * 清理临时资源
          */
         """
-        # 清理HTML处理器的临时资源
-        self.html_processor.cleanup() 
\ No newline at end of file
+        # 清理HTML到Word转换器的临时资源
+        self.html_to_word.cleanup()
+
+
+# 进程池工作进程中复用的转换器实例
+_worker_converter: Optional[Converter] = None
+
+def _init_batch_worker(config: Dict[str, Any]):
+    """
+    /**
+     * 初始化批量转换工作进程，创建进程内共享的转换器
+     * 
+     * @param {Dict[str, Any]} config - 配置参数字典
+     */
+    """
+    global _worker_converter
+    _worker_converter = Converter(config)
+    # 工作进程退出时清理临时资源
+    from multiprocessing.util import Finalize
+    Finalize(_worker_converter, _worker_converter.cleanup, exitpriority=10)
+
+def _convert_in_worker(file_path: str, output_file: str,
+                       html_file: Optional[str]) -> Tuple[bool, Optional[str], Optional[Dict[str, Any]]]:
+    """
+    /**
+     * 在工作进程中转换单个文件
+     * 
+     * @param {str} file_path - 输入Markdown文件路径
+     * @param {str} output_file - 输出Word文件路径
+     * @param {Optional[str]} html_file - HTML中间文件路径
+     * @returns {Tuple[bool, Optional[str], Optional[Dict[str, Any]]]} (是否成功, 错误信息, 耗时报告)
+     */
+    """
+    return _convert_task(_worker_converter, file_path, output_file, html_file)
+
+def _convert_task(converter: Converter, file_path: str, output_file: str,
+                  html_file: Optional[str]) -> Tuple[bool, Optional[str], Optional[Dict[str, Any]]]:
+    """
+    /**
+     * 执行单个转换任务并捕获异常
+     * 
+     * @param {Converter} converter - 转换器实例
+     * @param {str} file_path - 输入Markdown文件路径
+     * @param {str} output_file - 输出Word文件路径
+     * @param {Optional[str]} html_file - HTML中间文件路径
+     * @returns {Tuple[bool, Optional[str], Optional[Dict[str, Any]]]} (是否成功, 错误信息, 耗时报告)
+     */
+    """
+    try:
+        report = converter._convert_batch_item(file_path, output_file, html_file)
+        return True, None, report
+    except Exception as e:
+        return False, str(e), None
+
+def _report_task(output_file: str, success: bool, error: Optional[str]):
+    """
+    /**
+     * 输出单个任务的转换结果
+     * 
+     * @param {str} output_file - 输出Word文件路径
+     * @param {bool} success - 是否成功
+     * @param {Optional[str]} error - 错误信息
+     */
+    """
+    if success:
+        print(f"  完成: {output_file}")
+    else:
+        print(f"  失败: {error}")
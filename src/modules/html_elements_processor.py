@@ -5,7 +5,6 @@ HTML元素处理模块
 
 import os
 import re
-import requests
 from typing import Dict, Any, Optional, List, Tuple
 from bs4 import Tag
 from docx import Document
@@ -14,6 +13,17 @@ from docx.text.paragraph import Paragraph
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 import tempfile
 
+try:
+    from .image_cache import get_image_cache
+    from .image_normalizer import ImageNormalizer
+except ImportError:
+    try:
+        from src.modules.image_cache import get_image_cache
+        from src.modules.image_normalizer import ImageNormalizer
+    except ImportError:
+        from image_cache import get_image_cache
+        from image_normalizer import ImageNormalizer
+
 class HtmlElementsProcessor:
     """
     /**
@@ -38,6 +48,8 @@ class HtmlElementsProcessor:
         self.default_image_height = self.image_config.get('default_height', None)  # 自动计算高度
         self.max_image_width = self.image_config.get('max_width', 15)  # 单位：厘米
         self.temp_dir = None
+        self.image_cache = get_image_cache(config)
+        self.normalizer = ImageNormalizer(config)
     
     def process_image(self, img_tag: Tag, document: Document) -> Optional[Paragraph]:
         """
@@ -58,10 +70,6 @@ class HtmlElementsProcessor:
             # 获取图片alt文本
             alt = img_tag.get('alt', '')
             
-            # 创建临时目录（如果尚未创建）
-            if self.temp_dir is None:
-                self.temp_dir = tempfile.mkdtemp()
-                
             # 下载或读取图片文件
             img_path = self._get_image_path(src)
             if not img_path:
@@ -75,6 +83,9 @@ class HtmlElementsProcessor:
             if width > self.max_image_width:
                 width = self.max_image_width
                 
+            # 按显示宽度缩小并重新压缩大图（需要启用image_normalize并安装Pillow）
+            img_path = self.normalizer.normalize(img_path, width)
+                
             # 创建段落并插入图片
             p = document.add_paragraph()
             p.alignment = WD_ALIGN_PARAGRAPH.CENTER
@@ -111,23 +122,34 @@ class HtmlElementsProcessor:
             
         # 检查是否为URL
         if src.startswith(('http://', 'https://')):
-            try:
-                # 从URL下载图片
-                response = requests.get(src, stream=True, timeout=10)
-                if response.status_code == 200:
-                    # 提取文件名
-                    filename = os.path.basename(src)
-                    if not filename:
-                        filename = f"image_{hash(src)}.jpg"
-                        
-                    # 保存到临时文件
-                    img_path = os.path.join(self.temp_dir, filename)
-                    with open(img_path, 'wb') as f:
-                        for chunk in response.iter_content(1024):
-                            f.write(chunk)
+            # 优先使用持久化图片缓存，同一图片在多个文档和多次运行之间只下载一次
+            if self.image_cache is not None:
+                img_path = self.image_cache.fetch(src)
+                if img_path:
                     return img_path
-            except Exception:
-                pass
+            else:
+                # 创建临时目录（如果尚未创建）
+                if self.temp_dir is None:
+                    self.temp_dir = tempfile.mkdtemp()
+                    
+                try:
+                    # 从URL下载图片，requests只在确实需要下载时才导入
+                    import requests
+                    response = requests.get(src, stream=True, timeout=10)
+                    if response.status_code == 200:
+                        # 提取文件名
+                        filename = os.path.basename(src)
+                        if not filename:
+                            filename = f"image_{hash(src)}.jpg"
+                        
+                        # 保存到临时文件
+                        img_path = os.path.join(self.temp_dir, filename)
+                        with open(img_path, 'wb') as f:
+                            for chunk in response.iter_content(1024):
+                                f.write(chunk)
+                        return img_path
+                except Exception:
+                    pass
                 
         # 如果是相对路径，尝试在指定目录中查找
         image_dirs = self.image_config.get('search_dirs', [])
@@ -0,0 +1,49 @@
+"""
+HTML解析器选择模块
+根据配置选择BeautifulSoup使用的解析器，所有解析HTML的地方使用同一个解析器，保证文档树结构一致
+"""
+
+import logging
+import importlib.util
+from typing import Dict, Any
+
+# 解析器名称
+PARSER_AUTO = 'auto'
+PARSER_LXML = 'lxml'
+PARSER_HTML = 'html.parser'
+
+PARSERS = (PARSER_AUTO, PARSER_LXML, PARSER_HTML)
+
+logger = logging.getLogger('HtmlParser')
+
+def lxml_available() -> bool:
+    """
+    /**
+     * @returns {bool} 是否安装了lxml
+     */
+    """
+    return importlib.util.find_spec('lxml') is not None
+
+def resolve_html_parser(config: Dict[str, Any]) -> str:
+    """
+    /**
+     * 根据配置html.parser确定解析器
+     *
+     * auto在安装了lxml时使用lxml（C实现，大文档上明显快于纯Python的html.parser），否则使用html.parser；
+     * 指定lxml但没有安装时回退到html.parser
+     *
+     * @param {Dict[str, Any]} config - 配置字典
+     * @returns {str} BeautifulSoup解析器名称
+     */
+    """
+    parser = config.get('html', {}).get('parser', PARSER_AUTO)
+    if parser not in PARSERS:
+        logger.warning(f"未知的HTML解析器: {parser}，使用auto")
+        parser = PARSER_AUTO
+    if parser == PARSER_HTML:
+        return PARSER_HTML
+    if lxml_available():
+        return PARSER_LXML
+    if parser == PARSER_LXML:
+        logger.warning('未安装lxml，使用html.parser')
+    return PARSER_HTML
@@ -0,0 +1,153 @@
+"""
+代码词法分析模块
+使用Pygments将代码块切分为按行分组的词法单元，词法分析器按语言缓存，
+词法单元序列按(语言, 代码摘要)在进程内缓存，批量转换中重复出现的代码片段只分析一次
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+# 代码块渲染方式
+CODE_RENDERING_TEXT = 'text'
+CODE_RENDERING_TOKENS = 'tokens'
+
+# 一行代码：((词法单元类型, 文本), ...)
+TokenLine = Tuple[Tuple[Any, str], ...]
+
+# 已分析的词法单元序列：(语言, 代码摘要) -> (行, ...)
+_token_cache: 'OrderedDict[Tuple[str, bytes], Tuple[TokenLine, ...]]' = OrderedDict()
+_token_cache_lock = threading.Lock()
+_token_cache_stats = {'hits': 0, 'misses': 0}
+
+# Pygments未安装时只提示一次
+_pygments_warned = False
+
+def pygments_available() -> bool:
+    """
+    /**
+     * 检查Pygments是否可用，Pygments是可选依赖
+     *
+     * @returns {bool} 是否安装了Pygments
+     */
+    """
+    global _pygments_warned
+    try:
+        import pygments
+        return True
+    except ImportError:
+        if not _pygments_warned:
+            _pygments_warned = True
+            logging.getLogger('CodeTokens').warning("未安装Pygments，代码块按纯文本输出（pip install Pygments，或安装可选依赖world_md[code]）")
+        return False
+
+@lru_cache(maxsize=None)
+def get_lexer(language: str):
+    """
+    /**
+     * 按语言名称获取词法分析器，结果按语言缓存
+     *
+     * @param {str} language - 语言名称或别名，空字符串表示纯文本
+     * @returns {Lexer} 词法分析器，未知语言使用纯文本分析器
+     */
+    """
+    from pygments.lexers import get_lexer_by_name
+    from pygments.lexers.special import TextLexer
+    from pygments.util import ClassNotFound
+
+    # 代码文本已去掉首尾空行，不让分析器再增删换行
+    options = {'stripnl': False, 'ensurenl': False}
+    if language:
+        try:
+            return get_lexer_by_name(language, **options)
+        except ClassNotFound:
+            logging.getLogger('CodeTokens').debug(f"未知的代码语言: {language}，按纯文本处理")
+    return TextLexer(**options)
+
+def _split_lines(tokens) -> Tuple[TokenLine, ...]:
+    """
+    /**
+     * 按换行拆分词法单元，合并同一行中相邻的同类型词法单元
+     *
+     * @param {Iterable[Tuple[Any, str]]} tokens - Pygments词法单元序列
+     * @returns {Tuple[TokenLine, ...]} 按行分组的词法单元
+     */
+    """
+    lines = []
+    line = []
+    for token_type, value in tokens:
+        parts = value.split('\n')
+        for index, part in enumerate(parts):
+            if index > 0:
+                lines.append(tuple(line))
+                line = []
+            if not part:
+                continue
+            if line and line[-1][0] is token_type:
+                line[-1] = (token_type, line[-1][1] + part)
+            else:
+                line.append((token_type, part))
+    lines.append(tuple(line))
+    return tuple(lines)
+
+def tokenize_code(language: str, code: str, cache_size: int = 1024) -> Tuple[TokenLine, ...]:
+    """
+    /**
+     * 将代码切分为按行分组的词法单元，结果按(语言, 代码摘要)缓存
+     *
+     * @param {str} language - 语言名称，空字符串表示纯文本
+     * @param {str} code - 代码文本
+     * @param {int} cache_size - 缓存的代码块数量上限，0表示不缓存
+     * @returns {Tuple[TokenLine, ...]} 按行分组的词法单元
+     */
+    """
+    key = (language, hashlib.sha1(code.encode('utf-8')).digest())
+    with _token_cache_lock:
+        lines = _token_cache.get(key)
+        if lines is not None:
+            _token_cache.move_to_end(key)
+            _token_cache_stats['hits'] += 1
+            return lines
+        _token_cache_stats['misses'] += 1
+
+    lines = _split_lines(get_lexer(language).get_tokens(code))
+    if cache_size > 0:
+        with _token_cache_lock:
+            _token_cache[key] = lines
+            while len(_token_cache) > cache_size:
+                _token_cache.popitem(last=False)
+    return lines
+
+def get_token_cache_stats() -> Dict[str, Any]:
+    """
+    /**
+     * 获取词法单元缓存的累计统计信息
+     *
+     * @returns {Dict[str, Any]} 包含hits、misses、size和hit_rate的字典
+     */
+    """
+    with _token_cache_lock:
+        hits, misses = _token_cache_stats['hits'], _token_cache_stats['misses']
+        return {'hits': hits, 'misses': misses, 'size': len(_token_cache),
+                'hit_rate': hits / (hits + misses) if hits + misses else 0.0}
+
+def code_language(element) -> str:
+    """
+    /**
+     * 从code或pre元素的class中读取代码语言（language-xxx或lang-xxx）
+     *
+     * @param {Tag} element - code或pre元素
+     * @returns {str} 语言名称，没有指定时返回空字符串
+     */
+    """
+    for node in (element, element.parent):
+        if node is None:
+            continue
+        for cls in node.get('class') or ():
+            for prefix in ('language-', 'lang-'):
+                if cls.startswith(prefix):
+                    return cls[len(prefix):]
+    return ''
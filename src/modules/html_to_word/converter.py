@@ -6,8 +6,10 @@ HTML到Word转换器
 import os
 import re
 import time
+import shutil
+import tempfile
 import logging
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Optional, List, Tuple, Union
 import codecs
 from bs4 import BeautifulSoup, Tag
 from docx import Document
@@ -17,7 +19,12 @@ from docx.oxml import OxmlElement
 
 from .document_style import DocumentStyleManager
 from .element_factory import ElementProcessorFactory
-from ..html_elements_processor import HtmlElementsProcessor
+from .docx_writer import Target, resolve_compression, save_document
+from .code_tokens import CODE_RENDERING_TOKENS, get_token_cache_stats
+from ..tree_walker import TreeVisitor, walk_tree
+from ..image_cache import ImageCache, get_image_cache, prefetch_images
+from ..html_parser import resolve_html_parser
+from .. import timing
 
 class HtmlToWordConverter:
     """
@@ -40,7 +47,14 @@ class HtmlToWordConverter:
         self.document = None
         self.style_manager = DocumentStyleManager(config)
         self.processor_factory = None
-        self.elements_processor = HtmlElementsProcessor(config)
+        self.image_cache = get_image_cache(config)
+        self.html_parser = resolve_html_parser(config)
+        self._prefetch_dir = None
+        
+        # 保存设置：zip压缩级别，以及保存到文件时是否先写临时文件再重命名
+        output_config = config.get('output', {})
+        self.compression = resolve_compression(output_config.get('compression'))
+        self.atomic_save = output_config.get('atomic', True)
         
         # 配置日志
         self.debug_mode = config.get('debug', {}).get('enabled', False)
@@ -62,13 +76,24 @@ class HtmlToWordConverter:
         if self.debug_mode:
             self.logger.debug(f"调试模式已启用，配置: {config}")
     
-    def convert_file(self, input_file: str, output_file: str) -> Document:
+    def save(self, document: Document, output: Target):
+        """
+        /**
+         * 按配置的压缩级别保存Word文档
+         * 
+         * @param {Document} document - Word文档对象
+         * @param {Target} output - 输出文件路径、'-'（标准输出）、文件描述符或可写的二进制流
+         */
+        """
+        save_document(document, output, self.compression, self.atomic_save)
+    
+    def convert_file(self, input_file: str, output_file: Target) -> Document:
         """
         /**
          * 将HTML文件转换为Word文档
          * 
          * @param {str} input_file - 输入HTML文件路径
-         * @param {str} output_file - 输出Word文件路径
+         * @param {Target} output_file - 输出Word文件路径、'-'（标准输出）、文件描述符或可写的二进制流
          * @returns {Document} 生成的Word文档对象
          */
         """
@@ -85,7 +110,7 @@ class HtmlToWordConverter:
                 self.logger.debug(f"成功读取HTML文件，大小: {len(html_content)} 字节")
                 
             doc = self.convert_html(html_content)
-            doc.save(output_file)
+            self.save(doc, output_file)
             
             elapsed_time = time.time() - start_time
             self.logger.info(f"文件转换完成，耗时: {elapsed_time:.2f} 秒")
@@ -95,25 +120,21 @@ class HtmlToWordConverter:
             self.logger.error(f"转换过程中发生错误: {str(e)}", exc_info=True)
             raise
     
-    def convert_html(self, html_content: str) -> Document:
+    def convert_html(self, html_content: Union[str, BeautifulSoup]) -> Document:
         """
         /**
          * 将HTML内容转换为Word文档
          * 
-         * @param {str} html_content - HTML格式的内容
+         * @param {Union[str, BeautifulSoup]} html_content - HTML格式的内容，或已解析好的文档树（不再重复解析）
          * @returns {Document} 生成的Word文档对象
          */
         """
         self.logger.info("开始转换HTML内容到Word")
         
-        # 创建新文档
-        self.document = Document()
+        # 从缓存的模板文档创建设置好样式的新文档
+        self.document = self.style_manager.create_document()
         self.logger.debug("创建新文档对象")
         
-        # 应用文档样式
-        self.document = self.style_manager.setup_document(self.document)
-        self.logger.debug("应用文档样式设置完成")
-        
         # 检查是否需要生成目录
         if self.config.get('document', {}).get('generate_toc', False):
             self.logger.info("添加文档目录")
@@ -123,17 +144,37 @@ class HtmlToWordConverter:
         self.processor_factory = ElementProcessorFactory(self.document, self.style_manager)
         self.logger.debug("初始化元素处理器工厂")
         
-        # 解析HTML
+        # 解析HTML，已经是文档树时直接使用
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            if isinstance(html_content, Tag):
+                soup = html_content
+            else:
+                with timing.stage('html_parse'):
+                    soup = BeautifulSoup(html_content, self.html_parser)
             body = soup.body or soup
-            self.logger.debug(f"HTML解析完成，找到 {len(list(body.descendants))} 个元素")
+            if self.debug_mode:
+                self.logger.debug(f"HTML解析完成，找到 {sum(1 for _ in body.descendants)} 个元素")
         except Exception as e:
             self.logger.error(f"HTML解析失败: {str(e)}")
             raise
         
-        # 处理主体内容
-        self._process_body(body)
+        # 处理主体前并发下载所有远程图片，图片处理器只读取已下载的本地文件
+        with timing.stage('image_io'):
+            prefetched = self._prefetch_images(body)
+        
+        # 处理主体内容，完成后预取的图片才可以被缓存淘汰
+        try:
+            with timing.stage('word'):
+                self._process_body(body)
+        finally:
+            if prefetched is not None:
+                cache, resolved = prefetched
+                cache.unpin(resolved.values())
+        
+        # 按词法单元渲染代码块时，与简繁转换缓存一起报告词法单元缓存的命中情况
+        report = timing.current()
+        if report is not None and self.processor_factory.processors['code'].rendering == CODE_RENDERING_TOKENS:
+            report.extra['token_cache'] = get_token_cache_stats()
         
         self.logger.info("HTML内容转换完成")
         return self.document
@@ -195,6 +236,42 @@ class HtmlToWordConverter:
         self.document.add_page_break()
         self.logger.info("目录添加完成")
     
+    def _prefetch_images(self, body: Tag) -> Optional[Tuple[ImageCache, Dict[str, Optional[str]]]]:
+        """
+        /**
+         * 预取文档中的远程图片
+         * 
+         * 收集所有远程图片地址并通过共享连接池并发下载，结果交给图片处理器；
+         * 禁用图片缓存时下载到本次转换的临时目录，在cleanup时删除
+         * 
+         * @param {Tag} body - HTML文档主体元素
+         * @returns {Optional[Tuple[ImageCache, Dict[str, Optional[str]]]]} 使用的缓存和预取结果，
+         *          文档写入后需要对预取的图片取消pin；没有远程图片时返回None
+         */
+        """
+        urls = [img.get('src', '') for img in body.find_all('img')]
+        urls = [url for url in urls if url.startswith(('http://', 'https://'))]
+        if not urls:
+            return None
+        
+        cache = self.image_cache
+        if cache is None:
+            if self._prefetch_dir is None:
+                self._prefetch_dir = tempfile.mkdtemp()
+            cache = ImageCache(self._prefetch_dir, max_size_mb=0,
+                               timeout=self.config.get('image_cache', {}).get('timeout', 10))
+        
+        cache_config = self.config.get('image_cache', {})
+        start_time = time.time()
+        resolved = prefetch_images(cache, urls,
+                                   max_workers=cache_config.get('prefetch_workers', 8),
+                                   per_host_limit=cache_config.get('per_host_limit', 4))
+        self.processor_factory.processors['image'].prefetched_images = resolved
+        
+        failed = sum(1 for path in resolved.values() if path is None)
+        self.logger.info(f"预取远程图片 {len(resolved)} 张，失败 {failed} 张，耗时: {time.time() - start_time:.2f} 秒")
+        return cache, resolved
+    
     def _process_body(self, body: Tag):
         """
         /**
@@ -205,23 +282,19 @@ class HtmlToWordConverter:
         """
         self.logger.debug("开始处理文档主体")
         
-        # 统计处理的元素
-        processed_count = 0
+        # 非递归遍历：有处理器的元素交给处理器，没有处理器的元素继续处理其子元素
+        visitor = _ElementDispatchVisitor(self)
+        walk_tree(body, visitor)
         
-        # 遍历所有直接子元素
-        for child in body.children:
-            if isinstance(child, Tag):
-                self._process_element(child)
-                processed_count += 1
-                
-        self.logger.debug(f"文档主体处理完成，共处理 {processed_count} 个顶级元素")
+        self.logger.debug(f"文档主体处理完成，共处理 {visitor.top_level_count} 个顶级元素")
     
-    def _process_element(self, element: Tag):
+    def _process_element(self, element: Tag) -> bool:
         """
         /**
          * 处理HTML元素
          * 
          * @param {Tag} element - HTML元素
+         * @returns {bool} 元素没有对应的处理器、需要继续处理其子元素时返回True
          */
         """
         if self.debug_mode:
@@ -232,20 +305,20 @@ class HtmlToWordConverter:
             processor = self.processor_factory.get_processor(element)
             
             if processor:
-                # 使用处理器处理元素
+                # 使用处理器处理元素，启用耗时统计时处理器工厂负责计时
                 processor.process(element)
                 if self.debug_mode:
                     self.logger.debug(f"使用 {processor.__class__.__name__} 处理元素 <{element.name}> 完成")
-            else:
-                # 如果没有找到处理器，处理其子元素
-                if self.debug_mode:
-                    self.logger.debug(f"未找到元素 <{element.name}> 的处理器，处理其子元素")
-                for child in element.children:
-                    if isinstance(child, Tag):
-                        self._process_element(child)
+                return False
+            
+            # 如果没有找到处理器，处理其子元素
+            if self.debug_mode:
+                self.logger.debug(f"未找到元素 <{element.name}> 的处理器，处理其子元素")
+            return True
         except Exception as e:
             self.logger.error(f"处理元素 <{element.name}> 时发生错误: {str(e)}")
             # 继续处理，不中断转换过程
+            return False
     
     def cleanup(self):
         """
@@ -254,6 +327,39 @@ class HtmlToWordConverter:
          */
         """
         self.logger.debug("开始清理临时资源")
-        # 清理HTML元素处理器的临时资源
-        self.elements_processor.cleanup()
-        self.logger.info("清理临时资源完成")
\ No newline at end of file
+        # 清理禁用图片缓存时预取图片的临时目录
+        if self._prefetch_dir and os.path.exists(self._prefetch_dir):
+            shutil.rmtree(self._prefetch_dir, ignore_errors=True)
+            self._prefetch_dir = None
+        self.logger.info("清理临时资源完成")
+
+
+class _ElementDispatchVisitor(TreeVisitor):
+    """
+    /**
+     * 元素分发访问者，将HTML元素交给转换器的元素处理器
+     */
+    """
+    
+    def __init__(self, converter: HtmlToWordConverter):
+        """
+        /**
+         * @param {HtmlToWordConverter} converter - HTML到Word转换器
+         */
+        """
+        self.converter = converter
+        self.depth = 0
+        self.top_level_count = 0
+    
+    def enter(self, node) -> bool:
+        if not isinstance(node, Tag):
+            return False
+        if self.depth == 0:
+            self.top_level_count += 1
+        if self.converter._process_element(node):
+            self.depth += 1
+            return True
+        return False
+    
+    def leave(self, node: Tag):
+        self.depth -= 1
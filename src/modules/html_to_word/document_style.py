@@ -3,16 +3,24 @@
 负责管理Word文档样式、字体、颜色等
 """
 
+import io
 import logging
 from typing import Dict, Any, Optional, Tuple
 from docx.shared import Pt, RGBColor, Inches, Cm
 from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_LINE_SPACING
+from docx.enum.style import WD_STYLE_TYPE
 from docx.oxml.ns import qn
 from docx import Document
 from docx.text.run import Run
 from docx.text.paragraph import Paragraph
 import re
 
+from .template_cache import template_fingerprint, get_template, read_template
+
+# 文本格式的渲染方式：direct 在每个段落和文本运行上直接写入格式，styles 只引用文档中定义的命名样式
+STYLE_MODE_DIRECT = 'direct'
+STYLE_MODE_STYLES = 'styles'
+
 class DocumentStyleManager:
     """
     /**
@@ -84,6 +92,17 @@ class DocumentStyleManager:
         self.margin_left = self.doc_properties.get('margin_left', 3.17)
         self.margin_right = self.doc_properties.get('margin_right', 3.17)
         self.logger.info(f"页面设置: 上={self.margin_top}cm, 下={self.margin_bottom}cm, 左={self.margin_left}cm, 右={self.margin_right}cm")
+        
+        # 格式渲染方式
+        self.style_mode = self.config.get('document', {}).get('style_mode', STYLE_MODE_DIRECT)
+        self.use_styles = self.style_mode == STYLE_MODE_STYLES
+        self._style_ids: Dict[str, str] = {}
+        self.logger.info(f"格式渲染方式: {self.style_mode}")
+        
+        # 用户指定的Word模板（.dotx/.docx），留空使用python-docx的默认模板
+        self.template_path = self.config.get('document', {}).get('template', '')
+        if self.template_path:
+            self.logger.info(f"Word模板: {self.template_path}")
         self.logger.info("文档样式管理器初始化完成")
     
     def _parse_color(self, color_str: str) -> RGBColor:
@@ -116,6 +135,44 @@ class DocumentStyleManager:
             self.logger.error(f"颜色解析发生意外错误: {e}, 使用默认黑色")
             return RGBColor(0, 0, 0)
     
+    def create_document(self) -> Document:
+        """
+        /**
+         * 创建设置好全局样式的新文档
+         * 
+         * 设置好样式的空白文档按配置指纹缓存在内存中（docx字节），之后的文档直接从字节打开，
+         * 不再读取模板文件和重复设置页面与默认样式
+         * 
+         * @returns {Document} 新的Word文档对象
+         */
+        """
+        data, style_ids = get_template(template_fingerprint(self.config), self._build_template)
+        self._style_ids.update(style_ids)
+        return Document(io.BytesIO(data))
+    
+    def _build_template(self) -> Tuple[bytes, Dict[str, str]]:
+        """
+        /**
+         * 构建模板文档：打开用户模板或默认模板，清空正文后设置全局样式
+         * 
+         * 用户模板只使用其中的样式、页面设置和页眉页脚，配置中的页边距和默认字体仍然覆盖模板
+         * 
+         * @returns {Tuple[bytes, Dict[str, str]]} (docx字节, 命名样式ID)
+         */
+        """
+        data = read_template(self.template_path) if self.template_path else None
+        document = Document(io.BytesIO(data)) if data else Document()
+        if data:
+            body = document.element.body
+            for child in list(body):
+                if child.tag != qn('w:sectPr'):
+                    body.remove(child)
+        self.setup_document(document)
+        buffer = io.BytesIO()
+        document.save(buffer)
+        self.logger.info(f"已创建模板文档: {self.template_path or '默认模板'}")
+        return buffer.getvalue(), dict(self._style_ids)
+    
     def setup_document(self, document: Document) -> Document:
         """
         /**
@@ -142,8 +199,154 @@ class DocumentStyleManager:
         # 设置中文字体
         style._element.rPr.rFonts.set(qn('w:eastAsia'), self.default_font)
         
+        # 样式模式下一次性定义所有命名样式，段落和文本运行只引用样式
+        if self.use_styles:
+            self._define_styles(document)
+        
         return document
     
+    def _define_styles(self, document: Document):
+        """
+        /**
+         * 根据配置定义段落样式和字符样式
+         * 
+         * 段落样式基于Normal，包含正文、列表项和引用的行间距、段落间距和缩进；
+         * 字符样式包含正文、代码、链接和各级标题的字体、字号和颜色。
+         * Word模板中已经定义的同名样式保留模板的格式，只创建缺少的样式
+         * 
+         * @param {Document} document - Word文档对象
+         */
+        """
+        styles = document.styles
+        
+        def existing_style(key: str, name: str) -> bool:
+            if name not in styles:
+                return False
+            self._style_ids[key] = styles[name].style_id
+            return True
+        
+        def paragraph_style(key: str, name: str):
+            if existing_style(key, name):
+                return None
+            style = styles.add_style(name, WD_STYLE_TYPE.PARAGRAPH)
+            style.base_style = styles['Normal']
+            self._set_line_spacing(style.paragraph_format)
+            self._style_ids[key] = style.style_id
+            return style.paragraph_format
+        
+        def character_style(key: str, name: str, font_name: str, size: float, color: RGBColor, east_asia: bool = True):
+            if existing_style(key, name):
+                return None
+            style = styles.add_style(name, WD_STYLE_TYPE.CHARACTER)
+            style.font.name = font_name
+            style.font.size = Pt(size)
+            style.font.color.rgb = color
+            if east_asia:
+                style.element.rPr.rFonts.set(qn('w:eastAsia'), font_name)
+            self._style_ids[key] = style.style_id
+            return style.font
+        
+        body = paragraph_style('body', 'MD Body')
+        if body is not None:
+            body.space_after = Pt(self.paragraph_spacing)
+            first_line_indent = self.config.get('paragraph', {}).get('first_line_indent', 0)
+            if first_line_indent > 0:
+                body.first_line_indent = Pt(first_line_indent * self.default_size)
+        
+        list_item = paragraph_style('list', 'MD List')
+        if list_item is not None:
+            list_item.space_after = Pt(self.paragraph_spacing / 2)
+            list_item.left_indent = Inches(0)
+        
+        quote = paragraph_style('quote', 'MD Quote')
+        if quote is not None:
+            quote.space_after = Pt(self.paragraph_spacing)
+            quote.left_indent = Inches(0.5)
+        
+        character_style('text', 'MD Text', self.default_font, self.default_size, self.default_color)
+        character_style('code', 'MD Code', self.code_font, self.code_size, self.code_color, east_asia=False)
+        link = character_style('link', 'MD Link', self.default_font, self.default_size, self.link_color)
+        if link is not None:
+            link.underline = True
+        for level, size in self.heading_sizes.items():
+            heading = character_style(f'heading{level}', f'MD Heading {level}', self.heading_font, size, self.heading_color)
+            if heading is not None:
+                heading.bold = True
+        
+        if self.debug_mode:
+            self.logger.debug(f"已定义命名样式: {self._style_ids}")
+    
+    def _set_line_spacing(self, paragraph_format):
+        """
+        /**
+         * 设置行间距，对特殊值使用特定处理
+         * 
+         * @param {ParagraphFormat} paragraph_format - 段落或段落样式的格式对象
+         */
+        """
+        if self.line_spacing == 1.0:
+            paragraph_format.line_spacing_rule = WD_LINE_SPACING.SINGLE
+        elif self.line_spacing == 1.5:
+            paragraph_format.line_spacing_rule = WD_LINE_SPACING.ONE_POINT_FIVE
+        elif self.line_spacing == 2.0:
+            paragraph_format.line_spacing_rule = WD_LINE_SPACING.DOUBLE
+        else:
+            paragraph_format.line_spacing = self.line_spacing
+    
+    def _use_paragraph_style(self, paragraph: Paragraph, key: str) -> bool:
+        """
+        /**
+         * 样式模式下为段落引用命名样式
+         * 
+         * @param {Paragraph} paragraph - 段落对象
+         * @param {str} key - 样式键
+         * @returns {bool} 已引用样式时返回True；直接格式模式或段落已有样式（如标题）时返回False
+         */
+        """
+        if not self.use_styles:
+            return False
+        p = paragraph._p
+        current = p.style
+        if current is not None and current != self._style_ids[key]:
+            return False
+        p.style = self._style_ids[key]
+        return True
+    
+    def _use_character_style(self, run: Run, key: str) -> bool:
+        """
+        /**
+         * 样式模式下为文本运行引用命名样式
+         * 
+         * @param {Run} run - 文本运行对象
+         * @param {str} key - 样式键
+         * @returns {bool} 已引用样式时返回True，直接格式模式下返回False
+         */
+        """
+        if not self.use_styles:
+            return False
+        if key == 'text' and self._inherits_default_text(run):
+            return True
+        run._r.style = self._style_ids[key]
+        return True
+    
+    def _inherits_default_text(self, run: Run) -> bool:
+        """
+        /**
+         * 判断文本运行能否直接继承正文格式
+         * 
+         * 正文字符样式与Normal样式的字体、字号和颜色相同，段落使用Normal或本模块定义的段落样式时
+         * 文本运行不需要引用任何样式；标题等内置样式有自己的字体，仍需引用正文字符样式
+         * 
+         * @param {Run} run - 文本运行对象
+         * @returns {bool} 可以直接继承时返回True
+         */
+        """
+        p = run._r.getparent()
+        if p is None or p.tag != qn('w:p'):
+            return False
+        style_id = p.style
+        return style_id is None or style_id in (self._style_ids['body'], self._style_ids['list'], self._style_ids['quote'])
+    
     def apply_default_style(self, run: Run) -> Run:
         """
         /**
@@ -153,6 +356,8 @@ class DocumentStyleManager:
          * @returns {Run} 应用样式后的文本运行对象
          */
         """
+        if self._use_character_style(run, 'text'):
+            return run
         run.font.name = self.default_font
         run.font.size = Pt(self.default_size)
         run.font.color.rgb = self.default_color
@@ -169,6 +374,8 @@ class DocumentStyleManager:
          * @returns {Run} 应用样式后的文本运行对象
          */
         """
+        if level in self.heading_sizes and self._use_character_style(run, f'heading{level}'):
+            return run
         run.font.name = self.heading_font
         size = self.heading_sizes.get(level, self.default_size)
         run.font.size = Pt(size)
@@ -186,6 +393,8 @@ class DocumentStyleManager:
          * @returns {Run} 应用样式后的文本运行对象
          */
         """
+        if self._use_character_style(run, 'code'):
+            return run
         run.font.name = self.code_font
         run.font.size = Pt(self.code_size)
         run.font.color.rgb = self.code_color
@@ -200,6 +409,8 @@ class DocumentStyleManager:
          * @returns {Run} 应用样式后的文本运行对象
          */
         """
+        if self._use_character_style(run, 'link'):
+            return run
         run.font.name = self.default_font
         run.font.size = Pt(self.default_size)
         run.font.color.rgb = self.link_color
@@ -217,27 +428,21 @@ class DocumentStyleManager:
          * @returns {Paragraph} 应用格式后的段落对象
          */
         """
-        # 设置行间距，对特殊值使用特定处理
-        if self.line_spacing == 1.0:
-            paragraph.paragraph_format.line_spacing_rule = WD_LINE_SPACING.SINGLE
-        elif self.line_spacing == 1.5:
-            paragraph.paragraph_format.line_spacing_rule = WD_LINE_SPACING.ONE_POINT_FIVE
-        elif self.line_spacing == 2.0:
-            paragraph.paragraph_format.line_spacing_rule = WD_LINE_SPACING.DOUBLE
-        else:
-            paragraph.paragraph_format.line_spacing = self.line_spacing
+        if not self._use_paragraph_style(paragraph, 'body'):
+            # 设置行间距
+            self._set_line_spacing(paragraph.paragraph_format)
             
-        # 设置段落间距
-        paragraph.paragraph_format.space_after = Pt(self.paragraph_spacing)
-        
-        # 获取并应用首行缩进设置
-        first_line_indent = self.config.get('paragraph', {}).get('first_line_indent', 0)
-        if first_line_indent > 0:
-            # 转换字符数为磅值，假设中文字符平均宽度为字号的单位值
-            font_size = self.default_size
-            paragraph.paragraph_format.first_line_indent = Pt(first_line_indent * font_size)
-            if self.debug_mode:
-                self.logger.debug(f"应用首行缩进: {first_line_indent} 字符")
+            # 设置段落间距
+            paragraph.paragraph_format.space_after = Pt(self.paragraph_spacing)
+            
+            # 获取并应用首行缩进设置
+            first_line_indent = self.config.get('paragraph', {}).get('first_line_indent', 0)
+            if first_line_indent > 0:
+                # 转换字符数为磅值，假设中文字符平均宽度为字号的单位值
+                font_size = self.default_size
+                paragraph.paragraph_format.first_line_indent = Pt(first_line_indent * font_size)
+                if self.debug_mode:
+                    self.logger.debug(f"应用首行缩进: {first_line_indent} 字符")
         
         if alignment:
             if alignment == 'center':
@@ -261,18 +466,18 @@ class DocumentStyleManager:
          * @returns {Paragraph} 应用格式后的段落对象
          */
         """
-        # 设置行间距，对特殊值使用特定处理
-        if self.line_spacing == 1.0:
-            paragraph.paragraph_format.line_spacing_rule = WD_LINE_SPACING.SINGLE
-        elif self.line_spacing == 1.5:
-            paragraph.paragraph_format.line_spacing_rule = WD_LINE_SPACING.ONE_POINT_FIVE
-        elif self.line_spacing == 2.0:
-            paragraph.paragraph_format.line_spacing_rule = WD_LINE_SPACING.DOUBLE
-        else:
-            paragraph.paragraph_format.line_spacing = self.line_spacing
-            
+        if self._use_paragraph_style(paragraph, 'list'):
+            # 缩进随嵌套级别变化，只在嵌套列表项上直接设置
+            if level > 0:
+                paragraph.paragraph_format.left_indent = Inches(min(level * 0.25, 22))
+            return paragraph
+        
+        # 设置行间距
+        self._set_line_spacing(paragraph.paragraph_format)
+        
         paragraph.paragraph_format.space_after = Pt(self.paragraph_spacing / 2)  # 列表项间隔较小
-        paragraph.paragraph_format.left_indent = Inches(level * 0.25)
+        # Word的缩进上限为22英寸，超深的嵌套列表不再继续缩进
+        paragraph.paragraph_format.left_indent = Inches(min(level * 0.25, 22))
         return paragraph
     
     def apply_quote_format(self, paragraph: Paragraph) -> Paragraph:
@@ -284,16 +489,12 @@ class DocumentStyleManager:
          * @returns {Paragraph} 应用格式后的段落对象
          */
         """
-        # 设置行间距，对特殊值使用特定处理
-        if self.line_spacing == 1.0:
-            paragraph.paragraph_format.line_spacing_rule = WD_LINE_SPACING.SINGLE
-        elif self.line_spacing == 1.5:
-            paragraph.paragraph_format.line_spacing_rule = WD_LINE_SPACING.ONE_POINT_FIVE
-        elif self.line_spacing == 2.0:
-            paragraph.paragraph_format.line_spacing_rule = WD_LINE_SPACING.DOUBLE
-        else:
-            paragraph.paragraph_format.line_spacing = self.line_spacing
-            
+        if self._use_paragraph_style(paragraph, 'quote'):
+            return paragraph
+        
+        # 设置行间距
+        self._set_line_spacing(paragraph.paragraph_format)
+        
         paragraph.paragraph_format.space_after = Pt(self.paragraph_spacing)
         paragraph.paragraph_format.left_indent = Inches(0.5)
         return paragraph 
\ No newline at end of file
@@ -0,0 +1,205 @@
+"""
+Word文档保存模块
+控制docx包的zip压缩级别，支持保存到文件路径（先写临时文件再原子重命名）、标准输出、文件描述符和内存中的BytesIO
+"""
+
+import io
+import os
+import sys
+import logging
+import stat
+import zlib
+from zipfile import ZipFile, ZIP_STORED, ZIP_DEFLATED
+from typing import BinaryIO, Dict, Optional, Tuple, Union
+
+from docx.document import Document
+from docx.opc.pkgwriter import PackageWriter
+
+# 压缩级别：stored 不压缩（最快、文件最大），fast 最快的deflate，default 与python-docx相同，max 最高压缩率
+COMPRESSION_STORED = 'stored'
+COMPRESSION_FAST = 'fast'
+COMPRESSION_DEFAULT = 'default'
+COMPRESSION_MAX = 'max'
+
+_COMPRESSION_SETTINGS: Dict[str, Tuple[int, Optional[int]]] = {
+    COMPRESSION_STORED: (ZIP_STORED, None),
+    COMPRESSION_FAST: (ZIP_DEFLATED, 1),
+    COMPRESSION_DEFAULT: (ZIP_DEFLATED, None),
+    COMPRESSION_MAX: (ZIP_DEFLATED, zlib.Z_BEST_COMPRESSION),
+}
+
+# 表示标准输出的输出路径
+STDOUT = '-'
+
+# 保存目标：文件路径、'-'（标准输出）、文件描述符或可写的二进制流
+Target = Union[str, os.PathLike, int, BinaryIO]
+
+logger = logging.getLogger('DocxWriter')
+
+# 临时文件的创建权限，与open()新建文件相同，实际权限由进程的umask决定
+_FILE_MODE = 0o666
+
+# 创建临时文件名冲突时的重试次数
+_TEMP_ATTEMPTS = 100
+
+class _ZipPartWriter:
+    """
+    /**
+     * 按指定压缩方式写入docx部件的zip写入器，接口与python-docx的PhysPkgWriter相同
+     */
+    """
+
+    def __init__(self, stream: BinaryIO, compression: int, level: Optional[int]):
+        self._zipf = ZipFile(stream, 'w', compression=compression, compresslevel=level)
+
+    def write(self, pack_uri, blob: bytes):
+        self._zipf.writestr(pack_uri.membername, blob)
+
+    def close(self):
+        self._zipf.close()
+
+def resolve_compression(name: Optional[str]) -> str:
+    """
+    /**
+     * 解析压缩级别配置，无效值回退为default
+     *
+     * @param {Optional[str]} name - 压缩级别名称
+     * @returns {str} 有效的压缩级别名称
+     */
+    """
+    name = (name or COMPRESSION_DEFAULT).lower()
+    if name not in _COMPRESSION_SETTINGS:
+        logger.warning(f"未知的压缩级别: {name}，使用default")
+        return COMPRESSION_DEFAULT
+    return name
+
+def write_package(document: Document, stream: BinaryIO, compression: str = COMPRESSION_DEFAULT):
+    """
+    /**
+     * 将文档包写入二进制流
+     *
+     * default与document.save()完全相同；其他级别使用python-docx的PackageWriter按相同的部件顺序写入，只改变zip压缩方式。
+     * 这些是python-docx的内部接口，支持的版本范围见requirements.txt，由test_docx_writer.py检查输出与document.save()一致
+     *
+     * @param {Document} document - Word文档对象
+     * @param {BinaryIO} stream - 可写的二进制流
+     * @param {str} compression - 压缩级别
+     */
+    """
+    compression = resolve_compression(compression)
+    if compression == COMPRESSION_DEFAULT:
+        document.save(stream)
+        return
+
+    package = document.part.package
+    for part in package.parts:
+        part.before_marshal()
+    writer = _ZipPartWriter(stream, *_COMPRESSION_SETTINGS[compression])
+    PackageWriter._write_content_types_stream(writer, package.parts)
+    PackageWriter._write_pkg_rels(writer, package.rels)
+    PackageWriter._write_parts(writer, package.parts)
+    writer.close()
+
+def document_to_bytes(document: Document, compression: str = COMPRESSION_DEFAULT) -> bytes:
+    """
+    /**
+     * 将文档序列化为内存中的docx字节
+     *
+     * @param {Document} document - Word文档对象
+     * @param {str} compression - 压缩级别
+     * @returns {bytes} docx字节
+     */
+    """
+    buffer = io.BytesIO()
+    write_package(document, buffer, compression)
+    return buffer.getvalue()
+
+def _write_fd(fd: int, data: bytes):
+    """
+    /**
+     * 将全部字节写入文件描述符
+     *
+     * @param {int} fd - 文件描述符
+     * @param {bytes} data - 要写入的字节
+     */
+    """
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+def _create_temp(directory: str, name: str) -> Tuple[int, str]:
+    """
+    /**
+     * 在目标目录中创建新的临时文件，权限与open()新建的文件相同（0o666减去umask）
+     *
+     * @param {str} directory - 目标目录
+     * @param {str} name - 目标文件名
+     * @returns {Tuple[int, str]} (文件描述符, 临时文件路径)
+     */
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+    for _ in range(_TEMP_ATTEMPTS):
+        temp_path = os.path.join(directory, f'.{name}.{os.urandom(4).hex()}.tmp')
+        try:
+            return os.open(temp_path, flags, _FILE_MODE), temp_path
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"无法创建临时文件: {os.path.join(directory, name)}")
+
+def _write_atomic(document: Document, path: str, compression: str):
+    """
+    /**
+     * 先写入同一目录下的临时文件，完成后重命名为目标文件，输出目录中不会出现写了一半的文档；
+     * 目标文件已存在时保留其权限
+     *
+     * @param {Document} document - Word文档对象
+     * @param {str} path - 目标文件路径
+     * @param {str} compression - 压缩级别
+     */
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, temp_path = _create_temp(directory, name)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write_package(document, f, compression)
+        try:
+            os.chmod(temp_path, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+def save_document(document: Document, target: Target, compression: str = COMPRESSION_DEFAULT,
+                  atomic: bool = True):
+    """
+    /**
+     * 保存Word文档
+     *
+     * 标准输出和文件描述符先在内存中生成完整的docx再一次写出，不会输出不完整的zip
+     *
+     * @param {Document} document - Word文档对象
+     * @param {Target} target - 文件路径、'-'（标准输出）、文件描述符或可写的二进制流
+     * @param {str} compression - 压缩级别: stored, fast, default, max
+     * @param {bool} atomic - 保存到文件路径时是否先写临时文件再重命名
+     */
+    """
+    if target == STDOUT:
+        stdout = sys.stdout.buffer
+        stdout.write(document_to_bytes(document, compression))
+        stdout.flush()
+    elif isinstance(target, int):
+        _write_fd(target, document_to_bytes(document, compression))
+    elif isinstance(target, (str, os.PathLike)):
+        if atomic:
+            _write_atomic(document, os.fspath(target), compression)
+        else:
+            with open(target, 'wb') as f:
+                write_package(document, f, compression)
+    else:
+        write_package(document, target, compression)
@@ -9,6 +9,7 @@ from bs4 import Tag
 from docx import Document
 
 from .document_style import DocumentStyleManager
+from .. import timing
 from .processors.base import BaseProcessor
 from .processors.paragraph import ParagraphProcessor
 from .processors.heading import HeadingProcessor
@@ -18,13 +19,54 @@ from .processors.inline import InlineProcessor
 from .processors.code import CodeProcessor
 from .processors.image import ImageProcessor
 
+# 处理器名称与处理器类，每个文档的处理器工厂中每种处理器只创建一个实例
+PROCESSOR_CLASSES: Dict[str, Type[BaseProcessor]] = {
+    'paragraph': ParagraphProcessor,
+    'heading': HeadingProcessor,
+    'list': ListProcessor,
+    'table': TableProcessor,
+    'inline': InlineProcessor,
+    'code': CodeProcessor,
+    'image': ImageProcessor,
+}
+
+# 启用耗时统计时按处理器计时的方法
+TIMED_METHODS = ('process', 'process_inline_elements')
+
+# 元素类型与处理器名称的映射
+TAG_PROCESSORS: Dict[str, str] = {
+    'p': 'paragraph',
+    'h1': 'heading',
+    'h2': 'heading',
+    'h3': 'heading',
+    'h4': 'heading',
+    'h5': 'heading',
+    'h6': 'heading',
+    'ul': 'list',
+    'ol': 'list',
+    'table': 'table',
+    'pre': 'code',
+    'blockquote': 'paragraph',  # 特殊处理的段落
+    'div': 'paragraph',         # 特殊处理的段落
+    'section': 'paragraph',     # 特殊处理的段落
+    'article': 'paragraph',     # 特殊处理的段落
+    'main': 'paragraph',        # 特殊处理的段落
+    'header': 'paragraph',      # 特殊处理的段落
+    'footer': 'paragraph',      # 特殊处理的段落
+    'img': 'image',             # 图片处理器
+}
+
+# 内联元素由内联处理器处理
+TAG_PROCESSORS.update(dict.fromkeys(['strong', 'b', 'em', 'i', 'u', 'code', 'a', 'span', 'br'], 'inline'))
+
 class ElementProcessorFactory:
     """
     /**
      * 元素处理器工厂
      * 
-     * 负责创建和管理各类HTML元素处理器，
-     * 根据元素类型返回适当的处理器
+     * 每个文档创建一个，作为该文档所有处理器共享的注册表：每种处理器只有一个实例，
+     * 嵌套元素（引用块、列表项、表格单元格中的内容）也通过同一个工厂分发，
+     * 根据元素类型查表返回处理器，不在映射中的元素类型只探测一次
      */
     """
     
@@ -45,48 +87,34 @@ class ElementProcessorFactory:
         if self.debug_mode:
             self.logger.debug("初始化元素处理器工厂")
         
-        # 初始化各类处理器
-        self.processors = {
-            # 创建各种处理器实例
-            'paragraph': ParagraphProcessor(document, style_manager),
-            'heading': HeadingProcessor(document, style_manager),
-            'list': ListProcessor(document, style_manager),
-            'table': TableProcessor(document, style_manager),
-            'inline': InlineProcessor(document, style_manager),
-            'code': CodeProcessor(document, style_manager),
-            'image': ImageProcessor(document, style_manager)
-        }
+        # 初始化各类处理器，嵌套元素复用当前工厂中的处理器
+        self.processors: Dict[str, BaseProcessor] = {}
+        for name, processor_class in PROCESSOR_CLASSES.items():
+            processor = processor_class(document, style_manager)
+            processor._registry = self
+            self.processors[name] = processor
+        
+        # 启用耗时统计时为处理器方法计时，顶级元素和经由本工厂分发的嵌套元素都按处理器类记录
+        if timing.current() is not None:
+            for processor in self.processors.values():
+                name = processor.__class__.__name__
+                for method in TIMED_METHODS:
+                    if hasattr(processor, method):
+                        setattr(processor, method, timing.timed_processor(name, getattr(processor, method)))
+        
+        # 段落、标题、列表项和单元格共用的内联处理器
+        self.inline_processor: InlineProcessor = self.processors['inline']
         
         if self.debug_mode:
             self.logger.debug(f"已创建 {len(self.processors)} 个处理器实例")
         
         # 元素类型与处理器映射
-        self.element_map = {
-            'p': self.processors['paragraph'],
-            'h1': self.processors['heading'],
-            'h2': self.processors['heading'],
-            'h3': self.processors['heading'],
-            'h4': self.processors['heading'],
-            'h5': self.processors['heading'],
-            'h6': self.processors['heading'],
-            'ul': self.processors['list'],
-            'ol': self.processors['list'],
-            'table': self.processors['table'],
-            'pre': self.processors['code'],
-            'blockquote': self.processors['paragraph'],  # 特殊处理的段落
-            'div': self.processors['paragraph'],         # 特殊处理的段落
-            'section': self.processors['paragraph'],     # 特殊处理的段落
-            'article': self.processors['paragraph'],     # 特殊处理的段落
-            'main': self.processors['paragraph'],        # 特殊处理的段落
-            'header': self.processors['paragraph'],      # 特殊处理的段落
-            'footer': self.processors['paragraph'],      # 特殊处理的段落
-            'img': self.processors['image'],             # 图片处理器
+        self.element_map: Dict[str, BaseProcessor] = {
+            tag: self.processors[name] for tag, name in TAG_PROCESSORS.items()
         }
         
-        # 内联元素由内联处理器处理
-        inline_tags = ['strong', 'b', 'em', 'i', 'u', 'code', 'a', 'span', 'br']
-        for tag in inline_tags:
-            self.element_map[tag] = self.processors['inline']
+        # 不在映射中的元素类型通过can_process探测的结果，None表示没有处理器
+        self._probed: Dict[str, Optional[BaseProcessor]] = {}
             
         if self.debug_mode:
             self.logger.debug(f"已映射 {len(self.element_map)} 种HTML元素类型到对应处理器")
@@ -108,21 +136,22 @@ class ElementProcessorFactory:
             
         # 使用元素类型映射获取处理器
         processor = self.element_map.get(element.name)
+        if processor is not None:
+            if self.debug_mode:
+                self.logger.debug(f"为元素 <{element.name}> 找到处理器: {processor.__class__.__name__}")
+            return processor
         
-        if processor and self.debug_mode:
-            self.logger.debug(f"为元素 <{element.name}> 找到处理器: {processor.__class__.__name__}")
-        
-        # 如果没有找到处理器，尝试使用自动检测
-        if not processor:
+        # 如果没有找到处理器，尝试使用自动检测，各处理器只根据元素类型判断，结果按元素类型缓存
+        if element.name not in self._probed:
             if self.debug_mode:
                 self.logger.debug(f"在映射中未找到元素 <{element.name}> 的处理器，尝试自动检测")
-            for name, p in self.processors.items():
-                if p.can_process(element):
-                    if self.debug_mode:
-                        self.logger.debug(f"通过自动检测为元素 <{element.name}> 找到处理器: {p.__class__.__name__}")
-                    return p
-            
+            self._probed[element.name] = next(
+                (p for p in self.processors.values() if p.can_process(element)), None)
             if self.debug_mode:
-                self.logger.debug(f"无法找到元素 <{element.name}> 的处理器")
+                if self._probed[element.name] is not None:
+                    self.logger.debug(f"通过自动检测为元素 <{element.name}> 找到处理器: "
+                                      f"{self._probed[element.name].__class__.__name__}")
+                else:
+                    self.logger.debug(f"无法找到元素 <{element.name}> 的处理器")
         
-        return processor 
\ No newline at end of file
+        return self._probed[element.name]
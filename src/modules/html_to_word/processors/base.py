@@ -34,6 +34,7 @@ class BaseProcessor(ABC):
         self.style_manager = style_manager
         self.logger = logging.getLogger(f'HtmlToWordConverter.{self.__class__.__name__}')
         self.debug_mode = style_manager.config.get('debug', {}).get('enabled', False)
+        self._registry = None
     
     @abstractmethod
     def process(self, element: Tag) -> Union[Paragraph, List[Paragraph], None]:
@@ -67,4 +68,40 @@ class BaseProcessor(ABC):
          * @returns {str} 元素的文本内容
          */
         """
-        return element.get_text() if element else "" 
\ No newline at end of file
+        return element.get_text() if element else "" 
+    
+    @property
+    def registry(self) -> 'ElementProcessorFactory':
+        """
+        /**
+         * 当前文档的处理器工厂，由工厂创建的处理器直接使用所属工厂，单独创建的处理器在首次使用时创建
+         * 
+         * @returns {ElementProcessorFactory} 处理器工厂
+         */
+        """
+        if self._registry is None:
+            from ..element_factory import ElementProcessorFactory
+            self._registry = ElementProcessorFactory(self.document, self.style_manager)
+        return self._registry
+    
+    @property
+    def inline_processor(self) -> 'InlineProcessor':
+        """
+        /**
+         * 当前文档共享的内联处理器，段落、标题、列表项和表格单元格的内联内容都由它处理
+         * 
+         * @returns {InlineProcessor} 内联处理器
+         */
+        """
+        return self.registry.inline_processor
+    
+    def get_child_processor(self, element: Tag) -> Optional['BaseProcessor']:
+        """
+        /**
+         * 获取嵌套子元素的处理器
+         * 
+         * @param {Tag} element - HTML元素
+         * @returns {Optional[BaseProcessor]} 对应的元素处理器或None
+         */
+        """
+        return self.registry.get_processor(element)
@@ -3,16 +3,24 @@
 处理HTML代码块元素
 """
 
+from copy import deepcopy
 from typing import Dict, Any, Optional, List, Union
 from bs4 import Tag
+from docx import Document
 from docx.text.paragraph import Paragraph
+from docx.text.run import Run
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.table import WD_TABLE_ALIGNMENT
 from docx.shared import Pt, RGBColor
-from docx.oxml import parse_xml
+from docx.oxml import parse_xml, OxmlElement
 from docx.oxml.ns import nsdecls, qn
 
 from .base import BaseProcessor
+from ..code_tokens import (CODE_RENDERING_TEXT, CODE_RENDERING_TOKENS, code_language, pygments_available,
+                           tokenize_code)
+
+# 纯文本代码块的背景色（深灰黑色）
+_TEXT_BACKGROUND = "1A1A1A"
 
 class CodeProcessor(BaseProcessor):
     """
@@ -23,6 +31,26 @@ class CodeProcessor(BaseProcessor):
      */
     """
     
+    def __init__(self, document: Document, style_manager):
+        """
+        /**
+         * 初始化代码块处理器
+         * 
+         * @param {Document} document - Word文档对象
+         * @param {DocumentStyleManager} style_manager - 文档样式管理器
+         */
+        """
+        super().__init__(document, style_manager)
+        code_config = self.style_manager.config.get('code_blocks', {})
+        self.rendering = code_config.get('rendering', CODE_RENDERING_TEXT)
+        self.pygments_style = code_config.get('pygments_style', 'monokai')
+        self.token_cache_size = code_config.get('token_cache_size', 1024)
+        self.max_lines_per_cell = code_config.get('max_lines_per_cell', 0)
+        # 按词法单元着色所需的Pygments样式数据，第一次渲染时创建
+        self._token_style = None
+        # 纯文本代码行的run模板，第一次渲染时创建
+        self._text_templates = None
+    
     def can_process(self, element: Tag) -> bool:
         """
         /**
@@ -58,19 +86,65 @@ class CodeProcessor(BaseProcessor):
             return None
             
         # 处理代码文本，移除多余的空行并分割为行
-        code_lines = code_text.strip().split('\n')
+        code = code_text.strip()
+        code_lines = code.split('\n')
         
         if self.debug_mode:
             self.logger.debug(f"代码块包含 {len(code_lines)} 行代码")
         
-        # 创建一个单列表格来容纳代码
-        table = self.document.add_table(rows=1, cols=1)
+        token_style = self._get_token_style() if self.rendering == CODE_RENDERING_TOKENS else None
+        background = token_style['background'] if token_style else _TEXT_BACKGROUND
+        if token_style:
+            # 按词法单元着色，每种词法单元类型使用预先构建的run属性模板，换行使用w:br
+            lines = tokenize_code(code_language(code_element), code, self.token_cache_size)
+        else:
+            lines = code_lines
+        
+        # 超长代码按行数拆分到多个单元格（表格的多行），避免单个巨大的单元格；
+        # text模式下codehilite生成的div.codehilite由段落处理器输出，不经过这里
+        chunk_size = self.max_lines_per_cell if self.max_lines_per_cell > 0 else len(lines)
+        chunks = [lines[i:i + chunk_size] for i in range(0, len(lines), chunk_size)]
+        paragraphs = self._add_code_cells(background, len(chunks))
         
-        # 获取单元格
-        cell = table.cell(0, 0)
+        for paragraph, chunk in zip(paragraphs, chunks):
+            if token_style:
+                self._write_token_runs(paragraph, chunk, token_style)
+            else:
+                self._write_text_runs(paragraph, chunk)
         
-        # 为单元格设置黑色背景
-        # 使用XML直接设置黑色背景
+        if self.debug_mode:
+            self.logger.debug(f"代码块处理完成，已创建黑底白字代码块")
+            
+        # 在表格后添加一个空段落，增加间距
+        spacer = self.document.add_paragraph()
+        return spacer
+    
+    def _add_code_cells(self, bg_color: str, count: int = 1) -> List[Paragraph]:
+        """
+        /**
+         * 添加容纳代码的单列表格，每一行一个单元格，设置背景色、边框和内边距
+         * 
+         * @param {str} bg_color - 背景色，例如 '1A1A1A'
+         * @param {int} count - 单元格数量
+         * @returns {List[Paragraph]} 各单元格中用于写入代码的段落
+         */
+        """
+        # 创建一个单列表格来容纳代码
+        table = self.document.add_table(rows=count, cols=1)
+        # 按行取单元格，table.cell每次调用都会遍历整个表格
+        return [self._setup_code_cell(row.cells[0], bg_color) for row in table.rows]
+    
+    def _setup_code_cell(self, cell, bg_color: str) -> Paragraph:
+        """
+        /**
+         * 设置代码单元格的背景色、边框和内边距
+         * 
+         * @param {_Cell} cell - 单元格
+         * @param {str} bg_color - 背景色，例如 '1A1A1A'
+         * @returns {Paragraph} 单元格中用于写入代码的段落
+         */
+        """
+        # 使用XML直接设置单元格背景
         tc = cell._tc
         tcPr = tc.get_or_add_tcPr()
         
@@ -79,8 +153,7 @@ class CodeProcessor(BaseProcessor):
         if existing_shading is not None:
             tcPr.remove(existing_shading)
         
-        # 创建并添加新的阴影元素 (黑色背景)
-        bg_color = "1A1A1A"  # 深灰黑色
+        # 创建并添加新的阴影元素
         shading_element = parse_xml(
             f'<w:shd {nsdecls("w")} w:val="clear" w:color="auto" w:fill="{bg_color}"/>'
         )
@@ -119,23 +192,154 @@ class CodeProcessor(BaseProcessor):
         paragraph.paragraph_format.line_spacing = 1.0
         paragraph.paragraph_format.space_after = Pt(0)
         paragraph.paragraph_format.space_before = Pt(0)
-        
-        # 添加所有代码行，每行之间添加换行符
-        for i, line in enumerate(code_lines):
+        return paragraph
+    
+    def _get_text_templates(self):
+        """
+        /**
+         * 获取纯文本代码行的run模板，第一次调用时用python-docx的字体属性构建一次
+         * 
+         * @returns {Tuple[CT_R, CT_R, CT_R, CT_R]} (空行run, 文本run, 保留空白的文本run, 换行run)
+         */
+        """
+        if self._text_templates is None:
+            r = OxmlElement('w:r')
+            font = Run(r, None).font
+            # 使用等宽字体显示白色代码
+            font.name = self.style_manager.code_font
+            font.size = Pt(self.style_manager.code_size)
+            font.color.rgb = RGBColor(255, 255, 255)
+            text_run = deepcopy(r)
+            text_run.append(OxmlElement('w:t'))
+            preserve_run = deepcopy(text_run)
+            preserve_run[-1].set(qn('xml:space'), 'preserve')
+            break_run = OxmlElement('w:r')
+            break_run.append(OxmlElement('w:br'))
+            self._text_templates = (r, text_run, preserve_run, break_run)
+        return self._text_templates
+    
+    def _write_text_runs(self, paragraph: Paragraph, lines: List[str]):
+        """
+        /**
+         * 将代码行批量写入段落：每行一个从模板复制的run，行之间插入换行run，
+         * 与逐行add_run并设置字体属性生成的XML相同
+         * 
+         * @param {Paragraph} paragraph - 段落对象
+         * @param {List[str]} lines - 代码行
+         */
+        """
+        empty_run, text_run, preserve_run, break_run = self._get_text_templates()
+        runs = []
+        for i, line in enumerate(lines):
             if i > 0:
-                paragraph.add_run("\n")
-            
-            run = paragraph.add_run(line)
-            # 使用等宽字体显示代码
-            run.font.name = self.style_manager.code_font
-            run.font.size = Pt(self.style_manager.code_size)
-            # 设置为白色文字
-            text_color = "FFFFFF"  # 纯白色
-            run.font.color.rgb = RGBColor(255, 255, 255)
+                runs.append(deepcopy(break_run))
+            if not line:
+                runs.append(deepcopy(empty_run))
+            elif '\t' in line or '\r' in line:
+                # 制表符和回车需要转换为w:tab和w:br，交给python-docx处理
+                r = deepcopy(empty_run)
+                r.text = line
+                runs.append(r)
+            else:
+                r = deepcopy(preserve_run if len(line.strip()) < len(line) else text_run)
+                r[-1].text = line
+                runs.append(r)
+        paragraph._p.extend(runs)
+    
+    def _get_token_style(self) -> Optional[Dict[str, Any]]:
+        """
+        /**
+         * 获取按词法单元着色所需的样式数据，第一次调用时从Pygments样式创建
+         * 
+         * @returns {Optional[Dict[str, Any]]} 背景色、样式类和各词法单元类型的run属性模板，Pygments不可用时返回None
+         */
+        """
+        if self._token_style is None:
+            if not pygments_available():
+                self.rendering = CODE_RENDERING_TEXT
+                return None
+            from pygments.styles import get_style_by_name
+            from pygments.util import ClassNotFound
+            try:
+                style = get_style_by_name(self.pygments_style)
+            except ClassNotFound:
+                self.logger.warning(f"未知的Pygments样式: {self.pygments_style}，使用monokai")
+                style = get_style_by_name('monokai')
+            background = (style.background_color or '#' + _TEXT_BACKGROUND).lstrip('#').upper()
+            if len(background) == 3:
+                background = ''.join(c * 2 for c in background)
+            self._token_style = {'background': background, 'style': style, 'templates': {}, 'shared': {}}
+        return self._token_style
+    
+    def _run_template(self, token_type, token_style: Dict[str, Any]):
+        """
+        /**
+         * 获取词法单元类型的run模板（带属性和空文本的w:r），每种类型只构建一次
+         * 
+         * @param {_TokenType} token_type - Pygments词法单元类型
+         * @param {Dict[str, Any]} token_style - 样式数据
+         * @returns {BaseOxmlElement} w:r元素，最后一个子元素为w:t
+         */
+        """
+        templates = token_style['templates']
+        template = templates.get(token_type)
+        if template is None:
+            attrs = token_style['style'].style_for_token(token_type)
+            props = ((attrs['color'] or self._default_token_color(token_style)).upper(), attrs['bold'], attrs['italic'])
+            # 外观相同的词法单元类型共用一个模板，写入时可以合并相邻的run
+            template = token_style['shared'].get(props)
+            if template is None:
+                color, bold, italic = props
+                font = self.style_manager.code_font
+                template = parse_xml(
+                    f'<w:r {nsdecls("w")}><w:rPr><w:rFonts w:ascii="{font}" w:hAnsi="{font}"/>'
+                    + ('<w:b/>' if bold else '') + ('<w:i/>' if italic else '')
+                    + f'<w:color w:val="{color}"/><w:sz w:val="{int(self.style_manager.code_size * 2)}"/></w:rPr>'
+                    + '<w:t xml:space="preserve"></w:t></w:r>')
+                token_style['shared'][props] = template
+            templates[token_type] = template
+        return template
+    
+    def _default_token_color(self, token_style: Dict[str, Any]) -> str:
+        """
+        /**
+         * 样式没有为词法单元指定颜色时使用的颜色：深色背景用白色，浅色背景用黑色
+         * 
+         * @param {Dict[str, Any]} token_style - 样式数据
+         * @returns {str} 颜色，例如 'FFFFFF'
+         */
+        """
+        background = token_style['background']
+        r, g, b = (int(background[i:i + 2], 16) for i in (0, 2, 4))
+        return 'FFFFFF' if r * 299 + g * 587 + b * 114 < 128000 else '000000'
+    
+    def _write_token_runs(self, paragraph: Paragraph, lines, token_style: Dict[str, Any]):
+        """
+        /**
+         * 将按行分组的词法单元直接写入段落，样式相同的相邻词法单元合并为一个run，行之间插入w:br
+         * 
+         * @param {Paragraph} paragraph - 段落对象
+         * @param {Tuple[TokenLine, ...]} lines - 按行分组的词法单元
+         * @param {Dict[str, Any]} token_style - 样式数据
+         */
+        """
+        from pygments.token import Token
+        p = paragraph._p
+        # 换行run：默认样式的属性加w:br
+        break_run = deepcopy(self._run_template(Token, token_style))
+        break_run[-1] = OxmlElement('w:br')
         
-        if self.debug_mode:
-            self.logger.debug(f"代码块处理完成，已创建黑底白字代码块")
-            
-        # 在表格后添加一个空段落，增加间距
-        spacer = self.document.add_paragraph()
-        return spacer
\ No newline at end of file
+        for index, line in enumerate(lines):
+            if index > 0:
+                p.append(deepcopy(break_run))
+            last_template = last_t = None
+            for token_type, text in line:
+                template = self._run_template(token_type, token_style)
+                if template is last_template:
+                    last_t.text += text
+                    continue
+                r = deepcopy(template)
+                last_t = r[-1]
+                last_t.text = text
+                p.append(r)
+                last_template = template
@@ -8,7 +8,6 @@ from bs4 import Tag
 from docx.text.paragraph import Paragraph
 
 from .base import BaseProcessor
-from .inline import InlineProcessor
 
 class HeadingProcessor(BaseProcessor):
     """
@@ -54,8 +53,7 @@ class HeadingProcessor(BaseProcessor):
             self.style_manager.apply_paragraph_format(p)
             
             # 使用内联元素处理器处理内容
-            inline_processor = InlineProcessor(self.document, self.style_manager)
-            inline_processor.process_inline_elements(element, p)
+            self.inline_processor.process_inline_elements(element, p)
             
             # 设置字体和大小
             for run in p.runs:
@@ -4,8 +4,6 @@
 """
 
 import os
-import tempfile
-import requests
 from typing import Optional, Dict, Any
 from bs4 import Tag
 from docx import Document
@@ -14,6 +12,9 @@ from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.text.paragraph import Paragraph
 
 from .base import BaseProcessor
+from ...image_cache import get_image_cache
+from ...image_normalizer import ImageNormalizer
+from ... import timing
 
 
 class ImageProcessor(BaseProcessor):
@@ -39,7 +40,9 @@ class ImageProcessor(BaseProcessor):
         self.default_image_width = self.image_config.get('default_width', 10)  # 单位：厘米
         self.default_image_height = self.image_config.get('default_height', None)  # 自动计算高度
         self.max_image_width = self.image_config.get('max_width', 15)  # 单位：厘米
-        self.temp_dir = None
+        self.image_cache = get_image_cache(self.style_manager.config)
+        self.normalizer = ImageNormalizer(self.style_manager.config)
+        self.prefetched_images: Dict[str, Optional[str]] = {}  # 预取阶段下载的图片：地址 -> 本地路径
     
     def process(self, element: Tag) -> Optional[Paragraph]:
         """
@@ -59,12 +62,9 @@ class ImageProcessor(BaseProcessor):
             # 获取图片alt文本
             alt = element.get('alt', '')
             
-            # 创建临时目录（如果尚未创建）
-            if self.temp_dir is None:
-                self.temp_dir = tempfile.mkdtemp()
-                
             # 下载或读取图片文件
-            img_path = self._get_image_path(src)
+            with timing.stage('image_io'):
+                img_path = self._get_image_path(src)
             if not img_path:
                 return None
                 
@@ -76,13 +76,18 @@ class ImageProcessor(BaseProcessor):
             if width > self.max_image_width:
                 width = self.max_image_width
                 
+            # 按显示宽度缩小并重新压缩大图（需要启用image_normalize并安装Pillow）
+            with timing.stage('image_normalize'):
+                img_path = self.normalizer.normalize(img_path, width)
+                
             # 创建段落并插入图片
             p = self.document.add_paragraph()
             p.alignment = WD_ALIGN_PARAGRAPH.CENTER
             
             # 插入图片
             run = p.add_run()
-            run.add_picture(img_path, width=Cm(width))
+            with timing.stage('image_io'):
+                run.add_picture(img_path, width=Cm(width))
             
             # 如果有alt文本，添加图片说明
             if alt and self.image_config.get('show_caption', True):
@@ -112,24 +117,23 @@ class ImageProcessor(BaseProcessor):
             
         # 检查是否为URL
         if src.startswith(('http://', 'https://')):
-            try:
-                # 从URL下载图片
-                response = requests.get(src, stream=True, timeout=10)
-                if response.status_code == 200:
-                    # 提取文件名
-                    filename = os.path.basename(src)
-                    if not filename:
-                        filename = f"image_{hash(src)}.jpg"
-                        
-                    # 保存到临时文件
-                    img_path = os.path.join(self.temp_dir, filename)
-                    with open(img_path, 'wb') as f:
-                        for chunk in response.iter_content(1024):
-                            f.write(chunk)
+            # 文档中的远程图片都在预取阶段下载过（禁用图片缓存时下载到转换器的临时目录），
+            # 下载失败时为None，不再重复请求
+            if src in self.prefetched_images:
+                img_path = self.prefetched_images[src]
+                if img_path and os.path.isfile(img_path):
                     return img_path
-            except Exception:
-                pass
-                
+                if img_path and self.image_cache is not None:
+                    # 共享缓存目录的其他进程淘汰了预取的图片，重新获取
+                    img_path = self.image_cache.fetch(src)
+                    if img_path:
+                        return img_path
+            # 优先使用持久化图片缓存，同一图片在多个文档和多次运行之间只下载一次
+            elif self.image_cache is not None:
+                img_path = self.image_cache.fetch(src)
+                if img_path:
+                    return img_path
+
         # 如果是相对路径，尝试在指定目录中查找
         image_dirs = self.image_config.get('search_dirs', [])
         for dir_path in image_dirs:
@@ -173,19 +177,3 @@ class ImageProcessor(BaseProcessor):
             pass
             
         return default_value
-    
-    def cleanup(self):
-        """
-        /**
-         * 清理临时资源
-         */
-        """
-        # 清理临时文件夹
-        if self.temp_dir and os.path.exists(self.temp_dir):
-            try:
-                import shutil
-                shutil.rmtree(self.temp_dir)
-                self.temp_dir = None
-            except Exception as e:
-                self.logger.error(f"清理临时文件失败: {e}")
-                pass 
\ No newline at end of file
@@ -3,11 +3,17 @@
 处理HTML内联元素，如加粗、斜体、链接等
 """
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterable
 from bs4 import Tag
 from docx.text.paragraph import Paragraph
 
 from .base import BaseProcessor
+from ...tree_walker import TreeVisitor, walk_tree
+
+# 内联遍历模式：普通容器，以及子元素为标签的粗体/斜体（直接文本子节点继承格式）
+_MODE_CONTAINER = 'container'
+_MODE_BOLD = 'bold'
+_MODE_ITALIC = 'italic'
 
 class InlineProcessor(BaseProcessor):
     """
@@ -88,13 +94,15 @@ class InlineProcessor(BaseProcessor):
         
         return paragraph
     
-    def process_inline_elements(self, element: Tag, paragraph: Paragraph) -> Paragraph:
+    def process_inline_elements(self, element: Tag, paragraph: Paragraph,
+                                skip_child_tags: Iterable[str] = ()) -> Paragraph:
         """
         /**
          * 处理元素中的所有内联内容
          * 
          * @param {Tag} element - 包含内联内容的HTML元素
          * @param {Paragraph} paragraph - 段落对象
+         * @param {Iterable[str]} skip_child_tags - 跳过的直接子元素标签，例如由调用方单独处理的嵌套列表
          * @returns {Paragraph} 处理后的段落对象
          */
         """
@@ -102,73 +110,101 @@ class InlineProcessor(BaseProcessor):
         if not element or not element.contents:
             return paragraph
             
-        # 处理所有子内容
-        for content in element.contents:
+        # 非递归处理所有子内容，深层嵌套的内联元素不会超出递归深度限制
+        walk_tree(element, _InlineRunVisitor(paragraph, self.style_manager, element, skip_child_tags))
+        
+        return paragraph
+
+
+class _InlineRunVisitor(TreeVisitor):
+    """
+    /**
+     * 内联内容访问者，按文档顺序向段落添加文本run
+     * 
+     * 粗体、斜体元素中含有子标签时，其直接文本子节点带格式输出，
+     * 子标签作为普通容器继续处理其内容
+     */
+    """
+    
+    def __init__(self, paragraph: Paragraph, style_manager, root: Tag, skip_child_tags: Iterable[str] = ()):
+        """
+        /**
+         * @param {Paragraph} paragraph - 段落对象
+         * @param {DocumentStyleManager} style_manager - 文档样式管理器
+         * @param {Tag} root - 被处理的HTML元素
+         * @param {Iterable[str]} skip_child_tags - 跳过的直接子元素标签
+         */
+        """
+        self.paragraph = paragraph
+        self.style_manager = style_manager
+        self.root = root
+        self.skip_child_tags = frozenset(skip_child_tags)
+        self.modes = [_MODE_CONTAINER]
+    
+    def enter(self, content) -> bool:
+        mode = self.modes[-1]
+        paragraph = self.paragraph
+        
+        if self.skip_child_tags and content.parent is self.root and content.name in self.skip_child_tags:
+            return False
+        
+        if mode != _MODE_CONTAINER:
             if isinstance(content, Tag):
-                # 根据不同标签类型进行处理
-                if content.name in ['br']:
-                    # 添加换行
-                    paragraph.add_run('\n')
-                elif content.name in ['strong', 'b']:
-                    # 处理粗体元素
-                    if content.contents:
-                        # 如果包含嵌套元素，递归处理
-                        if any(isinstance(child, Tag) for child in content.contents):
-                            # 创建一个新的run用于包装嵌套元素
-                            for child in content.contents:
-                                if isinstance(child, Tag):
-                                    self.process_inline_elements(child, paragraph)
-                                else:
-                                    # 处理文本内容
-                                    run = paragraph.add_run(str(child))
-                                    run.bold = True
-                                    self.style_manager.apply_default_style(run)
-                        else:
-                            # 只有文本内容，直接处理
-                            run = paragraph.add_run(content.get_text())
-                            run.bold = True
-                            self.style_manager.apply_default_style(run)
-                elif content.name in ['em', 'i']:
-                    # 处理斜体元素
-                    if content.contents:
-                        # 如果包含嵌套元素，递归处理
-                        if any(isinstance(child, Tag) for child in content.contents):
-                            # 创建一个新的run用于包装嵌套元素
-                            for child in content.contents:
-                                if isinstance(child, Tag):
-                                    self.process_inline_elements(child, paragraph)
-                                else:
-                                    # 处理文本内容
-                                    run = paragraph.add_run(str(child))
-                                    run.italic = True
-                                    self.style_manager.apply_default_style(run)
-                        else:
-                            # 只有文本内容，直接处理
-                            run = paragraph.add_run(content.get_text())
-                            run.italic = True
-                            self.style_manager.apply_default_style(run)
-                elif content.name == 'code':
-                    # 处理行内代码
-                    run = paragraph.add_run(content.get_text())
-                    self.style_manager.apply_code_style(run)
-                elif content.name == 'a':
-                    # 处理链接
-                    url = content.get('href', '')
-                    text = content.get_text()
-                    if url and text:
-                        run = paragraph.add_run(text)
-                        self.style_manager.apply_link_style(run)
-                elif content.name in ['p', 'div', 'span']:
-                    # 递归处理块级元素中的内联内容
-                    self.process_inline_elements(content, paragraph)
-                else:
-                    # 递归处理其他标签
-                    self.process_inline_elements(content, paragraph)
+                # 粗体/斜体中的嵌套元素作为容器处理
+                self.modes.append(_MODE_CONTAINER)
+                return True
+            # 处理文本内容
+            run = paragraph.add_run(str(content))
+            if mode == _MODE_BOLD:
+                run.bold = True
             else:
-                # 处理纯文本
-                text = str(content)
-                if text.strip():
-                    run = paragraph.add_run(text)
-                    self.style_manager.apply_default_style(run)
+                run.italic = True
+            self.style_manager.apply_default_style(run)
+            return False
         
-        return paragraph 
\ No newline at end of file
+        if not isinstance(content, Tag):
+            # 处理纯文本
+            text = str(content)
+            if text.strip():
+                run = paragraph.add_run(text)
+                self.style_manager.apply_default_style(run)
+            return False
+        
+        # 根据不同标签类型进行处理
+        if content.name == 'br':
+            # 添加换行
+            paragraph.add_run('\n')
+        elif content.name in ['strong', 'b', 'em', 'i']:
+            # 处理粗体/斜体元素
+            if content.contents:
+                bold = content.name in ['strong', 'b']
+                if any(isinstance(child, Tag) for child in content.contents):
+                    # 包含嵌套元素，继续处理子节点
+                    self.modes.append(_MODE_BOLD if bold else _MODE_ITALIC)
+                    return True
+                # 只有文本内容，直接处理
+                run = paragraph.add_run(content.get_text())
+                if bold:
+                    run.bold = True
+                else:
+                    run.italic = True
+                self.style_manager.apply_default_style(run)
+        elif content.name == 'code':
+            # 处理行内代码
+            run = paragraph.add_run(content.get_text())
+            self.style_manager.apply_code_style(run)
+        elif content.name == 'a':
+            # 处理链接
+            url = content.get('href', '')
+            text = content.get_text()
+            if url and text:
+                run = paragraph.add_run(text)
+                self.style_manager.apply_link_style(run)
+        else:
+            # 块级元素和其他标签继续处理其中的内联内容
+            self.modes.append(_MODE_CONTAINER)
+            return True
+        return False
+    
+    def leave(self, node: Tag):
+        self.modes.pop()
@@ -8,7 +8,10 @@ from bs4 import Tag
 from docx.text.paragraph import Paragraph
 
 from .base import BaseProcessor
-from .inline import InlineProcessor
+from ...tree_walker import TreeVisitor, walk_tree
+
+# 嵌套列表标签，嵌套列表由_process_list单独输出，不计入所在列表项的内容
+_NESTED_LIST_TAGS = ('ul', 'ol')
 
 class ListProcessor(BaseProcessor):
     """
@@ -59,44 +62,38 @@ class ListProcessor(BaseProcessor):
          */
         """
         paragraphs = []
-        is_ordered = element.name == 'ol'
-        item_index = 1
         
-        # 处理列表项
-        for item in element.find_all('li', recursive=False):
-            # 处理有序列表项
+        # 使用显式栈处理嵌套列表，栈中每一项为 [列表项迭代器, 是否有序, 嵌套级别, 下一个序号]
+        stack = [[iter(element.find_all('li', recursive=False)), element.name == 'ol', level, 1]]
+        while stack:
+            frame = stack[-1]
+            item = next(frame[0], None)
+            if item is None:
+                stack.pop()
+                continue
+            items, is_ordered, item_level, item_index = frame
+            
+            # 创建列表项段落
+            p = self.document.add_paragraph()
+            self.style_manager.apply_list_item_format(p, item_level)
+            
             if is_ordered:
-                # 创建列表项段落
-                p = self.document.add_paragraph()
-                self.style_manager.apply_list_item_format(p, level)
-                
                 # 添加有序列表标记
                 p.add_run(f"{item_index}. ")
-                item_index += 1
-                
-                # 处理列表项内容
-                self._process_list_item_content(item, p, level)
-                
-                paragraphs.append(p)
-            # 处理无序列表项
+                frame[3] = item_index + 1
             else:
-                # 创建列表项段落
-                p = self.document.add_paragraph()
-                self.style_manager.apply_list_item_format(p, level)
-                
                 # 添加无序列表标记
                 p.add_run("• ")
-                
-                # 处理列表项内容
-                self._process_list_item_content(item, p, level)
-                
-                paragraphs.append(p)
-                
-            # 处理嵌套列表
+            
+            # 处理列表项内容
+            self._process_list_item_content(item, p, item_level)
+            paragraphs.append(p)
+            
+            # 嵌套列表在下一个列表项之前按顺序处理，逆序入栈
             nested_lists = item.find_all(['ul', 'ol'], recursive=False)
-            for nested_list in nested_lists:
-                nested_paragraphs = self._process_list(nested_list, level + 1)
-                paragraphs.extend(nested_paragraphs)
+            for nested_list in reversed(nested_lists):
+                stack.append([iter(nested_list.find_all('li', recursive=False)),
+                              nested_list.name == 'ol', item_level + 1, 1])
         
         return paragraphs
     
@@ -148,29 +145,36 @@ class ListProcessor(BaseProcessor):
         if complex_elements:
             # 处理第一个复杂元素的内容
             first_element = complex_elements[0]
-            inline_processor = InlineProcessor(self.document, self.style_manager)
-            inline_processor.process_inline_elements(first_element, paragraph)
+            self.inline_processor.process_inline_elements(first_element, paragraph)
             
             # 其他复杂元素需要单独处理
             if len(complex_elements) > 1:
-                from ..element_factory import ElementProcessorFactory
-                factory = ElementProcessorFactory(self.document, self.style_manager)
-                
                 for complex_element in complex_elements[1:]:
-                    processor = factory.get_processor(complex_element)
+                    processor = self.get_child_processor(complex_element)
                     if processor:
                         processor.process(complex_element)
         else:
             # 处理普通内容
-            # 检查列表项内是否包含strong标签
-            strong_tags = element.find_all(['strong', 'b'])
-            if strong_tags:
+            # 检查列表项内（不含嵌套列表）是否包含strong标签
+            if self._contains_bold(element):
                 # 处理列表项中的复杂内容（包含格式化标签）
                 self._process_list_item_with_format(element, paragraph)
             else:
-                # 处理简单文本内容
-                inline_processor = InlineProcessor(self.document, self.style_manager)
-                inline_processor.process_inline_elements(element, paragraph)
+                # 处理简单文本内容，嵌套列表在外部处理
+                self.inline_processor.process_inline_elements(element, paragraph, _NESTED_LIST_TAGS)
+    
+    def _contains_bold(self, element: Tag) -> bool:
+        """
+        /**
+         * 检查列表项自身内容中是否包含粗体标签，不检查嵌套列表
+         * 
+         * @param {Tag} element - 列表项元素
+         * @returns {bool} 是否包含strong或b标签
+         */
+        """
+        visitor = _BoldFinder(element)
+        walk_tree(element, visitor)
+        return visitor.found
     
     def _process_list_item_with_format(self, element: Tag, paragraph: Paragraph):
         """
@@ -184,7 +188,7 @@ class ListProcessor(BaseProcessor):
         # 收集所有需要单独处理的子元素
         for content in element.children:
             if isinstance(content, Tag):
-                if content.name in ['ul', 'ol']:
+                if content.name in _NESTED_LIST_TAGS:
                     # 嵌套列表会在外部处理
                     continue
                 elif content.name in ['strong', 'b']:
@@ -206,11 +210,30 @@ class ListProcessor(BaseProcessor):
                     paragraph.add_run('\n')
                 else:
                     # 使用内联处理器处理其他标签
-                    inline_processor = InlineProcessor(self.document, self.style_manager)
-                    inline_processor.process(content, paragraph)
+                    self.inline_processor.process(content, paragraph)
             else:
                 # 处理纯文本
                 text = str(content)
                 if text.strip():
                     run = paragraph.add_run(text)
-                    self.style_manager.apply_default_style(run) 
\ No newline at end of file
+                    self.style_manager.apply_default_style(run) 
+
+
+class _BoldFinder(TreeVisitor):
+    """
+    /**
+     * 查找粗体标签的访问者，跳过列表项的嵌套列表，找到后不再进入子树
+     */
+    """
+    
+    def __init__(self, root: Tag):
+        self.root = root
+        self.found = False
+    
+    def enter(self, node) -> bool:
+        if self.found or not isinstance(node, Tag):
+            return False
+        if node.name in ('strong', 'b'):
+            self.found = True
+            return False
+        return not (node.parent is self.root and node.name in _NESTED_LIST_TAGS)
@@ -11,7 +11,7 @@ from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.shared import Inches
 
 from .base import BaseProcessor
-from .inline import InlineProcessor
+from ...tree_walker import TreeVisitor, walk_tree
 
 class ParagraphProcessor(BaseProcessor):
     """
@@ -78,8 +78,7 @@ class ParagraphProcessor(BaseProcessor):
                 self.logger.debug(f"应用段落对齐方式: {element['align'].lower()}")
         
         # 使用内联元素处理器处理内容
-        inline_processor = InlineProcessor(self.document, self.style_manager)
-        inline_processor.process_inline_elements(element, p)
+        self.inline_processor.process_inline_elements(element, p)
         
         if self.debug_mode:
             self.logger.debug(f"段落处理完成，文本内容: {p.text[:30]}{'...' if len(p.text) > 30 else ''}")
@@ -99,39 +98,47 @@ class ParagraphProcessor(BaseProcessor):
             
         paragraphs = []
         
-        # 为引用块中的每个子元素创建段落
-        for child in element.children:
-            if isinstance(child, Tag):
-                if child.name == 'p':
-                    # 创建带引用样式的段落
-                    p = self.document.add_paragraph()
-                    self.style_manager.apply_quote_format(p)
-                    
-                    # 添加引用样式的竖线
-                    p.add_run('│ ')
-                    
-                    # 处理段落内容
-                    inline_processor = InlineProcessor(self.document, self.style_manager)
-                    inline_processor.process_inline_elements(child, p)
-                    
-                    paragraphs.append(p)
-                    if self.debug_mode:
-                        self.logger.debug(f"处理引用块中的段落: {p.text[:30]}{'...' if len(p.text) > 30 else ''}")
-                else:
-                    # 处理其他类型的子元素
-                    if self.debug_mode:
-                        self.logger.debug(f"处理引用块中的其他元素: <{child.name}>")
-                    # 获取处理器
-                    from ..element_factory import ElementProcessorFactory
-                    factory = ElementProcessorFactory(self.document, self.style_manager)
-                    processor = factory.get_processor(child)
-                    
-                    if processor:
-                        result = processor.process(child)
-                        if isinstance(result, list):
-                            paragraphs.extend(result)
-                        elif result:
-                            paragraphs.append(result)
+        # 嵌套引用块直接展开其子元素，使用显式栈避免深层嵌套时递归
+        stack = [iter(element.children)]
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+                continue
+            if not isinstance(child, Tag):
+                continue
+            
+            if child.name == 'p':
+                # 创建带引用样式的段落
+                p = self.document.add_paragraph()
+                self.style_manager.apply_quote_format(p)
+                
+                # 添加引用样式的竖线
+                p.add_run('│ ')
+                
+                # 处理段落内容
+                self.inline_processor.process_inline_elements(child, p)
+                
+                paragraphs.append(p)
+                if self.debug_mode:
+                    self.logger.debug(f"处理引用块中的段落: {p.text[:30]}{'...' if len(p.text) > 30 else ''}")
+            elif child.name == 'blockquote':
+                if self.debug_mode:
+                    self.logger.debug(f"处理嵌套引用块元素: <{child.name}>")
+                stack.append(iter(child.children))
+            else:
+                # 处理其他类型的子元素
+                if self.debug_mode:
+                    self.logger.debug(f"处理引用块中的其他元素: <{child.name}>")
+                # 获取处理器
+                processor = self.get_child_processor(child)
+                
+                if processor:
+                    result = processor.process(child)
+                    if isinstance(result, list):
+                        paragraphs.extend(result)
+                    elif result:
+                        paragraphs.append(result)
         
         if self.debug_mode:
             self.logger.debug(f"引用块处理完成，生成了 {len(paragraphs)} 个段落")
@@ -161,28 +168,13 @@ class ParagraphProcessor(BaseProcessor):
             re.compile(r'^\s*[a-zA-Z][\.\)]\s')  # 字母列表: "a. " 或 "A) "
         ]
         
-        # 拆分文本，检查每行是否符合列表项格式
-        lines = []
-        current_line = ""
-        
-        # 递归收集所有文本，保持顺序
-        def collect_text(node):
-            nonlocal current_line
-            if isinstance(node, Tag):
-                if node.name == 'br':
-                    lines.append(current_line)
-                    current_line = ""
-                else:
-                    for child in node.children:
-                        collect_text(child)
-            else:
-                current_line += str(node)
-        
-        # 收集第一级子元素的文本
-        for child in element.children:
-            collect_text(child)
+        # 拆分文本，检查每行是否符合列表项格式，按文档顺序收集所有文本
+        collector = _BrLineCollector()
+        walk_tree(element, collector)
+        lines = collector.lines
         
         # 添加最后一行
+        current_line = ''.join(collector.current_line)
         if current_line:
             lines.append(current_line)
         
@@ -211,4 +203,26 @@ class ParagraphProcessor(BaseProcessor):
             return True
             
         # 如果不是类似列表，返回False
-        return False 
\ No newline at end of file
+        return False 
+
+
+class _BrLineCollector(TreeVisitor):
+    """
+    /**
+     * 按br标签拆分文本行的访问者
+     */
+    """
+    
+    def __init__(self):
+        self.lines: List[str] = []
+        self.current_line: List[str] = []
+    
+    def enter(self, node) -> bool:
+        if isinstance(node, Tag):
+            if node.name == 'br':
+                self.lines.append(''.join(self.current_line))
+                self.current_line = []
+                return False
+            return True
+        self.current_line.append(str(node))
+        return False
@@ -3,18 +3,23 @@
 处理HTML表格元素
 """
 
+import re
+from copy import deepcopy
 from typing import Dict, Any, Optional, List, Union, Tuple
 from bs4 import Tag
 from docx.text.paragraph import Paragraph
 from docx.table import Table, _Cell
 from docx.enum.table import WD_TABLE_ALIGNMENT, WD_CELL_VERTICAL_ALIGNMENT
 from docx.shared import Pt, Cm, RGBColor, Inches
-from docx.oxml import parse_xml
+from docx.oxml import parse_xml, OxmlElement
 from docx.oxml.ns import nsdecls, qn
+from docx.oxml.simpletypes import ST_Merge
 from docx.document import Document
 
 from .base import BaseProcessor
-from .inline import InlineProcessor
+
+# 单元格style属性中的对齐方式
+_TEXT_ALIGN_PATTERN = re.compile(r'text-align:\s*(\w+)')
 
 # 定义边框样式常量
 class BORDER_STYLE:
@@ -102,60 +107,95 @@ class TableProcessor(BaseProcessor):
             return None
             
         # 计算列数
-        max_cols = 0
-        for row in rows:
-            cols = row.find_all(['td', 'th'], recursive=False)
-            max_cols = max(max_cols, len(cols))
+        row_cells = [row.find_all(['td', 'th'], recursive=False) for row in rows]
+        max_cols = max(len(cells) for cells in row_cells)
             
         if max_cols == 0:
             return None
+        
+        # 先根据HTML计算每个单元格的位置和需要合并的区域
+        placements, merges = self._layout_cells(row_cells, max_cols)
             
-        # 创建表格
-        table = self.document.add_table(rows=len(rows), cols=max_cols)
-        
-        # 全局设置所有单元格垂直居中 - 在应用样式前确保基础设置
-        for i in range(len(table.rows)):
-            for j in range(len(table.columns)):
-                cell = table.cell(i, j)
-                cell.vertical_alignment = WD_CELL_VERTICAL_ALIGNMENT.CENTER
-        
-        # 应用表格样式
-        self._apply_table_style(table, element)
-        
-        # 填充表格内容
-        self._fill_table_content(table, rows, max_cols)
-        
-        # 最后再次确保表头行垂直居中
-        if len(table.rows) > 0:
-            for cell in table.rows[0].cells:
-                cell.vertical_alignment = WD_CELL_VERTICAL_ALIGNMENT.CENTER
-                # 使用XML直接设置垂直对齐
-                tc = cell._tc
-                tcPr = tc.get_or_add_tcPr()
-                vAlign_element = parse_xml(f'<w:vAlign {nsdecls("w")} w:val="center"/>')
-                
-                # 移除现有的垂直对齐设置（如果有）
-                for old in tcPr.findall('.//{*}vAlign'):
-                    tcPr.remove(old)
-                
-                # 添加新的垂直对齐设置
-                tcPr.append(vAlign_element)
+        # 创建只包含表格属性和列定义的空表格，行由流式构建器逐行生成
+        table = self.document.add_table(rows=0, cols=max_cols)
+        
+        # 应用表格样式：每张表只构建一次属性模板，每个单元格的每项属性只写入一次
+        templates = self._build_style_templates(table, element)
+        
+        # 逐行生成表格行并填充内容
+        self._write_rows(table, rows, max_cols, placements, merges, templates)
         
         # 在表格后添加空白段落
         spacer = self.document.add_paragraph()
         return spacer
     
-    def _apply_table_style(self, table: Table, element: Tag):
+    def _layout_cells(self, row_cells: List[List[Tag]], max_cols: int) -> Tuple[List[List[Tuple[int, Tag]]], List[Tuple[int, int, int, int]]]:
         """
         /**
-         * 应用表格样式
+         * 计算HTML单元格在表格网格中的位置
+         * 
+         * @param {List[List[Tag]]} row_cells - 每行的HTML单元格列表
+         * @param {int} max_cols - 最大列数
+         * @returns {Tuple} (每行的 (列索引, HTML单元格) 列表, 需要合并的 (起始行, 起始列, 结束行, 结束列) 列表)
+         */
+        """
+        # 创建单元格合并跟踪矩阵
+        # 值为0表示正常可用单元格，值为1表示被合并的单元格
+        row_count = len(row_cells)
+        merged_matrix = [[0 for _ in range(max_cols)] for _ in range(row_count)]
+        placements = []
+        merges = []
+        
+        for i, cells in enumerate(row_cells):
+            row_placements = []
+            
+            col_index = 0  # 实际列索引，会根据合并单元格情况调整
+            for cell in cells:
+                # 跳过已被合并的单元格
+                while col_index < max_cols and merged_matrix[i][col_index] == 1:
+                    col_index += 1
+                
+                if col_index >= max_cols:
+                    break
+                    
+                # 处理合并单元格
+                rowspan = int(cell.get('rowspan', 1))
+                colspan = int(cell.get('colspan', 1))
+                
+                if rowspan > 1 or colspan > 1:
+                    # 标记被合并的单元格
+                    for r in range(i, min(i + rowspan, row_count)):
+                        for c in range(col_index, min(col_index + colspan, max_cols)):
+                            if r != i or c != col_index:
+                                merged_matrix[r][c] = 1
+                    
+                    end_row = min(i + rowspan - 1, row_count - 1)
+                    end_col = min(col_index + colspan - 1, max_cols - 1)
+                    merges.append((i, col_index, end_row, end_col))
+                
+                row_placements.append((col_index, cell))
+                
+                # 移动到下一列
+                col_index += colspan
+            placements.append(row_placements)
+        
+        return placements, merges
+    
+    def _build_style_templates(self, table: Table, element: Tag) -> Dict[str, Any]:
+        """
+        /**
+         * 构建表格样式模板
+         * 
+         * 边框、背景色、垂直对齐和行高等属性元素每张表只解析一次，写入单元格时复制模板
          * 
          * @param {Table} table - Word表格对象
          * @param {Tag} element - HTML表格元素
+         * @returns {Dict[str, Any]} 属性模板字典，值为lxml元素、None或配置值
          */
         """
         # 获取增强表格样式配置
         enhanced_styles = self.style_manager.config.get('enhanced_table_styles', {})
+        templates: Dict[str, Any] = {}
         
         if self.debug_mode:
             self.logger.debug(f"应用表格样式，配置为: {enhanced_styles}")
@@ -197,7 +237,8 @@ class TableProcessor(BaseProcessor):
             if self.debug_mode:
                 self.logger.error(f"设置表格宽度错误: {e}")
                 
-        # 应用边框样式
+        # 边框样式
+        templates['borders'] = None
         try:
             # 获取边框样式配置
             border_style = enhanced_styles.get('border_style', 'single')
@@ -223,225 +264,86 @@ class TableProcessor(BaseProcessor):
             # 解析颜色
             if border_color.startswith('#'):
                 border_color = border_color[1:]
-                
-            # 为表格应用边框样式
-            for row in table.rows:
-                for cell in row.cells:
-                    # 使用XML直接设置边框样式
-                    tc = cell._tc
-                    tcPr = tc.get_or_add_tcPr()
-                    
-                    # 创建边框XML元素
-                    borders_xml = f'<w:tcBorders {nsdecls("w")}>'
-                    
-                    # 添加四个方向的边框
-                    for direction in ['top', 'left', 'bottom', 'right']:
-                        borders_xml += f'<w:{direction} w:val="{doc_border_style}" w:sz="{border_size*4}" w:space="0" w:color="{border_color}"/>'
-                    
-                    borders_xml += '</w:tcBorders>'
-                    
-                    # 移除可能存在的旧边框设置
-                    for old in tcPr.findall('.//{*}tcBorders'):
-                        tcPr.remove(old)
-                    
-                    # 添加新的边框设置
-                    tcPr.append(parse_xml(borders_xml))
+            
+            # 创建边框XML元素，包含四个方向的边框
+            borders_xml = f'<w:tcBorders {nsdecls("w")}>'
+            for direction in ['top', 'left', 'bottom', 'right']:
+                borders_xml += f'<w:{direction} w:val="{doc_border_style}" w:sz="{border_size*4}" w:space="0" w:color="{border_color}"/>'
+            borders_xml += '</w:tcBorders>'
+            templates['borders'] = parse_xml(borders_xml)
             
             if self.debug_mode:
-                self.logger.debug(f"已应用表格边框样式: {border_style}, 粗细: {border_size}pt, 颜色: #{border_color}")
+                self.logger.debug(f"表格边框样式: {border_style}, 粗细: {border_size}pt, 颜色: #{border_color}")
         except Exception as e:
             if self.debug_mode:
                 self.logger.error(f"设置表格边框错误: {e}")
         
-        # 设置表格行高
-        try:
-            # 获取行高配置
-            height_config = enhanced_styles.get('row_height', {})
-            
-            # 默认值
+        # 行高，兼容旧配置：row_height不是字典时直接使用cell_height作为默认行高
+        height_config = enhanced_styles.get('row_height', {})
+        if isinstance(height_config, dict):
             default_row_height = height_config.get('default', 0.95)  # 默认行高，单位：厘米
             header_row_height = height_config.get('header', default_row_height)  # 表头行高，单位：厘米
-            min_row_height = height_config.get('min', 0.5)  # 最小允许行高，单位：厘米
-            max_row_height = height_config.get('max', 2.0)  # 最大允许行高，单位：厘米
             auto_adjust = height_config.get('auto_adjust', True)  # 默认启用自动调整行高
-            
-            # 如果配置是简单的数字，则使用该值作为所有行的高度
-            if isinstance(enhanced_styles.get('cell_height'), (int, float)):
-                default_row_height = float(enhanced_styles.get('cell_height'))
-                header_row_height = default_row_height
-            
-            if self.debug_mode:
-                self.logger.debug(f"行高配置: 默认={default_row_height}厘米, 表头={header_row_height}厘米, "
-                                  f"最小={min_row_height}厘米, 最大={max_row_height}厘米, 自动调整={auto_adjust}")
-            
-            # 设置每一行的高度
-            for i, row in enumerate(table.rows):
-                # 确定当前行使用的行高值
-                current_height = header_row_height if i == 0 else default_row_height
-                
-                # 确保高度在合理范围内
-                current_height = max(min_row_height, min(current_height, max_row_height))
-                
-                # 设置行高
-                row.height = Cm(current_height)
-                
-                # 使用XML直接设置高度类型为"确切值"(exact)而非"至少值"(atLeast)
-                # 除非配置了自动调整行高，则使用"至少值"来允许根据内容自动扩展行高
-                height_rule = "atLeast" if auto_adjust else "exact"
-                
-                tr = row._tr
-                trPr = tr.get_or_add_trPr()
-                trHeight = parse_xml(f'<w:trHeight {nsdecls("w")} w:val="{int(current_height*567.0)}" w:hRule="{height_rule}"/>')
-                
-                # 移除可能存在的旧设置
-                for old in trPr.findall('.//{*}trHeight'):
-                    trPr.remove(old)
-                    
-                # 添加新设置
-                trPr.append(trHeight)
-                
-            if self.debug_mode:
-                self.logger.debug(f"已设置表格行高，类型: {height_rule}")
-        except Exception as e:
-            if self.debug_mode:
-                self.logger.error(f"设置表格行高错误: {str(e)}")
+        else:
+            default_row_height = enhanced_styles.get('cell_height', 0.95)  # 单位：厘米
+            header_row_height = default_row_height
+            auto_adjust = True  # 默认启用自动调整
         
-        # 设置背景颜色
-        even_row_color = enhanced_styles.get('even_row_color')
+        # 高度类型为"确切值"(exact)或"至少值"(atLeast)，自动调整行高时允许根据内容扩展
+        height_rule = "atLeast" if auto_adjust else "exact"
+        templates['header_height'] = parse_xml(
+            f'<w:trHeight {nsdecls("w")} w:val="{int(header_row_height*567.0)}" w:hRule="{height_rule}"/>')
+        templates['row_height'] = parse_xml(
+            f'<w:trHeight {nsdecls("w")} w:val="{int(default_row_height*567.0)}" w:hRule="{height_rule}"/>')
+        
+        if self.debug_mode:
+            self.logger.debug(f"行高配置: 默认={default_row_height}厘米, 表头={header_row_height}厘米, 类型: {height_rule}")
+        
+        # 背景颜色
         header_bg_color = enhanced_styles.get('header_bg_color')
+        even_row_color = enhanced_styles.get('even_row_color')
         if self.debug_mode:
             self.logger.debug(f"表头背景色: {header_bg_color}, 偶数行背景色: {even_row_color}")
-        
-        # 应用表头背景色
-        if header_bg_color and len(table.rows) > 0:
-            try:
-                self._set_row_bg_color(table, 0, header_bg_color)
-                if self.debug_mode:
-                    self.logger.debug("已应用表头背景色")
-            except Exception as e:
-                if self.debug_mode:
-                    self.logger.error(f"设置表头背景色错误: {e}")
-            
-        # 应用隔行背景色
-        if even_row_color:
-            try:
-                for i in range(1, len(table.rows), 2):
-                    self._set_row_bg_color(table, i, even_row_color)
-                if self.debug_mode:
-                    self.logger.debug("已应用隔行背景色")
-            except Exception as e:
-                if self.debug_mode:
-                    self.logger.error(f"设置隔行背景色错误: {e}")
+        templates['header_shading'] = self._build_shading(header_bg_color) if header_bg_color else None
+        templates['even_shading'] = self._build_shading(even_row_color) if even_row_color else None
         
         # 设置表头在分页时保持可见
-        if enhanced_styles.get('keep_header_visible', True) and len(table.rows) > 0:
+        templates['cant_split'] = None
+        if enhanced_styles.get('keep_header_visible', True):
             try:
-                # 获取表格第一行
-                first_row = table.rows[0]._tr
-                
                 # 设置表格重复标题行属性
                 tbl_pr = table._tbl.get_or_add_tblPr()
-                
-                # 添加表头行重复属性
                 tbl_pr.append(parse_xml(f'<w:tblHeader {nsdecls("w")}/>'))
                 
-                # 设置行属性不允许分页
-                tr_pr = first_row.get_or_add_trPr()
-                tr_pr.append(parse_xml(f'<w:cantSplit {nsdecls("w")}/>'))
+                # 表头行不允许分页
+                templates['cant_split'] = parse_xml(f'<w:cantSplit {nsdecls("w")}/>')
                 if self.debug_mode:
                     self.logger.debug("已设置表头在分页时保持可见")
             except Exception as e:
                 if self.debug_mode:
                     self.logger.error(f"设置表头分页属性错误: {e}")
-            
-        # 设置垂直对齐方式
+        
+        # 垂直对齐方式：填充了内容的单元格和表头行居中，其余单元格使用配置的对齐方式
         vertical_align = enhanced_styles.get('vertical_align', 'center')
-        vertical_align_map = {
-            'top': WD_CELL_VERTICAL_ALIGNMENT.TOP,
-            'center': WD_CELL_VERTICAL_ALIGNMENT.CENTER,
-            'bottom': WD_CELL_VERTICAL_ALIGNMENT.BOTTOM
-        }
+        if vertical_align not in ('top', 'center', 'bottom'):
+            vertical_align = 'center'
+        templates['valign_center'] = parse_xml(f'<w:vAlign {nsdecls("w")} w:val="center"/>')
+        templates['valign_default'] = parse_xml(f'<w:vAlign {nsdecls("w")} w:val="{vertical_align}"/>')
         
-        cell_v_align = vertical_align_map.get(vertical_align, WD_CELL_VERTICAL_ALIGNMENT.CENTER)
-        try:
-            # 设置所有单元格的垂直对齐方式
-            for row in table.rows:
-                for cell in row.cells:
-                    # 使用python-docx API设置垂直对齐
-                    cell.vertical_alignment = cell_v_align
-                    
-                    # 使用XML直接设置垂直对齐，确保所有Office版本兼容
-                    tc = cell._tc
-                    tcPr = tc.get_or_add_tcPr()
-                    
-                    # 映射垂直对齐方式到XML值
-                    xml_valign = {
-                        WD_CELL_VERTICAL_ALIGNMENT.TOP: 'top',
-                        WD_CELL_VERTICAL_ALIGNMENT.CENTER: 'center',
-                        WD_CELL_VERTICAL_ALIGNMENT.BOTTOM: 'bottom',
-                        WD_CELL_VERTICAL_ALIGNMENT.BOTH: 'both'
-                    }.get(cell_v_align, 'center')
-                    
-                    # 创建垂直对齐XML元素
-                    vAlign_element = parse_xml(f'<w:vAlign {nsdecls("w")} w:val="{xml_valign}"/>')
-                    
-                    # 移除现有的垂直对齐设置（如果有）
-                    for old in tcPr.findall('.//{*}vAlign'):
-                        tcPr.remove(old)
-                    
-                    # 添加新的垂直对齐设置
-                    tcPr.append(vAlign_element)
-                    
-            if self.debug_mode:
-                self.logger.debug(f"已应用垂直对齐方式: {vertical_align} (XML: {xml_valign})")
-        except Exception as e:
-            if self.debug_mode:
-                self.logger.error(f"设置垂直对齐方式错误: {e}")
-                
-        # 特别处理表头行，确保表头垂直居中
-        try:
-            if len(table.rows) > 0:
-                header_row = table.rows[0]
-                for cell in header_row.cells:
-                    # 使用python-docx API设置垂直对齐
-                    cell.vertical_alignment = WD_CELL_VERTICAL_ALIGNMENT.CENTER
-                    
-                    # 使用XML直接设置垂直对齐，加强处理确保最终生效
-                    tc = cell._tc
-                    tcPr = tc.get_or_add_tcPr()
-                    vAlign_element = parse_xml(f'<w:vAlign {nsdecls("w")} w:val="center"/>')
-                    
-                    # 移除现有的垂直对齐设置（如果有）
-                    for old in tcPr.findall('.//{*}vAlign'):
-                        tcPr.remove(old)
-                    
-                    # 添加新的垂直对齐设置
-                    tcPr.append(vAlign_element)
-                    
-                if self.debug_mode:
-                    self.logger.debug(f"已特别强化表头行的垂直居中设置")
-        except Exception as e:
-            if self.debug_mode:
-                self.logger.error(f"强化设置表头行垂直对齐方式错误: {e}")
+        # 单元格文字对齐方式，默认左对齐，仅表头默认居中
+        templates['text_align'] = enhanced_styles.get('text_align', 'left')
+        
+        return templates
     
-    def _set_row_bg_color(self, table: Table, row_index: int, color_str: str):
+    def _build_shading(self, color_str: str):
         """
         /**
-         * 设置表格行的背景颜色
+         * 构建单元格背景色元素
          * 
-         * @param {Table} table - Word表格对象
-         * @param {int} row_index - 行索引
-         * @param {str} color_str - 颜色字符串，例如 '#RRGGBB'
+         * @param {str} color_str - 颜色字符串，例如 '#RRGGBB'，无法解析时使用默认浅灰色
+         * @returns {BaseOxmlElement} w:shd元素
          */
         """
-        if row_index >= len(table.rows):
-            if self.debug_mode:
-                self.logger.debug(f"行索引超出范围: {row_index}, 表格总行数: {len(table.rows)}")
-            return
-            
-        if self.debug_mode:
-            self.logger.debug(f"设置行 {row_index} 背景色: {color_str}")
-        
         try:
             # 解析颜色，支持 '#RRGGBB' 格式
             if color_str.startswith('#'):
@@ -452,192 +354,124 @@ class TableProcessor(BaseProcessor):
             g = int(color_str[2:4], 16)
             b = int(color_str[4:6], 16)
             hex_color = f"{r:02x}{g:02x}{b:02x}"
-            if self.debug_mode:
-                self.logger.debug(f"解析的颜色: R={r}, G={g}, B={b}, HEX={hex_color}")
-            
-            # 获取行对象
-            row = table.rows[row_index]
-            
-            # 为行中的每个单元格设置背景色
-            for cell in row.cells:
-                # 使用XML直接设置背景色，而不是通过python-docx API
-                tc = cell._tc
-                tcPr = tc.get_or_add_tcPr()
-                
-                # 移除现有的单元格阴影设置（如果有）
-                existing_shading = tcPr.find(qn('w:shd'))
-                if existing_shading is not None:
-                    tcPr.remove(existing_shading)
-                
-                # 创建并添加新的阴影元素 (使用w:fill属性设置背景色)
-                shading_element = parse_xml(
-                    f'<w:shd {nsdecls("w")} w:val="clear" w:color="auto" w:fill="{hex_color}"/>'
-                )
-                tcPr.append(shading_element)
-            
-            if self.debug_mode:
-                self.logger.debug(f"已成功设置行 {row_index} 的背景色")
-            
         except Exception as e:
             if self.debug_mode:
-                self.logger.error(f"设置背景色错误: {e}")
-            # 如果发生错误，使用默认浅灰色
-            try:
-                # 获取行对象
-                row = table.rows[row_index]
-                
-                # 为行中的每个单元格设置背景色
-                for cell in row.cells:
-                    tc = cell._tc
-                    tcPr = tc.get_or_add_tcPr()
-                    
-                    # 移除现有的单元格阴影设置（如果有）
-                    existing_shading = tcPr.find(qn('w:shd'))
-                    if existing_shading is not None:
-                        tcPr.remove(existing_shading)
-                    
-                    # 使用默认的浅灰色
-                    shading_element = parse_xml(
-                        f'<w:shd {nsdecls("w")} w:val="clear" w:color="auto" w:fill="E7E6E6"/>'
-                    )
-                    tcPr.append(shading_element)
-                
-                if self.debug_mode:
-                    self.logger.debug("已应用默认背景色")
-            except Exception as ex:
-                if self.debug_mode:
-                    self.logger.error(f"应用默认背景色也失败: {ex}")
+                self.logger.error(f"解析背景色错误: {e}，使用默认背景色")
+            hex_color = "E7E6E6"
+        
+        # 使用w:fill属性设置背景色
+        return parse_xml(f'<w:shd {nsdecls("w")} w:val="clear" w:color="auto" w:fill="{hex_color}"/>')
     
-    def _fill_table_content(self, table: Table, rows: List[Tag], max_cols: int):
+    def _span_plan(self, merges: List[Tuple[int, int, int, int]]) -> Tuple[Dict[Tuple[int, int], Tuple[int, Optional[str]]], set]:
         """
         /**
-         * 填充表格内容
+         * 将合并区域转换为单元格属性
          * 
-         * @param {Table} table - Word表格对象
-         * @param {List[Tag]} rows - 表格行元素列表
-         * @param {int} max_cols - 最大列数
+         * 每个合并区域每行保留最左侧的单元格，设置gridSpan为合并列数，纵向合并时首行vMerge为restart、
+         * 其余行为continue，区域内其他单元格不生成；与之前已生效的合并区域重叠的合并被忽略
+         * 
+         * @param {List[Tuple[int, int, int, int]]} merges - (起始行, 起始列, 结束行, 结束列) 列表
+         * @returns {Tuple} ({(行, 列): (合并列数, vMerge值)}, 不生成的单元格位置集合)
          */
         """
-        # 从配置中获取行高
-        enhanced_styles = self.style_manager.config.get('enhanced_table_styles', {})
-        
-        # 获取行高配置
-        height_config = enhanced_styles.get('row_height', {})
-        if isinstance(height_config, dict):
-            default_row_height = height_config.get('default', 0.95)  # 默认行高，单位：厘米
-            header_row_height = height_config.get('header', default_row_height)  # 表头行高，单位：厘米
-            auto_adjust = height_config.get('auto_adjust', True)  # 默认启用自动调整行高
-        else:
-            # 兼容旧配置，直接使用cell_height作为默认行高
-            default_row_height = enhanced_styles.get('cell_height', 0.95)  # 单位：厘米
-            header_row_height = default_row_height
-            auto_adjust = True  # 默认启用自动调整
-        
-        if self.debug_mode:
-            self.logger.debug(f"填充表格内容，行数: {len(rows)}，列数: {max_cols}，"
-                              f"默认行高: {default_row_height}厘米，表头行高: {header_row_height}厘米，"
-                              f"自动调整: {auto_adjust}")
-            
-        # 创建单元格合并跟踪矩阵
-        # 值为0表示正常可用单元格，值为1表示被合并的单元格
-        merged_matrix = [[0 for _ in range(max_cols)] for _ in range(len(rows))]
-        
-        # 填充表格内容
-        for i, row in enumerate(rows):
-            # 确定当前行使用的行高值
-            current_height = header_row_height if i == 0 else default_row_height
-            
-            # 设置行高为固定值或自动调整值
-            try:
-                table_row = table.rows[i]
-                table_row.height = Cm(current_height)
-                
-                # 使用XML直接设置高度类型
-                height_rule = "atLeast" if auto_adjust else "exact"
-                
-                tr = table_row._tr
-                trPr = tr.get_or_add_trPr()
-                trHeight = parse_xml(f'<w:trHeight {nsdecls("w")} w:val="{int(current_height*567.0)}" w:hRule="{height_rule}"/>')
-                
-                # 移除可能存在的旧设置
-                for old in trPr.findall('.//{*}trHeight'):
-                    trPr.remove(old)
-                    
-                # 添加新设置
-                trPr.append(trHeight)
-                
-                if self.debug_mode and i == 0:
-                    self.logger.debug(f"设置第 {i+1} 行高度: {current_height}厘米, 类型: {height_rule}")
-            except Exception as e:
+        spans: Dict[Tuple[int, int], Tuple[int, Optional[str]]] = {}
+        covered = set()
+        occupied = set()
+        for start_row, start_col, end_row, end_col in merges:
+            if end_row == start_row and end_col == start_col:
+                continue
+            area = [(r, c) for r in range(start_row, end_row + 1) for c in range(start_col, end_col + 1)]
+            if any(position in occupied for position in area):
                 if self.debug_mode:
-                    self.logger.error(f"在填充内容过程中设置行 {i} 高度时出错: {str(e)}")
-            
-            cells = row.find_all(['td', 'th'], recursive=False)
-            is_header = row.parent.name == 'thead' or cells and cells[0].name == 'th'
+                    self.logger.debug(f"忽略重叠的合并区域: ({start_row}, {start_col}) - ({end_row}, {end_col})")
+                continue
+            occupied.update(area)
             
-            col_index = 0  # 实际列索引，会根据合并单元格情况调整
-            for j, cell in enumerate(cells):
-                # 跳过已被合并的单元格
-                while col_index < max_cols and merged_matrix[i][col_index] == 1:
-                    col_index += 1
-                
-                if col_index >= max_cols:
-                    break
-                    
-                # 处理合并单元格
-                rowspan = int(cell.get('rowspan', 1))
-                colspan = int(cell.get('colspan', 1))
-                
-                if rowspan > 1 or colspan > 1:
-                    # 标记被合并的单元格
-                    for r in range(i, min(i + rowspan, len(rows))):
-                        for c in range(col_index, min(col_index + colspan, max_cols)):
-                            if r != i or c != col_index:
-                                merged_matrix[r][c] = 1
-                    
-                    # 执行合并操作
-                    end_row = min(i + rowspan - 1, len(rows) - 1)
-                    end_col = min(col_index + colspan - 1, max_cols - 1)
-                    self._merge_cells(table, i, col_index, end_row, end_col)
-                
-                # 获取单元格并设置内容
-                table_cell = table.cell(i, col_index)
-                # 确保每个单元格都垂直居中
-                table_cell.vertical_alignment = WD_CELL_VERTICAL_ALIGNMENT.CENTER
-                self._process_cell_content(table_cell, cell, is_header)
-                
-                # 移动到下一列
-                col_index += colspan
+            width = end_col - start_col + 1
+            for r in range(start_row, end_row + 1):
+                if r > start_row:
+                    v_merge = ST_Merge.CONTINUE
+                elif end_row > start_row:
+                    v_merge = ST_Merge.RESTART
+                else:
+                    v_merge = None
+                spans[(r, start_col)] = (width, v_merge)
+                covered.update((r, c) for c in range(start_col + 1, end_col + 1))
+        return spans, covered
     
-    def _merge_cells(self, table: Table, start_row: int, start_col: int, end_row: int, end_col: int):
+    def _write_rows(self, table: Table, rows: List[Tag], max_cols: int, placements: List[List[Tuple[int, Tag]]],
+                    merges: List[Tuple[int, int, int, int]], templates: Dict[str, Any]):
         """
         /**
-         * 合并表格单元格
+         * 流式生成表格行
          * 
-         * @param {Table} table - Word表格对象
-         * @param {int} start_row - 起始行索引
-         * @param {int} start_col - 起始列索引
-         * @param {int} end_row - 结束行索引
-         * @param {int} end_col - 结束列索引
+         * 直接构建w:tr/w:tc元素并逐行追加到w:tbl，避免python-docx按行列查找单元格时反复扫描整张表格；
+         * 合并单元格直接写入gridSpan和vMerge，生成一行后立即填充该行内容
+         * 
+         * @param {Table} table - 不包含行的Word表格对象
+         * @param {List[Tag]} rows - 表格行元素列表
+         * @param {int} max_cols - 列数
+         * @param {List[List[Tuple[int, Tag]]]} placements - 每行填充内容的单元格位置
+         * @param {List[Tuple[int, int, int, int]]} merges - 需要合并的区域
+         * @param {Dict[str, Any]} templates - 属性模板字典
          */
         """
-        # 确保索引在有效范围内
-        row_count = len(table.rows)
-        col_count = len(table.columns)
+        tbl = table._tbl
+        col_twips = int(tbl.tblGrid.gridCol_lst[0].get(qn('w:w')))
+        tc_template = parse_xml(
+            f'<w:tc {nsdecls("w")}><w:tcPr><w:tcW w:type="dxa" w:w="{col_twips}"/></w:tcPr><w:p/></w:tc>')
+        spans, covered = self._span_plan(merges)
+        
+        borders = templates['borders']
+        header_shading = templates['header_shading']
+        even_shading = templates['even_shading']
+        valign_center = templates['valign_center']
+        valign_default = templates['valign_default']
+        text_align = templates['text_align']
         
-        if end_row >= row_count or end_col >= col_count:
-            return
+        if self.debug_mode:
+            self.logger.debug(f"填充表格内容，行数: {len(rows)}，列数: {max_cols}")
         
-        # 执行单元格合并
-        start_cell = table.cell(start_row, start_col)
-        end_cell = table.cell(end_row, end_col)
-        try:
-            start_cell.merge(end_cell)
-        except Exception:
-            # 如果合并失败，忽略错误继续执行
-            pass
+        for i, row in enumerate(rows):
+            # 行属性：表头行不允许分页，行高
+            tr = OxmlElement('w:tr')
+            trPr = tr.get_or_add_trPr()
+            if i == 0 and templates['cant_split'] is not None:
+                trPr.append(deepcopy(templates['cant_split']))
+            trPr.append(deepcopy(templates['header_height'] if i == 0 else templates['row_height']))
+            
+            # 表头行使用表头背景色，其余奇数索引行使用隔行背景色
+            shading = header_shading if i == 0 else (even_shading if i % 2 == 1 else None)
+            row_placements = placements[i]
+            filled = {col_index for col_index, _ in row_placements}
+            
+            tcs = {}
+            for j in range(max_cols):
+                if (i, j) in covered:
+                    continue
+                tc = deepcopy(tc_template)
+                tcPr = tc.tcPr
+                span = spans.get((i, j))
+                if span is not None:
+                    grid_span, v_merge = span
+                    tcPr.tcW.set(qn('w:w'), str(col_twips * grid_span))
+                    tcPr.grid_span = grid_span
+                    tcPr.vMerge_val = v_merge
+                if borders is not None:
+                    tcPr.append(deepcopy(borders))
+                if shading is not None:
+                    tcPr.append(deepcopy(shading))
+                tcPr.append(deepcopy(valign_center if i == 0 or j in filled else valign_default))
+                tr.append(tc)
+                tcs[j] = tc
+            tbl.append(tr)
+            
+            # 填充本行内容
+            is_header = row.parent.name == 'thead' or bool(row_placements) and row_placements[0][1].name == 'th'
+            for col_index, cell in row_placements:
+                self._process_cell_content(_Cell(tcs[col_index], table), cell, is_header, text_align)
     
-    def _process_cell_content(self, table_cell: _Cell, html_cell: Tag, is_header: bool):
+    def _process_cell_content(self, table_cell: _Cell, html_cell: Tag, is_header: bool, default_align: str = 'left'):
         """
         /**
          * 处理单元格内容
@@ -645,6 +479,7 @@ class TableProcessor(BaseProcessor):
          * @param {_Cell} table_cell - Word表格单元格对象
          * @param {Tag} html_cell - HTML表格单元格元素
          * @param {bool} is_header - 是否是表头单元格
+         * @param {str} default_align - 非表头单元格的默认对齐方式（配置enhanced_table_styles.text_align）
          */
         """
         # 清空单元格默认内容
@@ -653,19 +488,14 @@ class TableProcessor(BaseProcessor):
         # 获取第一个段落
         paragraph = table_cell.paragraphs[0]
         
-        # 从配置中获取表格样式
-        enhanced_styles = self.style_manager.config.get('enhanced_table_styles', {})
-        
         # 设置段落对齐方式，默认左对齐，仅表头默认居中
-        default_align = enhanced_styles.get('text_align', 'left')
         alignment = 'center' if is_header else default_align
         
         # 从单元格style属性或class属性中提取对齐方式
         if 'style' in html_cell.attrs:
             style = html_cell['style']
             if 'text-align' in style:
-                import re
-                align_match = re.search(r'text-align:\s*(\w+)', style)
+                align_match = _TEXT_ALIGN_PATTERN.search(style)
                 if align_match:
                     alignment = align_match.group(1)
         
@@ -683,34 +513,18 @@ class TableProcessor(BaseProcessor):
                         alignment = cls
                         break
         
-        # 应用段落格式
+        # 应用段落格式，单元格垂直居中已由表格属性模板设置
         self.style_manager.apply_paragraph_format(paragraph, alignment)
         
-        # 设置单元格垂直对齐为居中 - 对所有单元格应用，不只是表头
-        table_cell.vertical_alignment = WD_CELL_VERTICAL_ALIGNMENT.CENTER
-        
-        # 使用XML直接设置垂直对齐，确保所有Office版本兼容
-        tc = table_cell._tc
-        tcPr = tc.get_or_add_tcPr()
-        vAlign_element = parse_xml(f'<w:vAlign {nsdecls("w")} w:val="center"/>')
-        
-        # 移除现有的垂直对齐设置（如果有）
-        for old in tcPr.findall('.//{*}vAlign'):
-            tcPr.remove(old)
-        
-        # 添加新的垂直对齐设置
-        tcPr.append(vAlign_element)
-        
         if self.debug_mode:
-            self.logger.debug(f"处理单元格内容，是否表头: {is_header}, 对齐方式: {alignment}, 已设置垂直居中")
+            self.logger.debug(f"处理单元格内容，是否表头: {is_header}, 对齐方式: {alignment}")
         
         # 检查单元格内容类型
         has_children = any(isinstance(child, Tag) for child in html_cell.children)
         
         if has_children:
             # 如果有子元素，使用内联处理器处理所有内容
-            inline_processor = InlineProcessor(self.document, self.style_manager)
-            inline_processor.process_inline_elements(html_cell, paragraph)
+            self.inline_processor.process_inline_elements(html_cell, paragraph)
         else:
             # 简单文本内容处理
             run = paragraph.add_run(html_cell.get_text().strip())
@@ -736,21 +550,3 @@ class TableProcessor(BaseProcessor):
                 # 不直接应用heading_style，因为它可能会覆盖其他样式
                 if not hasattr(run.font, 'name') or not run.font.name:
                     run.font.name = self.style_manager.heading_font
-                    
-                # 确保表头文字居中垂直对齐
-                cell = paragraph._parent
-                if hasattr(cell, 'vertical_alignment'):
-                    cell.vertical_alignment = WD_CELL_VERTICAL_ALIGNMENT.CENTER
-                    
-                    # 使用XML直接设置垂直对齐，确保所有Office版本兼容
-                    if hasattr(cell, '_tc'):
-                        tc = cell._tc
-                        tcPr = tc.get_or_add_tcPr()
-                        vAlign_element = parse_xml(f'<w:vAlign {nsdecls("w")} w:val="center"/>')
-                        
-                        # 移除现有的垂直对齐设置（如果有）
-                        for old in tcPr.findall('.//{*}vAlign'):
-                            tcPr.remove(old)
-                        
-                        # 添加新的垂直对齐设置
-                        tcPr.append(vAlign_element) 
\ No newline at end of file
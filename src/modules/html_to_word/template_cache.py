@@ -0,0 +1,138 @@
+"""
+模板文档缓存模块
+按配置指纹缓存已设置好页面和默认样式的空白文档包（docx字节），每次转换从内存中的字节打开新文档，
+不再从磁盘读取并解压python-docx的默认模板、重新设置页边距和Normal样式；用户指定的.dotx/.docx模板每个进程只读取一次
+"""
+
+import io
+import os
+import json
+import hashlib
+import logging
+import zipfile
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# 影响模板文档内容的配置节
+_TEMPLATE_CONFIG_KEYS = ('fonts', 'sizes', 'colors', 'paragraph', 'document_properties', 'document')
+
+# 进程内最多缓存的模板数量（不同配置）
+_MAX_TEMPLATES = 16
+
+# Word模板（.dotx）与文档（.docx）主部件的内容类型
+_TEMPLATE_MAIN_TYPE = b'application/vnd.openxmlformats-officedocument.wordprocessingml.template.main+xml'
+_DOCUMENT_MAIN_TYPE = b'application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml'
+
+# 模板文档：(docx字节, 命名样式ID)
+Template = Tuple[bytes, Dict[str, str]]
+
+_templates: 'OrderedDict[str, Template]' = OrderedDict()
+_templates_lock = threading.Lock()
+_template_stats = {'hits': 0, 'misses': 0}
+
+logger = logging.getLogger('TemplateCache')
+
+def template_signature(path: str) -> Optional[Tuple[str, int, int]]:
+    """
+    /**
+     * 获取用户模板文件的签名，模板文件修改后缓存自动失效
+     *
+     * @param {str} path - 模板文件路径，空字符串表示不使用用户模板
+     * @returns {Optional[Tuple[str, int, int]]} (绝对路径, 修改时间纳秒, 大小)，没有模板或文件不存在时返回None
+     */
+    """
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+def template_fingerprint(config: Dict[str, Any]) -> str:
+    """
+    /**
+     * 计算影响模板文档的配置指纹，包含用户模板文件的签名
+     *
+     * @param {Dict[str, Any]} config - 配置参数字典
+     * @returns {str} 配置的SHA-256摘要
+     */
+    """
+    effective = {key: config.get(key) for key in _TEMPLATE_CONFIG_KEYS}
+    effective['template_file'] = template_signature(config.get('document', {}).get('template', ''))
+    payload = json.dumps(effective, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def read_template(path: str) -> Optional[bytes]:
+    """
+    /**
+     * 读取用户模板文件，.dotx模板的主部件内容类型改为文档类型，python-docx才能打开
+     *
+     * @param {str} path - .dotx或.docx文件路径
+     * @returns {Optional[bytes]} docx字节，文件不存在或不是有效的Word文档时返回None
+     */
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            content_types = archive.read('[Content_Types].xml')
+            if _TEMPLATE_MAIN_TYPE not in content_types:
+                return data
+            output = io.BytesIO()
+            with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as converted:
+                for item in archive.infolist():
+                    content = archive.read(item.filename)
+                    if item.filename == '[Content_Types].xml':
+                        content = content.replace(_TEMPLATE_MAIN_TYPE, _DOCUMENT_MAIN_TYPE)
+                    converted.writestr(item, content)
+            return output.getvalue()
+    except (OSError, zipfile.BadZipFile, KeyError) as e:
+        logger.warning(f"无法读取Word模板: {path}: {e}，使用默认模板")
+        return None
+
+def get_template(fingerprint: str, build: Callable[[], Template]) -> Template:
+    """
+    /**
+     * 获取指定配置指纹的模板文档，不存在时调用build构建并缓存
+     *
+     * @param {str} fingerprint - template_fingerprint计算的模板指纹
+     * @param {Callable[[], Template]} build - 构建模板文档的函数
+     * @returns {Template} (docx字节, 命名样式ID)
+     */
+    """
+    with _templates_lock:
+        template = _templates.get(fingerprint)
+        if template is not None:
+            _templates.move_to_end(fingerprint)
+            _template_stats['hits'] += 1
+            return template
+        _template_stats['misses'] += 1
+
+    template = build()
+    with _templates_lock:
+        _templates[fingerprint] = template
+        while len(_templates) > _MAX_TEMPLATES:
+            _templates.popitem(last=False)
+    return template
+
+def get_template_cache_stats() -> Dict[str, int]:
+    """
+    /**
+     * 获取模板缓存的累计统计信息
+     *
+     * @returns {Dict[str, int]} 包含hits、misses和size的字典
+     */
+    """
+    with _templates_lock:
+        return dict(_template_stats, size=len(_templates))
+
+def clear_template_cache():
+    """
+    /**
+     * 清空模板缓存
+     */
+    """
+    with _templates_lock:
+        _templates.clear()
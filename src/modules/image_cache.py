@@ -0,0 +1,467 @@
+"""
+图片缓存模块
+提供按内容寻址的持久化远程图片缓存，支持大小上限、LRU淘汰和ETag/Last-Modified重新验证
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import mimetypes
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Tuple, Iterable, List
+from urllib.parse import urlsplit
+
+# 缓存条目格式版本，格式变化时递增以使旧条目失效
+IMAGE_CACHE_VERSION = 1
+
+# 进程内共享的缓存实例，图片处理器和HTML元素处理器使用同一个缓存
+_caches: Dict[Tuple[str, int, float, float, int], 'ImageCache'] = {}
+_caches_lock = threading.Lock()
+
+def _default_cache_dir() -> str:
+    """
+    /**
+     * 获取默认图片缓存目录
+     *
+     * @returns {str} 缓存目录路径
+     */
+    """
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'world_md', 'images')
+
+def _guess_extension(url: str, content_type: Optional[str]) -> str:
+    """
+    /**
+     * 根据URL路径或Content-Type推断图片扩展名
+     *
+     * @param {str} url - 图片地址
+     * @param {Optional[str]} content_type - 响应的Content-Type
+     * @returns {str} 扩展名（包含点号），无法推断时返回空字符串
+     */
+    """
+    ext = os.path.splitext(urlsplit(url).path)[1].lower()
+    if ext and len(ext) <= 5 and ext[1:].isalnum():
+        return ext
+    if content_type:
+        return mimetypes.guess_extension(content_type.split(';')[0].strip()) or ''
+    return ''
+
+
+class ImageCache:
+    """
+    /**
+     * 远程图片缓存
+     *
+     * 图片内容保存在objects目录中，以内容的SHA-256摘要命名，不同地址的相同图片只保存一份；
+     * 每个地址在entries目录中有一个条目文件，记录内容摘要和验证信息，条目文件的修改时间即最近使用时间。
+     * 所有写入都先写临时文件再替换，多个进程可以共享同一个缓存目录。
+     * 缓存总大小在进程内增量记录，只有超过上限时才扫描条目淘汰；正在转换的文档用到的图片可以pin，不会被本进程淘汰
+     */
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_size_mb: float = 200,
+                 revalidate_after: float = 3600, timeout: float = 10, pool_size: int = 8):
+        """
+        /**
+         * 初始化图片缓存
+         *
+         * @param {Optional[str]} cache_dir - 缓存目录，为None时使用默认缓存目录
+         * @param {float} max_size_mb - 缓存大小上限（MB），小于等于0表示不限制
+         * @param {float} revalidate_after - 缓存条目在多少秒后需要向服务器重新验证
+         * @param {float} timeout - 下载超时时间（秒）
+         * @param {int} pool_size - 每个主机保持的连接数，预取时多个线程共享连接池
+         */
+        """
+        self.cache_dir = os.path.expanduser(cache_dir) if cache_dir else _default_cache_dir()
+        self.objects_dir = os.path.join(self.cache_dir, 'objects')
+        self.entries_dir = os.path.join(self.cache_dir, 'entries')
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.revalidate_after = revalidate_after
+        self.timeout = timeout
+        self.logger = logging.getLogger('ImageCache')
+        self._lock = threading.Lock()
+        self._pool_size = pool_size
+        self._session = None
+        # 估计的缓存总大小（字节），None表示尚未统计；其他进程写入的图片在下一次淘汰扫描时计入
+        self._size: Optional[int] = None
+        # 不能淘汰的图片路径及其引用计数
+        self._pinned: Dict[str, int] = {}
+
+    def _get_session(self):
+        """
+        /**
+         * 获取HTTP会话，第一次下载时才导入requests并创建连接池，没有远程图片的文档不需要加载requests
+         *
+         * @returns {requests.Session} HTTP会话
+         */
+        """
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self._pool_size, pool_maxsize=self._pool_size)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._session = session
+            return self._session
+
+    def fetch(self, url: str) -> Optional[str]:
+        """
+        /**
+         * 获取远程图片的本地路径
+         *
+         * 缓存未过期时直接返回；过期后带上ETag/Last-Modified条件请求，服务器返回304时继续使用缓存；
+         * 网络错误或服务器错误时使用过期的缓存
+         *
+         * @param {str} url - 图片地址
+         * @returns {Optional[str]} 缓存中的图片路径，下载失败且没有缓存时返回None
+         */
+        """
+        entry_path = self._entry_path(url)
+        entry = self._read_entry(entry_path)
+        blob_path = self._blob_path(entry) if entry else None
+        if blob_path and not os.path.isfile(blob_path):
+            entry, blob_path = None, None
+
+        if entry and time.time() - entry.get('checked', 0) < self.revalidate_after:
+            self._touch(entry_path)
+            return blob_path
+
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        try:
+            with self._get_session().get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+                if response.status_code == 304 and entry:
+                    entry['checked'] = time.time()
+                    self._write_entry(entry_path, entry)
+                    return blob_path
+                if response.status_code == 200:
+                    return self._store(url, entry_path, response)
+                if blob_path and response.status_code >= 500:
+                    self.logger.warning(f"服务器错误 {response.status_code}，使用缓存的图片: {url}")
+                    return blob_path
+                self.logger.warning(f"下载图片失败，状态码 {response.status_code}: {url}")
+                return None
+        except OSError as e:
+            # requests.RequestException是OSError的子类
+            if blob_path:
+                self.logger.warning(f"下载图片失败，使用缓存的图片: {url}: {e}")
+                return blob_path
+            self.logger.warning(f"下载图片失败: {url}: {e}")
+            return None
+
+    def _store(self, url: str, entry_path: str, response: 'requests.Response') -> str:
+        """
+        /**
+         * 保存下载的图片并记录条目
+         *
+         * @param {str} url - 图片地址
+         * @param {str} entry_path - 条目文件路径
+         * @param {requests.Response} response - 状态码为200的流式响应
+         * @returns {str} 缓存中的图片路径
+         */
+        """
+        os.makedirs(self.objects_dir, exist_ok=True)
+        tmp_path = os.path.join(self.objects_dir, f".{os.getpid()}.{threading.get_ident()}.tmp")
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in response.iter_content(64 * 1024):
+                    digest.update(chunk)
+                    size += len(chunk)
+                    f.write(chunk)
+            entry = {
+                'version': IMAGE_CACHE_VERSION,
+                'url': url,
+                'digest': digest.hexdigest(),
+                'ext': _guess_extension(url, response.headers.get('Content-Type')),
+                'size': size,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'checked': time.time(),
+            }
+            blob_path = self._blob_path(entry)
+            if os.path.isfile(blob_path):
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, blob_path)
+                with self._lock:
+                    if self._size is not None:
+                        self._size += size
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self._write_entry(entry_path, entry)
+        self._evict(keep=blob_path)
+        return blob_path
+
+    def pin(self, paths: Iterable[Optional[str]]):
+        """
+        /**
+         * 标记图片在unpin之前不能被本进程淘汰，用于预取后尚未写入文档的图片
+         *
+         * @param {Iterable[Optional[str]]} paths - 图片路径，None会被忽略
+         */
+        """
+        with self._lock:
+            for path in paths:
+                if path:
+                    self._pinned[path] = self._pinned.get(path, 0) + 1
+
+    def unpin(self, paths: Iterable[Optional[str]]):
+        """
+        /**
+         * 取消pin标记
+         *
+         * @param {Iterable[Optional[str]]} paths - 之前传给pin的图片路径
+         */
+        """
+        with self._lock:
+            for path in paths:
+                count = self._pinned.get(path, 0) if path else 0
+                if count > 1:
+                    self._pinned[path] = count - 1
+                elif count == 1:
+                    del self._pinned[path]
+
+    def _objects_size(self) -> int:
+        """
+        /**
+         * 统计objects目录中图片的总大小，不读取条目文件
+         *
+         * @returns {int} 总大小（字节）
+         */
+        """
+        total = 0
+        try:
+            with os.scandir(self.objects_dir) as it:
+                for item in it:
+                    if not item.name.endswith('.tmp'):
+                        try:
+                            total += item.stat().st_size
+                        except OSError:
+                            continue
+        except OSError:
+            pass
+        return total
+
+    def _evict(self, keep: str):
+        """
+        /**
+         * 缓存超过大小上限时按最近使用时间淘汰条目，并删除不再被引用的图片
+         *
+         * 估计的总大小未超过上限时直接返回，不读取条目文件
+         *
+         * @param {str} keep - 刚写入的图片路径，不会被淘汰；pin的图片同样不会被淘汰
+         */
+        """
+        if self.max_bytes <= 0:
+            return
+        with self._lock:
+            if self._size is None:
+                self._size = self._objects_size()
+            if self._size <= self.max_bytes:
+                return
+
+            entries = []
+            for name in os.listdir(self.entries_dir):
+                path = os.path.join(self.entries_dir, name)
+                entry = self._read_entry(path)
+                if entry is None:
+                    continue
+                try:
+                    entries.append((os.path.getmtime(path), path, self._blob_path(entry)))
+                except OSError:
+                    continue
+
+            references: Dict[str, int] = {}
+            for _, _, blob_path in entries:
+                references[blob_path] = references.get(blob_path, 0) + 1
+            sizes = {}
+            for blob_path in references:
+                try:
+                    sizes[blob_path] = os.path.getsize(blob_path)
+                except OSError:
+                    sizes[blob_path] = 0
+            total = sum(sizes.values())
+
+            entries.sort()
+            for _, entry_path, blob_path in entries:
+                if total <= self.max_bytes:
+                    break
+                if blob_path == keep or blob_path in self._pinned:
+                    continue
+                self._remove(entry_path)
+                references[blob_path] -= 1
+                if references[blob_path] == 0:
+                    self._remove(blob_path)
+                    total -= sizes[blob_path]
+            self._size = total
+
+    def _entry_path(self, url: str) -> str:
+        """
+        /**
+         * 获取地址对应的条目文件路径
+         *
+         * @param {str} url - 图片地址
+         * @returns {str} 条目文件路径
+         */
+        """
+        return os.path.join(self.entries_dir, hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+
+    def _blob_path(self, entry: Dict[str, Any]) -> str:
+        """
+        /**
+         * 获取条目对应的图片文件路径
+         *
+         * @param {Dict[str, Any]} entry - 缓存条目
+         * @returns {str} 图片文件路径
+         */
+        """
+        return os.path.join(self.objects_dir, entry['digest'] + entry.get('ext', ''))
+
+    def _read_entry(self, entry_path: str) -> Optional[Dict[str, Any]]:
+        """
+        /**
+         * 读取条目文件，文件不存在、损坏或版本不符时返回None
+         *
+         * @param {str} entry_path - 条目文件路径
+         * @returns {Optional[Dict[str, Any]]} 缓存条目
+         */
+        """
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get('version') != IMAGE_CACHE_VERSION or 'digest' not in entry:
+            return None
+        return entry
+
+    def _write_entry(self, entry_path: str, entry: Dict[str, Any]):
+        """
+        /**
+         * 写入条目文件
+         *
+         * @param {str} entry_path - 条目文件路径
+         * @param {Dict[str, Any]} entry - 缓存条目
+         */
+        """
+        os.makedirs(self.entries_dir, exist_ok=True)
+        tmp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, entry_path)
+
+    def _touch(self, path: str):
+        """
+        /**
+         * 更新文件修改时间，记录最近使用
+         *
+         * @param {str} path - 文件路径
+         */
+        """
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _remove(self, path: str):
+        """
+        /**
+         * 删除文件，文件已被其他进程删除时忽略
+         *
+         * @param {str} path - 文件路径
+         */
+        """
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def get_image_cache(config: Dict[str, Any]) -> Optional[ImageCache]:
+    """
+    /**
+     * 根据配置获取进程内共享的图片缓存
+     *
+     * @param {Dict[str, Any]} config - 配置参数字典
+     * @returns {Optional[ImageCache]} 图片缓存，配置中禁用缓存时返回None
+     */
+    """
+    cache_config = config.get('image_cache', {})
+    if not cache_config.get('enabled', True):
+        return None
+    cache_dir = os.path.expanduser(cache_config.get('cache_dir') or _default_cache_dir())
+    key = (
+        os.path.abspath(cache_dir),
+        int(cache_config.get('max_size_mb', 200) * 1024 * 1024),
+        float(cache_config.get('revalidate_after', 3600)),
+        float(cache_config.get('timeout', 10)),
+        max(1, int(cache_config.get('prefetch_workers', 8))),
+    )
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = ImageCache(key[0], cache_config.get('max_size_mb', 200), key[2], key[3], key[4])
+            _caches[key] = cache
+        return cache
+
+def prefetch_images(cache: ImageCache, urls: Iterable[str], max_workers: int = 8,
+                    per_host_limit: int = 4) -> Dict[str, Optional[str]]:
+    """
+    /**
+     * 并发下载一组远程图片
+     *
+     * 按主机轮流排列下载任务，每个主机同时进行的下载数不超过per_host_limit，
+     * 避免同一主机的任务占满线程池而其他主机的任务空等。
+     * 下载的图片在缓存中被pin，之后的下载不会将其淘汰，调用方写入文档后对返回的路径调用cache.unpin
+     *
+     * @param {ImageCache} cache - 图片缓存
+     * @param {Iterable[str]} urls - 图片地址，重复的地址只下载一次
+     * @param {int} max_workers - 下载线程数
+     * @param {int} per_host_limit - 每个主机的最大并发下载数
+     * @returns {Dict[str, Optional[str]]} 图片地址到本地路径的映射，下载失败的地址对应None
+     */
+    """
+    by_host: Dict[str, List[str]] = OrderedDict()
+    for url in OrderedDict.fromkeys(urls):
+        by_host.setdefault(urlsplit(url).netloc.lower(), []).append(url)
+    if not by_host:
+        return {}
+
+    # 按主机轮流排列：第一轮取每个主机的第一个地址，依此类推
+    ordered = []
+    queues = [list(reversed(host_urls)) for host_urls in by_host.values()]
+    while queues:
+        ordered.extend(queue.pop() for queue in queues)
+        queues = [queue for queue in queues if queue]
+
+    def fetch_and_pin(url: str) -> Optional[str]:
+        path = cache.fetch(url)
+        cache.pin([path])
+        return path
+
+    if len(ordered) == 1 or max_workers <= 1:
+        return {url: fetch_and_pin(url) for url in ordered}
+
+    limits = {host: threading.BoundedSemaphore(max(1, per_host_limit)) for host in by_host}
+
+    def fetch(url: str) -> Optional[str]:
+        with limits[urlsplit(url).netloc.lower()]:
+            return fetch_and_pin(url)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(ordered))) as executor:
+        return dict(zip(ordered, executor.map(fetch, ordered)))
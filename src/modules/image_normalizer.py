@@ -0,0 +1,197 @@
+"""
+图片规范化模块
+嵌入Word前按最终显示宽度和目标DPI缩小图片并重新压缩，避免原始大图撑大文档
+"""
+
+import os
+import math
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Dict, Any, Tuple
+
+# 规范化输出格式版本，缩放或编码方式变化时递增以使旧缓存失效
+NORMALIZE_FORMAT_VERSION = 2
+
+# 重新编码时去除的元数据，源图片带有这些信息时即使无需缩小也重新编码
+_METADATA_KEYS = ('exif', 'xmp', 'XML:com.adobe.xmp', 'comment', 'photoshop')
+
+# EXIF方向标签，值为5-8时图片需要旋转90度，显示宽度为原始高度
+_EXIF_ORIENTATION = 0x0112
+
+# 进程内已计算的源图片摘要：(绝对路径, 修改时间, 大小) -> SHA-256摘要
+_source_digests: Dict[Tuple[str, float, int], str] = {}
+_source_digests_lock = threading.Lock()
+
+# Pillow未安装时只提示一次
+_pillow_warned = False
+
+def _default_cache_dir() -> str:
+    """
+    /**
+     * 获取默认规范化图片缓存目录
+     *
+     * @returns {str} 缓存目录路径
+     */
+    """
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'world_md', 'normalized')
+
+def _load_pillow():
+    """
+    /**
+     * 导入Pillow，Pillow是可选依赖
+     *
+     * @returns {Optional[module]} PIL.Image模块，未安装时返回None
+     */
+    """
+    global _pillow_warned
+    try:
+        from PIL import Image
+        return Image
+    except ImportError:
+        if not _pillow_warned:
+            _pillow_warned = True
+            logging.getLogger('ImageNormalizer').warning("未安装Pillow，图片规范化已跳过，将嵌入原始图片（pip install Pillow）")
+        return None
+
+
+class ImageNormalizer:
+    """
+    /**
+     * 图片规范化器
+     *
+     * 图片宽度超过显示宽度在目标DPI下所需的像素数时，缩小到该像素数并重新编码：
+     * JPEG按配置的质量压缩，PNG使用optimize压缩，其他格式转为PNG，重新编码时不保留EXIF等元数据。
+     * 带有EXIF等元数据的图片即使无需缩小也重新编码；先按EXIF方向旋转，宽度按旋转后的图片计算。
+     * 结果按 (源图片摘要, 目标像素宽度, 编码参数) 缓存在磁盘上，批量转换中同一图片只处理一次
+     */
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        /**
+         * 初始化图片规范化器
+         *
+         * @param {Dict[str, Any]} config - 配置参数字典
+         */
+        """
+        normalize_config = config.get('image_normalize', {})
+        self.enabled = normalize_config.get('enabled', False)
+        self.dpi = normalize_config.get('dpi', 150)
+        self.jpeg_quality = normalize_config.get('jpeg_quality', 85)
+        self.png_optimize = normalize_config.get('png_optimize', True)
+        cache_dir = normalize_config.get('cache_dir', '')
+        self.cache_dir = os.path.expanduser(cache_dir) if cache_dir else _default_cache_dir()
+        self.logger = logging.getLogger('ImageNormalizer')
+
+    def normalize(self, img_path: str, width_cm: float) -> str:
+        """
+        /**
+         * 获取适合嵌入的图片路径
+         *
+         * @param {str} img_path - 原始图片路径
+         * @param {float} width_cm - 图片在文档中的显示宽度（厘米）
+         * @returns {str} 规范化后的图片路径；未启用、无需缩小且没有元数据或处理失败时返回原始路径
+         */
+        """
+        if not self.enabled:
+            return img_path
+        Image = _load_pillow()
+        if Image is None:
+            return img_path
+
+        target_width = max(1, math.ceil(width_cm / 2.54 * self.dpi))
+        try:
+            with Image.open(img_path) as source:
+                if getattr(source, 'is_animated', False):
+                    return img_path
+                has_metadata = any(key in source.info for key in _METADATA_KEYS)
+                width = source.width
+                if has_metadata and source.getexif().get(_EXIF_ORIENTATION, 1) in (5, 6, 7, 8):
+                    width = source.height
+                if width <= target_width and not has_metadata:
+                    return img_path
+
+                if source.format == 'JPEG':
+                    ext, params = '.jpg', f"q{self.jpeg_quality}"
+                else:
+                    ext, params = '.png', f"o{int(bool(self.png_optimize))}"
+                output_width = min(width, target_width)
+                source_digest = self._source_digest(img_path)
+                key = f"{source_digest[:32]}-{output_width}-{params}-v{NORMALIZE_FORMAT_VERSION}"
+                output_path = os.path.join(self.cache_dir, key + ext)
+                if os.path.isfile(output_path):
+                    return output_path
+
+                # 按EXIF方向旋转，重新编码后方向标签不再保留
+                from PIL import ImageOps
+                image = ImageOps.exif_transpose(source)
+                image.info = {key: value for key, value in image.info.items() if key not in _METADATA_KEYS}
+                if image.width > output_width:
+                    target_height = max(1, round(image.height * output_width / image.width))
+                    if image.mode in ('1', 'P'):
+                        # 调色板图片先转换为真彩色，否则只能使用最近邻缩放
+                        image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+                    image = image.resize((output_width, target_height), Image.LANCZOS)
+                self._save(image, output_path, ext)
+
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"图片已规范化: {img_path} -> {output_path} "
+                                  f"({os.path.getsize(img_path)} -> {os.path.getsize(output_path)} 字节)")
+            return output_path
+        except Exception as e:
+            self.logger.warning(f"图片规范化失败，使用原始图片: {img_path}: {e}")
+            return img_path
+
+    def _save(self, image, output_path: str, ext: str):
+        """
+        /**
+         * 编码并保存规范化后的图片，先写临时文件再替换，多个进程可以共享缓存目录
+         *
+         * @param {PIL.Image.Image} image - 缩小后的图片
+         * @param {str} output_path - 输出路径
+         * @param {str} ext - 输出扩展名：.jpg或.png
+         */
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(suffix=ext, dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                if ext == '.jpg':
+                    if image.mode not in ('RGB', 'L', 'CMYK'):
+                        image = image.convert('RGB')
+                    image.save(f, format='JPEG', quality=self.jpeg_quality, optimize=True)
+                else:
+                    if image.mode not in ('1', 'L', 'LA', 'P', 'RGB', 'RGBA'):
+                        image = image.convert('RGBA')
+                    image.save(f, format='PNG', optimize=bool(self.png_optimize))
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _source_digest(self, img_path: str) -> str:
+        """
+        /**
+         * 计算源图片内容摘要，同一进程中未变化的文件只计算一次
+         *
+         * @param {str} img_path - 图片路径
+         * @returns {str} 十六进制SHA-256摘要
+         */
+        """
+        stat = os.stat(img_path)
+        key = (os.path.abspath(img_path), stat.st_mtime, stat.st_size)
+        with _source_digests_lock:
+            digest = _source_digests.get(key)
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(img_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    sha.update(chunk)
+            digest = sha.hexdigest()
+            with _source_digests_lock:
+                _source_digests[key] = digest
+        return digest
@@ -5,16 +5,51 @@ Markdown到HTML转换模块
 
 import re
 import os
-import markdown
+import functools
 import logging
+import threading
 from typing import Dict, Any, Optional, List, Union
 import codecs
-import opencc
 from bs4 import BeautifulSoup, Tag, NavigableString
-from markdown.extensions.codehilite import CodeHiliteExtension
-from markdown.extensions.fenced_code import FencedCodeExtension
-from markdown.extensions.tables import TableExtension
-from markdown.extensions.toc import TocExtension
+
+# 使用try-except处理不同的导入场景
+try:
+    from .chinese_converter import create_chinese_converter, BACKEND_COMPILED, BACKEND_OPENCC
+    from .tree_walker import TreeVisitor, walk_tree, replace_nodes
+    from .html_parser import resolve_html_parser
+    from . import timing
+except ImportError:
+    try:
+        from src.modules.chinese_converter import create_chinese_converter, BACKEND_COMPILED, BACKEND_OPENCC
+        from src.modules.tree_walker import TreeVisitor, walk_tree, replace_nodes
+        from src.modules.html_parser import resolve_html_parser
+        from src.modules import timing
+    except ImportError:
+        from chinese_converter import create_chinese_converter, BACKEND_COMPILED, BACKEND_OPENCC
+        from tree_walker import TreeVisitor, walk_tree, replace_nodes
+        from html_parser import resolve_html_parser
+        import timing
+
+# 内容不参与简繁转换的标签：代码保持原样，样式和脚本不是可见文本
+_CHINESE_CONVERSION_SKIP_TAGS = frozenset(['pre', 'code', 'style', 'script'])
+
+# 需要简繁转换的可见属性，alt会作为图片说明写入Word
+_CHINESE_CONVERSION_ATTRIBUTES = ('alt', 'title')
+
+# 可能包含代码块的行：可以位于引用块（>）中，围栏（可缩进，列表中的围栏）或缩进至少4列的代码
+# （列表项中的8个空格、空格后跟制表符等都算）。只有这样的文档才需要fenced_code和codehilite扩展，
+# 这两个扩展都会导入Pygments；宁可多匹配，多匹配时输出与始终启用扩展完全相同
+_CODE_BLOCK_LINE_RE = re.compile(r'^(?:[ \t]*>)*(?:[ \t]*(?:`{3,}|~{3,})|(?: *\t| {4})[ \t]*\S)', re.MULTILINE)
+
+# 中文间距规则：中文与英文字母/数字的边界（零宽匹配，替换为空格）
+_CJK_CHARS = '\u4e00-\u9fa5'
+_CJK_BOUNDARY_PATTERN = rf'(?<=[{_CJK_CHARS}])(?=[a-zA-Z0-9])|(?<=[a-zA-Z0-9])(?=[{_CJK_CHARS}])'
+
+# 全角标点两侧多余的半角空格（替换为空）
+_FULLWIDTH_CLOSING_PUNCTUATION = '，。！？；：、）」』》】'
+_FULLWIDTH_OPENING_PUNCTUATION = '（「『《【'
+_PUNCTUATION_SPACES_PATTERN = (rf'[ \t]+(?=[{_FULLWIDTH_CLOSING_PUNCTUATION}])'
+                               rf'|(?<=[{_FULLWIDTH_OPENING_PUNCTUATION}{_FULLWIDTH_CLOSING_PUNCTUATION}])[ \t]+')
 
 class MarkdownToHtml:
     """
@@ -61,7 +96,12 @@ class MarkdownToHtml:
         
         self.logger.info("初始化Markdown到HTML转换器")
         
-        self.markdown_extensions = self._get_markdown_extensions()
+        # HTML解析器，配置html.parser
+        self.html_parser = resolve_html_parser(config)
+        
+        # Markdown实例在每个线程第一次转换时才创建，之后每篇文档只需reset；
+        # 包含代码块的文档使用带fenced_code和codehilite的实例，没有代码块的文档使用不带这两个扩展的实例，不导入Pygments
+        self._markdown_local = threading.local()
         
         # 表格样式配置
         self.table_styles = self.config.get('table_styles', {})
@@ -83,51 +123,153 @@ class MarkdownToHtml:
         self.logger.info(f"中文配置详情: {chinese_config}")
         self.logger.info(f"简繁转换设置: {'启用' if convert_to_traditional else '禁用'}")
         
-        # 修复opencc初始化
+        # 简繁转换后端在第一次执行转换时才创建，保持简体时不会执行转换，也就不加载词典
+        self.conversion_config = 's2t' if convert_to_traditional else 's2s'
+        self.cc = None
+        self._convert_segment = None
+        self.logger.info(f"中文转换配置: {'简体转繁体' if convert_to_traditional else '保持简体'}")
+        
+        # 中文间距规则，按auto_spacing和punctuation_spacing组合成一个预编译的正则
+        self._spacing_pattern, self._spacing_repl = self._compile_spacing_rule(chinese_config)
+        
+        # 已转换文本片段的LRU缓存大小，标题、表格单元格和固定文案在批量转换中大量重复
+        self.conversion_cache_size = chinese_config.get('conversion_cache_size', 4096)
+        
+        # 各阶段耗时统计，单独使用本转换器（没有外层耗时报告）时由本转换器输出
+        self.timing_enabled = config.get('debug', {}).get('timing', False)
+        
+    def _get_segment_converter(self):
+        """
+        /**
+         * 获取带LRU缓存的文本片段转换函数，第一次调用时创建简繁转换后端
+         * 
+         * @returns {Callable[[str], str]} 转换函数
+         */
+        """
+        if self._convert_segment is None:
+            chinese_config = self.config.get('chinese', {})
+            try:
+                self.logger.info(f"OpenCC转换配置: {self.conversion_config}")
+                self.cc = self._create_chinese_converter(self.conversion_config, chinese_config)
+            except Exception as e:
+                self.logger.error(f"OpenCC初始化失败: {str(e)}")
+                # 创建一个简单的替代对象，防止代码崩溃
+                class NoOpCC:
+                    def convert(self, text):
+                        return text
+                self.cc = NoOpCC()
+                self.logger.warning("使用NoOp转换器替代OpenCC")
+            self._convert_segment = functools.lru_cache(maxsize=self.conversion_cache_size)(self.cc.convert)
+        return self._convert_segment
+    
+    def _create_chinese_converter(self, conversion_config: str, chinese_config: Dict[str, Any]):
+        """
+        /**
+         * 创建简繁转换后端，预编译词典后端不可用时回退到OpenCC
+         * 
+         * @param {str} conversion_config - OpenCC转换配置名
+         * @param {Dict[str, Any]} chinese_config - 中文配置
+         * @returns {ChineseConverterBackend} 转换后端
+         */
+        """
+        backend = chinese_config.get('backend', BACKEND_COMPILED)
+        cache_dir = chinese_config.get('dictionary_cache_dir') or None
         try:
-            conversion_config = 's2t' if convert_to_traditional else 's2s'
-            self.logger.info(f"OpenCC转换配置: {conversion_config}")
-            self.cc = opencc.OpenCC(conversion_config)
-            self.logger.info(f"中文转换配置: {'简体转繁体' if convert_to_traditional else '保持简体'}")
+            converter = create_chinese_converter(conversion_config, backend, cache_dir)
         except Exception as e:
-            self.logger.error(f"OpenCC初始化失败: {str(e)}")
-            # 创建一个简单的替代对象，防止代码崩溃
-            class NoOpCC:
-                def convert(self, text):
-                    return text
-            self.cc = NoOpCC()
-            self.logger.warning("使用NoOp转换器替代OpenCC")
-        
-    def _get_markdown_extensions(self) -> List:
+            if backend == BACKEND_OPENCC:
+                raise
+            self.logger.warning(f"{backend}转换后端初始化失败，回退到OpenCC: {str(e)}")
+            converter = create_chinese_converter(conversion_config, BACKEND_OPENCC)
+        self.logger.info(f"简繁转换后端: {converter.name}")
+        return converter
+    
+    def _compile_spacing_rule(self, chinese_config: Dict[str, Any]):
+        """
+        /**
+         * 根据中文配置组合间距规则
+         * 
+         * auto_spacing在中文与英文字母、数字之间插入空格，
+         * punctuation_spacing删除全角标点两侧多余的空格，两者同时启用时合并为一次扫描
+         * 
+         * @param {Dict[str, Any]} chinese_config - 中文配置
+         * @returns {Tuple[Optional[Pattern], Union[str, Callable, None]]} 预编译正则和替换内容，都未启用时为(None, None)
+         */
+        """
+        auto_spacing = chinese_config.get('auto_spacing', True)
+        punctuation_spacing = chinese_config.get('punctuation_spacing', True)
+        
+        if auto_spacing and punctuation_spacing:
+            # 边界匹配为空串，替换为空格；标点旁的空格匹配非空，替换为空
+            pattern = re.compile(f'{_CJK_BOUNDARY_PATTERN}|{_PUNCTUATION_SPACES_PATTERN}')
+            return pattern, lambda match: '' if match.group() else ' '
+        if auto_spacing:
+            return re.compile(_CJK_BOUNDARY_PATTERN), ' '
+        if punctuation_spacing:
+            return re.compile(_PUNCTUATION_SPACES_PATTERN), ''
+        return None, None
+    
+    def _get_markdown(self, code_blocks: bool = True):
+        """
+        /**
+         * 获取当前线程的Markdown实例，第一次调用时创建并注册扩展
+         * 
+         * Markdown实例和扩展对象都保存解析状态，扩展对象还会记住所属的Markdown实例，
+         * 所以每个线程使用各自的实例和扩展，服务模式下多个线程可以安全地共用一个转换器
+         * 
+         * @param {bool} code_blocks - 文档是否可能包含代码块
+         * @returns {markdown.Markdown} 配置好的Markdown实例
+         */
+        """
+        instances = getattr(self._markdown_local, 'instances', None)
+        if instances is None:
+            instances = self._markdown_local.instances = {}
+        md = instances.get(code_blocks)
+        if md is None:
+            import markdown
+            md = markdown.Markdown(extensions=self._get_markdown_extensions(code_blocks))
+            instances[code_blocks] = md
+        return md
+    
+    def _get_markdown_extensions(self, code_blocks: bool = True) -> List:
         """
         /**
          * 获取Markdown扩展配置
          * 
+         * @param {bool} code_blocks - 是否添加代码块扩展（fenced_code、codehilite），没有代码块的文档不需要，也就不导入Pygments
          * @returns {List} 配置好的Markdown扩展列表
          */
         """
+        from markdown.extensions.tables import TableExtension
+        from markdown.extensions.toc import TocExtension
+        
         md_configs = self.config.get('markdown_extensions', {})
         extensions = []
         
         self.logger.info("配置Markdown扩展")
         
-        # 添加代码高亮扩展
-        codehilite_configs = {}
-        if 'codehilite' in md_configs:
-            for key, value in md_configs['codehilite'].items():
-                codehilite_configs[key] = value
-            if self.debug_mode:
-                self.logger.debug(f"CodeHilite配置: {codehilite_configs}")
-        extensions.append(CodeHiliteExtension(**codehilite_configs))
+        # 添加代码高亮扩展；代码块按词法单元直接写入Word时不生成高亮HTML，
+        # 围栏式代码块输出带language-xxx类名的<pre><code>，由代码块处理器着色
+        if code_blocks and self.config.get('code_blocks', {}).get('rendering', 'text') != 'tokens':
+            from markdown.extensions.codehilite import CodeHiliteExtension
+            codehilite_configs = {}
+            if 'codehilite' in md_configs:
+                for key, value in md_configs['codehilite'].items():
+                    codehilite_configs[key] = value
+                if self.debug_mode:
+                    self.logger.debug(f"CodeHilite配置: {codehilite_configs}")
+            extensions.append(CodeHiliteExtension(**codehilite_configs))
         
         # 添加围栏式代码块扩展
-        fenced_code_configs = {}
-        if 'fenced_code' in md_configs:
-            for key, value in md_configs['fenced_code'].items():
-                fenced_code_configs[key] = value
-            if self.debug_mode:
-                self.logger.debug(f"FencedCode配置: {fenced_code_configs}")
-        extensions.append(FencedCodeExtension(**fenced_code_configs))
+        if code_blocks:
+            from markdown.extensions.fenced_code import FencedCodeExtension
+            fenced_code_configs = {}
+            if 'fenced_code' in md_configs:
+                for key, value in md_configs['fenced_code'].items():
+                    fenced_code_configs[key] = value
+                if self.debug_mode:
+                    self.logger.debug(f"FencedCode配置: {fenced_code_configs}")
+            extensions.append(FencedCodeExtension(**fenced_code_configs))
         
         # 添加表格扩展
         table_configs = {}
@@ -180,6 +322,20 @@ class MarkdownToHtml:
          * @returns {str} 转换后的HTML内容
          */
         """
+        return str(self.convert_file_to_soup(input_file, output_file))
+    
+    def convert_file_to_soup(self, input_file: str, output_file: Optional[str] = None) -> BeautifulSoup:
+        """
+        /**
+         * 转换Markdown文件为解析好的HTML文档树
+         * 
+         * 文档树可直接交给HtmlToWordConverter，只有在需要保存HTML文件时才序列化
+         * 
+         * @param {str} input_file - 输入Markdown文件路径
+         * @param {Optional[str]} output_file - 输出HTML文件路径，如果不提供则不保存文件
+         * @returns {BeautifulSoup} 转换后的HTML文档树
+         */
+        """
         self.logger.info(f"开始转换文件: {input_file}")
         
         if not os.path.exists(input_file):
@@ -187,18 +343,20 @@ class MarkdownToHtml:
             raise FileNotFoundError(f"输入文件不存在: {input_file}")
         
         try:
-            with codecs.open(input_file, 'r', encoding='utf-8') as f:
+            with timing.stage('read'), codecs.open(input_file, 'r', encoding='utf-8') as f:
                 md_content = f.read()
-                self.logger.info(f"读取Markdown文件，大小: {len(md_content)} 字节")
+            self.logger.info(f"读取Markdown文件，大小: {len(md_content)} 字节")
         
-            html_content = self.convert_text(md_content)
+            soup = self.convert_to_soup(md_content)
             
             if output_file:
-                with codecs.open(output_file, 'w', encoding='utf-8') as f:
-                    f.write(html_content)
+                with timing.stage('html_write'):
+                    html_content = str(soup)
+                    with codecs.open(output_file, 'w', encoding='utf-8') as f:
+                        f.write(html_content)
                 self.logger.info(f"HTML内容已保存到: {output_file}, 大小: {len(html_content)} 字节")
             
-            return html_content
+            return soup
         except Exception as e:
             self.logger.error(f"转换文件时发生错误: {str(e)}", exc_info=True)
             raise
@@ -212,72 +370,154 @@ class MarkdownToHtml:
          * @returns {str} 转换后的HTML内容
          */
         """
+        return str(self.convert_to_soup(md_content))
+    
+    def convert_to_soup(self, md_content: str) -> BeautifulSoup:
+        """
+        /**
+         * 转换Markdown文本为HTML文档树
+         * 
+         * 整个处理流程只解析一次HTML，各处理步骤都直接修改同一棵文档树
+         * 
+         * @param {str} md_content - Markdown格式的文本内容
+         * @returns {BeautifulSoup} 转换后的HTML文档树
+         */
+        """
         self.logger.info("开始转换Markdown文本到HTML")
         
-        # 将Markdown转换为HTML
-        html_content = markdown.markdown(md_content, extensions=self.markdown_extensions)
-        if self.debug_mode:
-            self.logger.debug(f"Markdown基础转换完成，HTML大小: {len(html_content)} 字节")
-        
-        # 进行中文处理
-        if self.config.get('chinese', {}).get('optimize_spacing', True):
-            self.logger.info("优化中文间距")
-            html_content = self._optimize_chinese_spacing(html_content)
+        md = self._get_markdown(_CODE_BLOCK_LINE_RE.search(md_content) is not None)
         
-        # 美化表格
-        self.logger.info("美化HTML表格")
-        html_content = self._beautify_tables(html_content)
+        # 没有外层耗时报告时由本方法单独记录并输出各阶段耗时
+        own_report = timing.TimingReport() if self.timing_enabled and timing.current() is None else None
+        with timing.activate(own_report):
+            # 将Markdown转换为HTML
+            with timing.stage('markdown'):
+                # 复用Markdown实例，转换前重置上一篇文档的引用链接、脚注和目录等状态
+                html_content = md.reset().convert(md_content)
+            if self.debug_mode:
+                self.logger.debug(f"Markdown基础转换完成，HTML大小: {len(html_content)} 字节")
             
-        # 进行简繁转换
-        convert_to_traditional = self.config.get('chinese', {}).get('convert_to_traditional', False)
-        self.logger.info(f"简繁转换设置: {'启用' if convert_to_traditional else '禁用'}")
-        
-        if convert_to_traditional:
-            self.logger.info("执行简体到繁体中文转换")
-            html_content = self.cc.convert(html_content)
+            with timing.stage('html_parse'):
+                soup = BeautifulSoup(html_content, self.html_parser)
+            
+            # 进行中文处理
+            if self.config.get('chinese', {}).get('optimize_spacing', True):
+                self.logger.info("优化中文间距")
+                with timing.stage('spacing'):
+                    self._optimize_chinese_spacing(soup)
+            
+            # 美化表格
+            self.logger.info("美化HTML表格")
+            with timing.stage('tables'):
+                soup = self._beautify_tables(soup)
+                
+            # 进行简繁转换
+            convert_to_traditional = self.config.get('chinese', {}).get('convert_to_traditional', False)
+            self.logger.info(f"简繁转换设置: {'启用' if convert_to_traditional else '禁用'}")
+            
+            if convert_to_traditional:
+                self.logger.info("执行简体到繁体中文转换")
+                with timing.stage('opencc'):
+                    self._convert_chinese(soup)
+                report = timing.current()
+                if report is not None:
+                    report.extra['opencc_cache'] = self.get_conversion_cache_stats()
+        
+        if own_report is not None:
+            self._log_timing_stats(own_report)
             
         self.logger.info("Markdown转HTML完成")
-        return html_content
+        return soup
+    
+    def get_conversion_cache_stats(self) -> Dict[str, Any]:
+        """
+        /**
+         * 获取简繁转换缓存的累计统计信息
+         * 
+         * @returns {Dict[str, Any]} 包含hits、misses、size、maxsize和hit_rate的字典
+         */
+        """
+        if self._convert_segment is None:
+            return {'hits': 0, 'misses': 0, 'size': 0, 'maxsize': self.conversion_cache_size, 'hit_rate': 0.0}
+        info = self._convert_segment.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            'hits': info.hits,
+            'misses': info.misses,
+            'size': info.currsize,
+            'maxsize': info.maxsize,
+            'hit_rate': info.hits / lookups if lookups else 0.0,
+        }
     
-    def _optimize_chinese_spacing(self, html_content: str) -> str:
+    def _log_timing_stats(self, report: 'timing.TimingReport'):
+        """
+        /**
+         * 输出各阶段耗时统计
+         * 
+         * @param {TimingReport} report - 耗时报告
+         */
+        """
+        stage_names = {'markdown': 'Markdown解析', 'html_parse': 'HTML解析', 'spacing': '中文间距',
+                       'tables': '表格美化', 'opencc': '简繁转换'}
+        parts = [f"{stage_names[k]}={v['wall']:.3f}秒" for k, v in report.stages.items() if k in stage_names]
+        self.logger.info(f"Markdown转HTML耗时: {', '.join(parts)}")
+        cache = report.extra.get('opencc_cache')
+        if cache:
+            self.logger.info(f"简繁转换缓存命中率: {cache['hit_rate']:.1%} "
+                             f"(命中 {cache['hits']}, 未命中 {cache['misses']}, 缓存 {cache['size']} 条)")
+    
+    def _convert_chinese(self, soup: BeautifulSoup):
+        """
+        /**
+         * 对文档树中的可见文本进行简繁转换
+         * 
+         * 只转换普通文本节点以及alt、title属性，跳过pre/code中的代码、样式、脚本和注释；
+         * 每个文本片段通过LRU缓存转换，重复出现的片段只转换一次
+         * 
+         * @param {BeautifulSoup} soup - HTML文档树
+         */
+        """
+        visitor = _ChineseConversionVisitor(self._get_segment_converter())
+        walk_tree(soup, visitor)
+        
+        # 遍历结束后批量替换
+        replace_nodes(visitor.replacements)
+    
+    def _optimize_chinese_spacing(self, soup: BeautifulSoup):
         """
         /**
          * 优化中文间距
          * 处理中英文、中文与数字、符号之间的间距，提高排版美观度
          * 
-         * @param {str} html_content - HTML内容
-         * @returns {str} 优化间距后的HTML内容
+         * @param {BeautifulSoup} soup - HTML文档树，直接在原树上修改
          */
         """
+        if self._spacing_pattern is None:
+            return
+        
         if self.debug_mode:
             self.logger.debug("开始优化中文间距")
-            
-        soup = BeautifulSoup(html_content, 'html.parser')
         
-        # 递归处理所有文本节点
+        # 处理所有文本节点
         self._process_node(soup)
         
         if self.debug_mode:
             self.logger.debug("中文间距优化完成")
-            
-        return str(soup)
     
-    def _beautify_tables(self, html_content: str) -> str:
+    def _beautify_tables(self, soup: BeautifulSoup) -> BeautifulSoup:
         """
         /**
          * 美化HTML表格
          * 为表格添加交替背景色、设置单元格高度、居中显示和宽度限制
          * 
-         * @param {str} html_content - HTML内容
-         * @returns {str} 美化表格后的HTML内容
+         * @param {BeautifulSoup} soup - HTML文档树
+         * @returns {BeautifulSoup} 美化表格后的文档树，缺少html结构时返回新建的文档树
          */
         """
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
         # 检查并创建完整的HTML结构
         if soup.html is None:
             # 如果没有完整的HTML结构，创建一个新的HTML结构
-            new_html = BeautifulSoup('<html><head></head><body></body></html>', 'html.parser')
+            new_html = BeautifulSoup('<html><head></head><body></body></html>', self.html_parser)
             # 将原内容移动到body中
             for tag in list(soup):
                 new_html.body.append(tag)
@@ -367,46 +607,88 @@ class MarkdownToHtml:
                 # 设置表头样式
                 th['style'] = 'vertical-align: middle; text-align: center; font-weight: bold;'
         
-        return str(soup)
+        return soup
     
-    def _process_node(self, node: Union[Tag, NavigableString]):
+    def _process_node(self, node: Tag):
         """
         /**
-         * 递归处理HTML节点中的文本
+         * 使用非递归遍历处理HTML节点中的文本，代码块中的文本保持原样
          * 
-         * @param {Union[Tag, NavigableString]} node - BeautifulSoup节点
+         * @param {Tag} node - BeautifulSoup节点
          */
         """
-        # 如果是文本节点
-        if isinstance(node, NavigableString):
-            if node.parent.name not in ['pre', 'code']:  # 不处理代码块中的文本
-                # 处理字符间空格
-                new_text = self._add_spaces_between_text(str(node))
-                node.replace_with(new_text)
-            return
-            
-        # 如果是标签节点，递归处理其子节点
-        if hasattr(node, 'children'):
-            # 创建一个列表保存当前所有子节点，避免在迭代过程中修改子节点导致问题
-            children = list(node.children)
-            for child in children:
-                self._process_node(child)
+        visitor = _SpacingVisitor(self._spacing_pattern, self._spacing_repl)
+        walk_tree(node, visitor)
+        replace_nodes(visitor.replacements)
     
     def _add_spaces_between_text(self, text: str) -> str:
         """
         /**
-         * 在中英文、中文与数字之间添加适当的空格
+         * 按配置调整文本间距：在中英文、中文与数字之间添加空格，删除全角标点两侧多余的空格
          * 
          * @param {str} text - 需要处理的文本
-         * @returns {str} 添加空格后的文本
+         * @returns {str} 调整间距后的文本
          */
         """
-        # 在中文与英文字母之间添加空格
-        text = re.sub(r'([\u4e00-\u9fa5])([a-zA-Z])', r'\1 \2', text)
-        text = re.sub(r'([a-zA-Z])([\u4e00-\u9fa5])', r'\1 \2', text)
-        
-        # 在中文与数字之间添加空格
-        text = re.sub(r'([\u4e00-\u9fa5])([0-9])', r'\1 \2', text)
-        text = re.sub(r'([0-9])([\u4e00-\u9fa5])', r'\1 \2', text)
-        
-        return text 
\ No newline at end of file
+        if self._spacing_pattern is None:
+            return text
+        return self._spacing_pattern.sub(self._spacing_repl, text)
+
+
+class _SpacingVisitor(TreeVisitor):
+    """
+    /**
+     * 中文间距访问者，按预编译的间距规则收集需要改写的文本节点
+     */
+    """
+    
+    def __init__(self, pattern, repl):
+        """
+        /**
+         * @param {Pattern} pattern - 预编译的间距正则
+         * @param {Union[str, Callable]} repl - 替换内容
+         */
+        """
+        self.pattern = pattern
+        self.repl = repl
+        self.replacements = []
+    
+    def enter(self, node) -> bool:
+        # 注释等特殊节点不是可见文本，保持原样；不处理代码块中的文本
+        if type(node) is NavigableString and node.parent.name not in ('pre', 'code'):
+            # 只替换发生变化的节点
+            new_text, count = self.pattern.subn(self.repl, node)
+            if count and new_text != node:
+                self.replacements.append((node, new_text))
+        return True
+
+
+class _ChineseConversionVisitor(TreeVisitor):
+    """
+    /**
+     * 简繁转换访问者，转换alt、title属性，收集需要替换的文本节点
+     */
+    """
+    
+    def __init__(self, convert_segment):
+        """
+        /**
+         * @param {Callable[[str], str]} convert_segment - 带缓存的片段转换函数
+         */
+        """
+        self.convert_segment = convert_segment
+        self.replacements = []
+    
+    def enter(self, node) -> bool:
+        if isinstance(node, Tag):
+            for attr in _CHINESE_CONVERSION_ATTRIBUTES:
+                value = node.attrs.get(attr)
+                if isinstance(value, str) and not value.isascii():
+                    node[attr] = self.convert_segment(value)
+            return node.name not in _CHINESE_CONVERSION_SKIP_TAGS
+        if type(node) is NavigableString and not node.isascii():
+            # 纯ASCII文本转换前后不变，无需查询
+            new_text = self.convert_segment(str(node))
+            if new_text != node:
+                self.replacements.append((node, new_text))
+        return False
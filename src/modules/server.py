@@ -0,0 +1,597 @@
+"""
+转换服务模块
+常驻进程通过标准输入输出或Unix套接字接收JSON-RPC 2.0请求（每行一个JSON），
+按配置指纹复用已初始化的转换器，避免每次转换都重新导入模块、加载词典和创建转换器
+"""
+
+import io
+import os
+import sys
+import json
+import base64
+import time
+import copy
+import stat
+import socket
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Callable, Iterator, TextIO
+
+# 使用try-except处理不同的导入场景
+try:
+    from .converter import Converter
+    from .build_manifest import config_fingerprint
+    from .signals import graceful_signals
+except ImportError:
+    try:
+        from src.modules.converter import Converter
+        from src.modules.build_manifest import config_fingerprint
+        from src.modules.signals import graceful_signals
+    except ImportError:
+        from converter import Converter
+        from build_manifest import config_fingerprint
+        from signals import graceful_signals
+
+# JSON-RPC错误码
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+CONVERSION_FAILED = -32000
+SERVER_BUSY = -32001
+SHUTTING_DOWN = -32002
+
+class RpcError(Exception):
+    """
+    /**
+     * 返回给客户端的JSON-RPC错误
+     */
+    """
+
+    def __init__(self, code: int, message: str):
+        """
+        /**
+         * @param {int} code - 错误码
+         * @param {str} message - 错误信息
+         */
+        """
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def merge_config(base: Dict[str, Any], overrides: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    /**
+     * 将请求中的配置覆盖项合并到基础配置的副本上
+     *
+     * 覆盖项可以是嵌套字典，也可以使用点号表示嵌套层级，如 {"chinese.convert_to_traditional": false}
+     *
+     * @param {Dict[str, Any]} base - 基础配置
+     * @param {Optional[Dict[str, Any]]} overrides - 配置覆盖项
+     * @returns {Dict[str, Any]} 合并后的配置
+     */
+    """
+    config = copy.deepcopy(base)
+    for key, value in (overrides or {}).items():
+        keys = key.split('.')
+        target = config
+        for k in keys[:-1]:
+            if not isinstance(target.get(k), dict):
+                target[k] = {}
+            target = target[k]
+        if isinstance(value, dict) and isinstance(target.get(keys[-1]), dict):
+            target[keys[-1]] = merge_config(target[keys[-1]], value)
+        else:
+            target[keys[-1]] = copy.deepcopy(value)
+    return config
+
+class ConverterPool:
+    """
+    /**
+     * 按配置指纹缓存的转换器池
+     *
+     * 转换器不是线程安全的，每个请求独占一个转换器，用完后放回池中；
+     * 空闲转换器总数超过上限时淘汰最久未使用的配置
+     */
+    """
+
+    def __init__(self, base_config: Dict[str, Any], max_idle: int = 4):
+        """
+        /**
+         * 初始化转换器池
+         *
+         * @param {Dict[str, Any]} base_config - 基础配置，请求中的覆盖项在此基础上合并
+         * @param {int} max_idle - 最多保留的空闲转换器数
+         */
+        """
+        self.base_config = base_config
+        self.max_idle = max(1, max_idle)
+        self._idle: 'OrderedDict[str, List[Converter]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    @contextmanager
+    def acquire(self, overrides: Optional[Dict[str, Any]] = None) -> Iterator[Converter]:
+        """
+        /**
+         * 取出与配置匹配的转换器，没有空闲的转换器时新建
+         *
+         * @param {Optional[Dict[str, Any]]} overrides - 配置覆盖项
+         */
+        """
+        config = merge_config(self.base_config, overrides) if overrides else self.base_config
+        # 内容完全相同的配置共享转换器，调试等配置节也参与比较
+        fingerprint = config_fingerprint(config, exclude=())
+        converter = None
+        with self._lock:
+            idle = self._idle.get(fingerprint)
+            if idle:
+                converter = idle.pop()
+                self._idle.move_to_end(fingerprint)
+                self.reused += 1
+        if converter is None:
+            converter = Converter(config)
+            with self._lock:
+                self.created += 1
+
+        try:
+            yield converter
+        except BaseException:
+            # 转换失败后转换器内部状态不确定，不再复用
+            converter.cleanup()
+            raise
+        self._release(fingerprint, converter)
+
+    def _release(self, fingerprint: str, converter: Converter):
+        """
+        /**
+         * 将转换器放回池中，超出上限时淘汰最久未使用的转换器
+         *
+         * @param {str} fingerprint - 配置指纹
+         * @param {Converter} converter - 转换器
+         */
+        """
+        evicted = []
+        with self._lock:
+            self._idle.setdefault(fingerprint, []).append(converter)
+            self._idle.move_to_end(fingerprint)
+            while sum(len(items) for items in self._idle.values()) > self.max_idle:
+                oldest, items = next(iter(self._idle.items()))
+                evicted.append(items.pop(0))
+                if not items:
+                    del self._idle[oldest]
+        for item in evicted:
+            item.cleanup()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        /**
+         * @returns {Dict[str, Any]} 转换器池统计信息
+         */
+        """
+        with self._lock:
+            return {
+                'configs': len(self._idle),
+                'idle': sum(len(items) for items in self._idle.values()),
+                'created': self.created,
+                'reused': self.reused,
+            }
+
+    def close(self):
+        """
+        /**
+         * 清理所有空闲转换器
+         */
+        """
+        with self._lock:
+            converters = [item for items in self._idle.values() for item in items]
+            self._idle.clear()
+        for converter in converters:
+            converter.cleanup()
+
+
+class _Channel:
+    """
+    /**
+     * 一个客户端连接的输出通道，多个工作线程共享时按行加锁写入
+     */
+    """
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self._lock = threading.Lock()
+        self.closed = False
+
+    def send(self, message: Dict[str, Any]):
+        line = json.dumps(message, ensure_ascii=False, default=str) + '\n'
+        with self._lock:
+            if self.closed:
+                return
+            try:
+                self.stream.write(line)
+                self.stream.flush()
+            except (OSError, ValueError):
+                # 客户端已断开
+                self.closed = True
+
+
+class ConversionServer:
+    """
+    /**
+     * 常驻转换服务
+     *
+     * 支持的方法：
+     * - convert: 转换文件（input）或Markdown文本（markdown），过程中发送progress通知
+     * - ping: 检查服务是否存活
+     * - stats: 返回请求计数和转换器池统计
+     * - shutdown: 等待进行中的请求完成后退出
+     *
+     * 同时执行的转换数不超过max_concurrency，排队的请求数不超过max_pending，超出时立即返回SERVER_BUSY错误
+     */
+    """
+
+    def __init__(self, config: Dict[str, Any], max_concurrency: Optional[int] = None,
+                 max_pending: Optional[int] = None):
+        """
+        /**
+         * 初始化转换服务
+         *
+         * @param {Dict[str, Any]} config - 基础配置
+         * @param {Optional[int]} max_concurrency - 同时执行的转换数，None表示使用配置server.max_concurrency
+         * @param {Optional[int]} max_pending - 等待执行的请求数上限，None表示使用配置server.max_pending
+         */
+        """
+        server_config = config.get('server', {})
+        if max_concurrency is None:
+            max_concurrency = server_config.get('max_concurrency', 2)
+        if max_pending is None:
+            max_pending = server_config.get('max_pending', 16)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_pending = max(0, max_pending)
+        self.pool = ConverterPool(config, server_config.get('max_converters', 4))
+        self.logger = logging.getLogger('ConversionServer')
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='convert')
+        self._slots = threading.BoundedSemaphore(self.max_concurrency + self.max_pending)
+        self._closing = threading.Event()
+        self._closed = False
+        self._stats_lock = threading.Lock()
+        self._started = time.time()
+        self._counts = {'active': 0, 'completed': 0, 'failed': 0, 'rejected': 0}
+
+    def handle_line(self, line: str, channel: _Channel):
+        """
+        /**
+         * 处理一行请求，convert请求交给工作线程执行，其他请求直接应答
+         *
+         * @param {str} line - 一行JSON文本
+         * @param {_Channel} channel - 应答通道
+         */
+        """
+        line = line.strip()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            channel.send(_error_response(None, PARSE_ERROR, f"JSON解析失败: {e}"))
+            return
+        if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+            channel.send(_error_response(request.get('id') if isinstance(request, dict) else None,
+                                         INVALID_REQUEST, '无效的请求'))
+            return
+
+        request_id = request.get('id')
+        method = request['method']
+        params = request.get('params') or {}
+        if not isinstance(params, dict):
+            channel.send(_error_response(request_id, INVALID_PARAMS, 'params必须是对象'))
+            return
+
+        if method == 'convert':
+            self._submit_convert(request_id, params, channel)
+            return
+        try:
+            if method == 'ping':
+                result = {'pong': True}
+            elif method == 'stats':
+                result = self.stats()
+            elif method == 'shutdown':
+                self._closing.set()
+                result = {'shutting_down': True}
+            else:
+                raise RpcError(METHOD_NOT_FOUND, f"未知的方法: {method}")
+            if request_id is not None:
+                channel.send({'jsonrpc': '2.0', 'id': request_id, 'result': result})
+        except RpcError as e:
+            channel.send(_error_response(request_id, e.code, e.message))
+
+    def _submit_convert(self, request_id: Any, params: Dict[str, Any], channel: _Channel):
+        """
+        /**
+         * 检查并发限制后将转换请求交给工作线程
+         *
+         * @param {Any} request_id - 请求ID
+         * @param {Dict[str, Any]} params - 请求参数
+         * @param {_Channel} channel - 应答通道
+         */
+        """
+        if self._closing.is_set():
+            channel.send(_error_response(request_id, SHUTTING_DOWN, '服务正在关闭'))
+            return
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self._counts['rejected'] += 1
+            channel.send(_error_response(request_id, SERVER_BUSY,
+                                         f"服务繁忙：已有 {self.max_concurrency + self.max_pending} 个请求在执行或排队"))
+            return
+
+        def notify(state: str, **extra):
+            channel.send({'jsonrpc': '2.0', 'method': 'progress', 'params': {'id': request_id, 'state': state, **extra}})
+
+        notify('queued')
+        self._executor.submit(self._run_convert, request_id, params, channel, notify)
+
+    def _run_convert(self, request_id: Any, params: Dict[str, Any], channel: _Channel,
+                     notify: Callable[..., None]):
+        """
+        /**
+         * 在工作线程中执行转换并发送应答
+         */
+        """
+        with self._stats_lock:
+            self._counts['active'] += 1
+        try:
+            result = self._convert(params, notify)
+            with self._stats_lock:
+                self._counts['completed'] += 1
+            notify('finished', elapsed=result['elapsed'])
+            response = {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+        except RpcError as e:
+            with self._stats_lock:
+                self._counts['failed'] += 1
+            notify('failed', error=e.message)
+            response = _error_response(request_id, e.code, e.message)
+        except Exception as e:
+            self.logger.exception(f"转换失败: {e}")
+            with self._stats_lock:
+                self._counts['failed'] += 1
+            notify('failed', error=str(e))
+            response = _error_response(request_id, CONVERSION_FAILED, str(e))
+        finally:
+            with self._stats_lock:
+                self._counts['active'] -= 1
+            self._slots.release()
+        if request_id is not None:
+            channel.send(response)
+
+    def _convert(self, params: Dict[str, Any], notify: Callable[..., None]) -> Dict[str, Any]:
+        """
+        /**
+         * 执行一次转换
+         *
+         * 参数：input（Markdown文件路径）与markdown（Markdown文本）二选一；
+         * output为Word文件路径，转换文件时默认与输入文件同名，转换文本且不提供时返回HTML；
+         * inline为真时不写文件，在内存中生成docx并以base64返回（docx字段）；
+         * cwd为相对路径的基准目录；config为配置覆盖项；keep_html是否保留中间HTML文件
+         *
+         * @param {Dict[str, Any]} params - 请求参数
+         * @param {Callable} notify - 进度通知函数
+         * @returns {Dict[str, Any]} 转换结果
+         */
+        """
+        input_file = params.get('input')
+        markdown = params.get('markdown')
+        if (input_file is None) == (markdown is None):
+            raise RpcError(INVALID_PARAMS, '必须且只能提供input或markdown其中之一')
+        overrides = params.get('config')
+        if overrides is not None and not isinstance(overrides, dict):
+            raise RpcError(INVALID_PARAMS, 'config必须是对象')
+
+        inline = bool(params.get('inline', False))
+        if inline and params.get('output'):
+            raise RpcError(INVALID_PARAMS, 'inline与output不能同时使用')
+
+        base_dir = params.get('cwd') or os.getcwd()
+        output_file = params.get('output')
+        if output_file:
+            output_file = os.path.join(base_dir, output_file)
+        if input_file is not None:
+            input_file = os.path.join(base_dir, input_file)
+            if not os.path.isfile(input_file):
+                raise RpcError(INVALID_PARAMS, f"输入文件不存在: {input_file}")
+            if not output_file and not inline:
+                output_file = os.path.splitext(input_file)[0] + '.docx'
+
+        start = time.perf_counter()
+        with self.pool.acquire(overrides) as converter:
+            notify('started')
+            converter.last_timing_report = None
+            if output_file:
+                output_dir = os.path.dirname(output_file)
+                if output_dir:
+                    os.makedirs(output_dir, exist_ok=True)
+            if inline:
+                buffer = io.BytesIO()
+                if input_file is not None:
+                    converter.convert_file(input_file, buffer, bool(params.get('keep_html', False)))
+                else:
+                    converter.convert_text(markdown, buffer)
+                result = {'docx': base64.b64encode(buffer.getvalue()).decode('ascii')}
+            elif input_file is not None:
+                converter.convert_file(input_file, output_file, bool(params.get('keep_html', False)))
+                result = {'output': os.path.abspath(output_file)}
+            elif output_file:
+                converter.convert_text(markdown, output_file)
+                result = {'output': os.path.abspath(output_file)}
+            else:
+                result = {'html': converter.convert_text(markdown)}
+            if converter.last_timing_report is not None:
+                result['timing'] = converter.last_timing_report
+        result['elapsed'] = round(time.perf_counter() - start, 6)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        /**
+         * @returns {Dict[str, Any]} 请求计数、运行时间和转换器池统计
+         */
+        """
+        with self._stats_lock:
+            counts = dict(self._counts)
+        return {
+            **counts,
+            'uptime': round(time.time() - self._started, 3),
+            'max_concurrency': self.max_concurrency,
+            'max_pending': self.max_pending,
+            'converters': self.pool.stats(),
+        }
+
+    def serve_stdio(self, stdin: Optional[TextIO] = None, stdout: Optional[TextIO] = None):
+        """
+        /**
+         * 通过标准输入输出提供服务，读到文件结尾或收到shutdown请求后退出
+         *
+         * 服务期间sys.stdout重定向到标准错误，避免转换过程中的输出混入协议数据
+         *
+         * @param {Optional[TextIO]} stdin - 输入流，默认为sys.stdin
+         * @param {Optional[TextIO]} stdout - 输出流，默认为sys.stdout
+         */
+        """
+        stdin = stdin or sys.stdin
+        channel = _Channel(stdout or sys.stdout)
+        original_stdout = sys.stdout
+        sys.stdout = sys.stderr
+        self.logger.info('转换服务已启动（标准输入输出）')
+        try:
+            with graceful_signals():
+                for line in stdin:
+                    self.handle_line(line, channel)
+                    if self._closing.is_set():
+                        break
+        except KeyboardInterrupt:
+            self.logger.info('收到中断信号')
+        finally:
+            self.close()
+            sys.stdout = original_stdout
+
+    def serve_unix(self, path: str):
+        """
+        /**
+         * 通过Unix套接字提供服务，每个连接一个读取线程，收到shutdown请求或中断信号后退出
+         *
+         * @param {str} path - 套接字文件路径
+         */
+        """
+        if not hasattr(socket, 'AF_UNIX'):
+            raise OSError('当前平台不支持Unix套接字，请使用标准输入输出模式')
+        _remove_stale_socket(path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(path)
+        # 退出时只删除本服务创建的套接字文件
+        socket_inode = os.lstat(path).st_ino
+        listener.listen()
+        # 定期检查关闭标志
+        listener.settimeout(0.5)
+        connections: List[socket.socket] = []
+        self.logger.info(f"转换服务已启动（Unix套接字 {path}）")
+        try:
+            with graceful_signals():
+                while not self._closing.is_set():
+                    try:
+                        conn, _ = listener.accept()
+                    except socket.timeout:
+                        continue
+                    conn.settimeout(None)
+                    connections.append(conn)
+                    threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+        except KeyboardInterrupt:
+            self.logger.info('收到中断信号')
+        finally:
+            listener.close()
+            try:
+                info = os.lstat(path)
+                if stat.S_ISSOCK(info.st_mode) and info.st_ino == socket_inode:
+                    os.remove(path)
+            except OSError:
+                pass
+            self.close()
+            for conn in connections:
+                try:
+                    conn.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                conn.close()
+
+    def _serve_connection(self, conn: socket.socket):
+        """
+        /**
+         * 读取一个套接字连接上的请求
+         *
+         * @param {socket.socket} conn - 客户端连接
+         */
+        """
+        reader = conn.makefile('r', encoding='utf-8', newline='\n')
+        writer = conn.makefile('w', encoding='utf-8', newline='\n')
+        channel = _Channel(writer)
+        try:
+            for line in reader:
+                self.handle_line(line, channel)
+        except (OSError, ValueError):
+            pass
+
+    def close(self):
+        """
+        /**
+         * 停止接收新请求，等待进行中和排队的转换完成后释放转换器
+         */
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._closing.set()
+        self._executor.shutdown(wait=True)
+        self.pool.close()
+        self.logger.info('转换服务已关闭')
+
+
+def _remove_stale_socket(path: str):
+    """
+    /**
+     * 删除上一次运行遗留的套接字文件
+     *
+     * 路径上是普通文件、目录等其他文件时拒绝删除；仍有服务在该套接字上监听时拒绝启动
+     *
+     * @param {str} path - 套接字文件路径
+     */
+    """
+    try:
+        info = os.lstat(path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(info.st_mode):
+        raise FileExistsError(f"{path} 已存在且不是套接字文件，为避免覆盖请指定其他路径")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        # 没有进程在监听，是遗留的套接字文件
+        os.remove(path)
+        return
+    finally:
+        probe.close()
+    raise OSError(f"已有转换服务在 {path} 上运行")
+
+def _error_response(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    """
+    /**
+     * 构造JSON-RPC错误应答
+     */
+    """
+    return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}}
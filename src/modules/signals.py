@@ -0,0 +1,31 @@
+"""
+信号处理模块
+长时间运行的转换服务和文件监视共用的退出信号处理
+"""
+
+import signal
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+@contextmanager
+def graceful_signals() -> Iterator[None]:
+    """
+    /**
+     * 在上下文中将SIGTERM转换为KeyboardInterrupt，使长时间运行的进程可以完成进行中的工作后退出
+     *
+     * 只能在主线程中安装信号处理器，在其他线程中或平台没有SIGTERM时不做任何处理
+     */
+    """
+    if threading.current_thread() is not threading.main_thread() or not hasattr(signal, 'SIGTERM'):
+        yield
+        return
+
+    def interrupt(signum, frame):
+        raise KeyboardInterrupt()
+
+    previous = signal.signal(signal.SIGTERM, interrupt)
+    try:
+        yield
+    finally:
+        signal.signal(signal.SIGTERM, previous)
@@ -0,0 +1,274 @@
+"""
+耗时统计模块
+按阶段和元素处理器记录墙钟时间与CPU时间，生成每个文件的JSON报告和批量转换的汇总报告
+"""
+
+import os
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Optional, Iterable, Iterator, List, Callable
+
+# 报告格式版本
+TIMING_REPORT_VERSION = 2
+
+# 当前正在记录的报告，未启用耗时统计时为None，各阶段的计时调用不产生任何开销
+_active_report: ContextVar[Optional['TimingReport']] = ContextVar('timing_report', default=None)
+
+class TimingReport:
+    """
+    /**
+     * 单个文件的耗时报告
+     *
+     * stages记录各处理阶段（读取、Markdown、HTML解析、间距、表格美化、简繁转换、图片读写、保存等），
+     * processors记录各元素处理器类的自身耗时和处理的元素数，包括经由处理器工厂分发的嵌套元素
+     * （段落中的内联内容、引用块和div中的表格等）。嵌套处理器的耗时从外层处理器中扣除，各处理器耗时之和不重复计算；
+     * 处理器耗时包含其内部的嵌套阶段（如图片读写）。同一阶段多次进入时累加
+     */
+    """
+
+    def __init__(self, name: str = ''):
+        """
+        /**
+         * 初始化耗时报告
+         *
+         * @param {str} name - 报告名称，通常为源文件路径
+         */
+        """
+        self.name = name
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.processors: Dict[str, Dict[str, float]] = {}
+        self.extra: Dict[str, Any] = {}
+        self._processor_frames: List[List[float]] = []
+        self.wall = 0.0
+        self.cpu = 0.0
+
+    def add(self, group: str, key: str, wall: float, cpu: float, count: int = 1):
+        """
+        /**
+         * 累加一次计时结果
+         *
+         * @param {str} group - stages或processors
+         * @param {str} key - 阶段名称或处理器类名
+         * @param {float} wall - 墙钟时间（秒）
+         * @param {float} cpu - 当前进程的CPU时间（秒）
+         * @param {int} count - 调用次数或处理的元素数
+         */
+        """
+        entries = self.stages if group == 'stages' else self.processors
+        entry = entries.get(key)
+        if entry is None:
+            entry = entries[key] = {'wall': 0.0, 'cpu': 0.0, 'count': 0}
+        entry['wall'] += wall
+        entry['cpu'] += cpu
+        entry['count'] += count
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        /**
+         * 转换为可序列化为JSON的字典
+         *
+         * @returns {Dict[str, Any]} 报告字典
+         */
+        """
+        data = {
+            'version': TIMING_REPORT_VERSION,
+            'file': self.name,
+            'wall': round(self.wall, 6),
+            'cpu': round(self.cpu, 6),
+            'stages': _rounded(self.stages),
+            'processors': _rounded(self.processors),
+        }
+        if self.extra:
+            data['extra'] = self.extra
+        return data
+
+    def summary(self, limit: int = 6) -> str:
+        """
+        /**
+         * 生成单行耗时摘要，按墙钟时间从高到低列出各阶段
+         *
+         * @param {int} limit - 最多列出的阶段数
+         * @returns {str} 摘要文本
+         */
+        """
+        return _summary(self.wall, self.stages, limit)
+
+@contextmanager
+def activate(report: Optional[TimingReport]) -> Iterator[Optional[TimingReport]]:
+    """
+    /**
+     * 在上下文中启用耗时报告，并记录总耗时
+     *
+     * @param {Optional[TimingReport]} report - 耗时报告，为None时不做任何记录
+     */
+    """
+    if report is None:
+        yield None
+        return
+    token = _active_report.set(report)
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        yield report
+    finally:
+        report.wall += time.perf_counter() - wall_start
+        report.cpu += time.process_time() - cpu_start
+        _active_report.reset(token)
+
+def current() -> Optional[TimingReport]:
+    """
+    /**
+     * 获取当前正在记录的耗时报告
+     *
+     * @returns {Optional[TimingReport]} 当前报告，未启用时返回None
+     */
+    """
+    return _active_report.get()
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    /**
+     * 记录一个处理阶段的耗时
+     *
+     * @param {str} name - 阶段名称
+     */
+    """
+    report = _active_report.get()
+    if report is None:
+        yield
+        return
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        report.add('stages', name, time.perf_counter() - wall_start, time.process_time() - cpu_start)
+
+@contextmanager
+def processor(name: str) -> Iterator[None]:
+    """
+    /**
+     * 记录元素处理器处理一个元素的自身耗时，嵌套在其中的处理器耗时不计入
+     *
+     * @param {str} name - 处理器类名
+     */
+    """
+    report = _active_report.get()
+    if report is None:
+        yield
+        return
+    # 嵌套处理器的累计耗时：[墙钟时间, CPU时间]
+    frame = [0.0, 0.0]
+    frames = report._processor_frames
+    frames.append(frame)
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        frames.pop()
+        report.add('processors', name, wall - frame[0], cpu - frame[1])
+        if frames:
+            frames[-1][0] += wall
+            frames[-1][1] += cpu
+
+def timed_processor(name: str, method: Callable) -> Callable:
+    """
+    /**
+     * 包装处理器方法，每次调用按处理器记录一个元素的自身耗时
+     *
+     * @param {str} name - 处理器类名
+     * @param {Callable} method - 处理器的绑定方法
+     * @returns {Callable} 包装后的方法
+     */
+    """
+    def wrapper(*args, **kwargs):
+        with processor(name):
+            return method(*args, **kwargs)
+    return wrapper
+
+def aggregate(reports: Iterable[Dict[str, Any]], wall: Optional[float] = None) -> Dict[str, Any]:
+    """
+    /**
+     * 汇总多个文件的耗时报告
+     *
+     * @param {Iterable[Dict[str, Any]]} reports - 每个文件的报告字典
+     * @param {Optional[float]} wall - 批量转换实际经过的墙钟时间，并行转换时小于各文件耗时之和
+     * @returns {Dict[str, Any]} 汇总报告字典
+     */
+    """
+    totals = {'stages': {}, 'processors': {}}
+    files = 0
+    file_wall = file_cpu = 0.0
+    for report in reports:
+        files += 1
+        file_wall += report.get('wall', 0.0)
+        file_cpu += report.get('cpu', 0.0)
+        for group in ('stages', 'processors'):
+            for key, entry in report.get(group, {}).items():
+                total = totals[group].setdefault(key, {'wall': 0.0, 'cpu': 0.0, 'count': 0})
+                total['wall'] += entry['wall']
+                total['cpu'] += entry['cpu']
+                total['count'] += entry['count']
+    data = {
+        'version': TIMING_REPORT_VERSION,
+        'files': files,
+        'wall': round(file_wall, 6),
+        'cpu': round(file_cpu, 6),
+        'stages': _rounded(totals['stages']),
+        'processors': _rounded(totals['processors']),
+    }
+    if wall is not None:
+        data['batch_wall'] = round(wall, 6)
+    return data
+
+def aggregate_summary(data: Dict[str, Any], limit: int = 6) -> str:
+    """
+    /**
+     * 生成汇总报告的单行摘要
+     *
+     * @param {Dict[str, Any]} data - aggregate返回的汇总报告
+     * @param {int} limit - 最多列出的阶段数
+     * @returns {str} 摘要文本
+     */
+    """
+    return _summary(data['wall'], data['stages'], limit)
+
+def write_report(path: str, data: Dict[str, Any]):
+    """
+    /**
+     * 写入JSON报告，目录不存在时自动创建
+     *
+     * @param {str} path - 报告文件路径
+     * @param {Dict[str, Any]} data - 报告字典
+     */
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+def _rounded(entries: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    """
+    /**
+     * 按墙钟时间从高到低排序并保留6位小数
+     */
+    """
+    ordered = sorted(entries.items(), key=lambda item: item[1]['wall'], reverse=True)
+    return {
+        key: {'wall': round(entry['wall'], 6), 'cpu': round(entry['cpu'], 6), 'count': entry['count']}
+        for key, entry in ordered
+    }
+
+def _summary(total: float, stages: Dict[str, Dict[str, float]], limit: int) -> str:
+    """
+    /**
+     * 生成“总耗时 + 主要阶段”摘要文本
+     */
+    """
+    ordered = sorted(stages.items(), key=lambda item: item[1]['wall'], reverse=True)[:limit]
+    parts = [f"{key}={entry['wall']:.3f}秒" for key, entry in ordered]
+    return f"总耗时 {total:.3f}秒: {', '.join(parts)}"
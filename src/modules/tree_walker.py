@@ -0,0 +1,176 @@
+"""
+文档树遍历模块
+提供基于显式栈的非递归遍历器，避免深层嵌套的文档超出Python递归深度限制
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from bs4 import Tag, NavigableString
+
+Node = Union[Tag, NavigableString]
+
+class TreeVisitor:
+    """
+    /**
+     * 文档树访问者接口
+     *
+     * 处理器继承该类并注册到TreeWalker，由遍历器按文档顺序回调
+     */
+    """
+
+    def enter(self, node: Node) -> bool:
+        """
+        /**
+         * 进入节点时调用
+         *
+         * 可以用替换后的新节点调用node.replace_with，但不能在兄弟节点中插入或删除节点
+         *
+         * @param {Union[Tag, NavigableString]} node - 当前节点
+         * @returns {bool} 是否继续访问该节点的子节点
+         */
+        """
+        return True
+
+    def leave(self, node: Tag):
+        """
+        /**
+         * 离开标签节点时调用，只有enter返回True的标签节点才会调用
+         *
+         * @param {Tag} node - 当前标签节点
+         */
+        """
+        pass
+
+
+class TreeWalker:
+    """
+    /**
+     * 非递归文档树遍历器
+     *
+     * 使用显式栈按文档顺序深度优先遍历，直接迭代子节点列表而不复制；
+     * 多个访问者可以在一次遍历中共享，每个访问者独立决定是否进入子树
+     */
+    """
+
+    def __init__(self, visitors: Optional[Iterable[TreeVisitor]] = None):
+        """
+        /**
+         * 初始化遍历器
+         *
+         * @param {Optional[Iterable[TreeVisitor]]} visitors - 初始注册的访问者
+         */
+        """
+        self.visitors: List[TreeVisitor] = list(visitors or [])
+
+    def register(self, visitor: TreeVisitor) -> 'TreeWalker':
+        """
+        /**
+         * 注册访问者
+         *
+         * @param {TreeVisitor} visitor - 访问者
+         * @returns {TreeWalker} 当前遍历器，便于链式调用
+         */
+        """
+        self.visitors.append(visitor)
+        return self
+
+    def walk(self, root: Tag):
+        """
+        /**
+         * 遍历根节点的所有后代节点（不包括根节点本身）
+         *
+         * @param {Tag} root - 根节点
+         */
+        """
+        if not self.visitors or not isinstance(root, Tag):
+            return
+
+        # 栈中每一项为 (子节点迭代器, 所属标签, 仍在访问该子树的访问者)
+        stack = [(iter(root.contents), None, tuple(self.visitors))]
+        while stack:
+            children, parent, visitors = stack[-1]
+            node = next(children, None)
+            if node is None:
+                stack.pop()
+                if parent is not None:
+                    for visitor in visitors:
+                        visitor.leave(parent)
+                continue
+
+            if len(visitors) == 1:
+                descend = visitors if visitors[0].enter(node) else ()
+            else:
+                descend = tuple(visitor for visitor in visitors if visitor.enter(node))
+
+            if descend and isinstance(node, Tag):
+                stack.append((iter(node.contents), node, descend))
+
+
+def walk_tree(root: Tag, visitor: TreeVisitor):
+    """
+    /**
+     * 使用单个访问者遍历文档树
+     *
+     * @param {Tag} root - 根节点
+     * @param {TreeVisitor} visitor - 访问者
+     */
+    """
+    TreeWalker([visitor]).walk(root)
+
+def replace_nodes(replacements: Iterable[Tuple[Node, Union[Node, str]]]):
+    """
+    /**
+     * 批量替换节点
+     *
+     * replace_with每次都要在父节点的子节点列表中查找位置，兄弟节点很多时代价为平方级；
+     * 按父节点重建子节点列表（clear、extend）又要沿每个子节点最右侧的路径查找最后的后代，深层嵌套时同样是平方级。
+     * 这里每个父节点只建立一次位置索引，文本节点替换为文本时原位替换并重新连接前后节点，
+     * 其余替换使用replace_with。原位替换直接维护BeautifulSoup的节点链接属性，
+     * 支持的beautifulsoup4版本范围见requirements.txt，由test_tree_walker.py检查链接的完整性
+     *
+     * @param {Iterable[Tuple[Node, Union[Node, str]]]} replacements - (原节点, 新节点或文本) 列表
+     */
+    """
+    positions: Dict[int, Dict[int, int]] = {}
+    for node, new_node in replacements:
+        parent = node.parent
+        if parent is None:
+            continue
+        index_map = positions.get(id(parent))
+        if index_map is None:
+            index_map = {id(child): i for i, child in enumerate(parent.contents)}
+            positions[id(parent)] = index_map
+        index = index_map[id(node)]
+        
+        if isinstance(node, NavigableString) and isinstance(new_node, str) and not isinstance(new_node, Tag):
+            if not isinstance(new_node, NavigableString):
+                new_node = NavigableString(new_node)
+            if new_node.parent is None:
+                _swap_string(parent, index, node, new_node)
+                continue
+        node.replace_with(new_node)
+
+def _swap_string(parent: Tag, index: int, old: NavigableString, new: NavigableString):
+    """
+    /**
+     * 将父节点中第index个文本节点原位替换为新的文本节点
+     *
+     * @param {Tag} parent - 父节点
+     * @param {int} index - 文本节点在父节点中的位置
+     * @param {NavigableString} old - 原文本节点
+     * @param {NavigableString} new - 新文本节点，尚未加入任何文档树
+     */
+    """
+    parent.contents[index] = new
+    new.parent = parent
+    new.previous_element, new.next_element = old.previous_element, old.next_element
+    new.previous_sibling, new.next_sibling = old.previous_sibling, old.next_sibling
+    if new.previous_element is not None:
+        new.previous_element.next_element = new
+    if new.next_element is not None:
+        new.next_element.previous_element = new
+    if new.previous_sibling is not None:
+        new.previous_sibling.next_sibling = new
+    if new.next_sibling is not None:
+        new.next_sibling.previous_sibling = new
+    old.parent = old.previous_element = old.next_element = None
+    old.previous_sibling = old.next_sibling = None
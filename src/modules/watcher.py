@@ -0,0 +1,342 @@
+"""
+文件监视模块
+轮询输入目录中的Markdown文件及其引用的本地图片，文件稳定一段时间后使用同一个转换器重新转换发生变化的文档
+"""
+
+import os
+import time
+import queue
+import shutil
+import logging
+import threading
+from typing import Dict, Any, Optional, Set, Tuple, List
+
+# 使用try-except处理不同的导入场景
+try:
+    from .converter import Converter
+    from .build_manifest import BuildManifest, find_image_references, image_candidates
+    from .signals import graceful_signals
+except ImportError:
+    try:
+        from src.modules.converter import Converter
+        from src.modules.build_manifest import BuildManifest, find_image_references, image_candidates
+        from src.modules.signals import graceful_signals
+    except ImportError:
+        from converter import Converter
+        from build_manifest import BuildManifest, find_image_references, image_candidates
+        from signals import graceful_signals
+
+# 转换中的临时输出目录，位于输出目录中，转换完成后原子替换到最终位置
+WATCH_TEMP_DIRNAME = '.world_md_watch'
+
+# 文件签名：(修改时间纳秒, 大小)，文件不存在时为None
+Signature = Optional[Tuple[int, int]]
+
+def _signature(path: str) -> Signature:
+    """
+    /**
+     * 获取文件签名
+     *
+     * @param {str} path - 文件路径
+     * @returns {Signature} (修改时间纳秒, 大小)，不是文件或不存在时返回None
+     */
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    if not os.path.isfile(path):
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class DocumentWatcher:
+    """
+    /**
+     * 文档监视器
+     *
+     * 主线程按固定间隔轮询文件签名（不依赖平台的文件系统通知），变化的文件在debounce秒内没有再次变化后才提交转换；
+     * 图片变化时重新转换所有引用该图片的文档。转换在单独的线程中使用同一个转换器执行，先写入临时文件，
+     * 转换期间源文件再次变化时丢弃本次结果，等待文件稳定后再转换最新内容
+     */
+    """
+
+    def __init__(self, converter: Converter, input_path: str, output_path: str, keep_html: bool = False,
+                 interval: Optional[float] = None, debounce: Optional[float] = None):
+        """
+        /**
+         * 初始化文档监视器
+         *
+         * @param {Converter} converter - 整个监视期间复用的转换器
+         * @param {str} input_path - 输入Markdown文件或目录
+         * @param {str} output_path - 输出Word文件（输入为文件时）或目录
+         * @param {bool} keep_html - 是否保留中间HTML文件
+         * @param {Optional[float]} interval - 轮询间隔（秒），None表示使用配置watch.interval
+         * @param {Optional[float]} debounce - 文件稳定多少秒后才转换，None表示使用配置watch.debounce
+         */
+        """
+        watch_config = converter.config.get('watch', {})
+        self.converter = converter
+        self.input_path = os.path.abspath(input_path)
+        self.output_path = os.path.abspath(output_path)
+        self.single_file = os.path.isfile(self.input_path)
+        self.keep_html = keep_html
+        self.interval = interval if interval is not None else watch_config.get('interval', 0.25)
+        self.debounce = debounce if debounce is not None else watch_config.get('debounce', 0.3)
+        self.search_dirs = converter.config.get('images', {}).get('search_dirs', [])
+        self.logger = logging.getLogger('DocumentWatcher')
+
+        # 目录模式下维护增量构建清单，之后的增量批量转换可以跳过监视期间已转换的文件
+        self.manifest = None if self.single_file else BuildManifest(self.output_path, converter.config, keep_html).load()
+
+        self._sources: Dict[str, Signature] = {}
+        self._dependencies: Dict[str, Set[str]] = {}
+        self._images: Dict[str, Signature] = {}
+        self._dirty: Dict[str, float] = {}
+        self._generations: Dict[str, int] = {}
+        self._queued: Set[str] = set()
+        self._lock = threading.Lock()
+        self._queue: 'queue.Queue[Optional[str]]' = queue.Queue()
+        self._stop = threading.Event()
+        self.converted = 0
+        self.cancelled = 0
+
+    def run(self, initial_build: bool = True):
+        """
+        /**
+         * 开始监视，直到stop被调用或收到中断信号（SIGINT、SIGTERM）
+         *
+         * @param {bool} initial_build - 开始监视前是否先转换变化的文件（目录模式下使用增量批量转换）
+         */
+        """
+        # 先记录签名再做初始转换，初始转换期间修改的文件会在第一次轮询时发现
+        self._scan(record_only=True)
+        if initial_build:
+            self._initial_build()
+        worker = threading.Thread(target=self._work, name='watch-convert', daemon=True)
+        worker.start()
+        self.logger.info(f"开始监视: {self.input_path}（轮询间隔 {self.interval}秒，防抖 {self.debounce}秒），按Ctrl+C退出")
+        try:
+            with graceful_signals():
+                while not self._stop.is_set():
+                    self._scan()
+                    self._submit_ready()
+                    self._stop.wait(self.interval)
+        except KeyboardInterrupt:
+            self.logger.info('停止监视')
+        finally:
+            self._stop.set()
+            self._queue.put(None)
+            worker.join()
+            shutil.rmtree(os.path.join(self._output_dir(), WATCH_TEMP_DIRNAME), ignore_errors=True)
+            self.logger.info(f"监视结束: 转换 {self.converted} 次，取消 {self.cancelled} 次过期的转换")
+
+    def stop(self):
+        """
+        /**
+         * 停止监视，正在进行的转换完成后run返回
+         */
+        """
+        self._stop.set()
+
+    def _initial_build(self):
+        """
+        /**
+         * 开始监视前转换变化的文件
+         */
+        """
+        if self.single_file:
+            self._convert(self.input_path)
+        else:
+            self.converter.batch_convert(self.input_path, self.output_path, self.keep_html, jobs=1, incremental=True)
+            # 批量转换更新了清单文件，重新加载
+            self.manifest.load()
+
+    def _list_sources(self) -> List[str]:
+        """
+        /**
+         * @returns {List[str]} 当前的Markdown源文件绝对路径
+         */
+        """
+        if self.single_file:
+            return [self.input_path] if os.path.isfile(self.input_path) else []
+        if not os.path.isdir(self.input_path):
+            return []
+        return [os.path.abspath(path) for path in self.converter._find_markdown_files(self.input_path)]
+
+    def _scan(self, record_only: bool = False):
+        """
+        /**
+         * 轮询一次源文件和图片的签名，变化的文档标记为待转换
+         *
+         * @param {bool} record_only - 只记录当前签名，不标记变化（开始监视时使用）
+         */
+        """
+        now = time.monotonic()
+        changed: Set[str] = set()
+
+        current = set(self._list_sources())
+        for path in current | set(self._sources):
+            signature = _signature(path) if path in current else None
+            if path in self._sources and self._sources[path] == signature:
+                continue
+            if signature is None:
+                self._sources.pop(path, None)
+                self._dependencies.pop(path, None)
+            else:
+                self._sources[path] = signature
+                self._dependencies[path] = self._read_dependencies(path)
+            changed.add(path)
+
+        watched_images = set().union(*self._dependencies.values()) if self._dependencies else set()
+        for image_path in watched_images | set(self._images):
+            if image_path not in watched_images:
+                del self._images[image_path]
+                continue
+            signature = _signature(image_path)
+            if image_path in self._images and self._images[image_path] == signature:
+                continue
+            is_new = image_path not in self._images
+            self._images[image_path] = signature
+            if is_new:
+                # 新引用的图片随文档一起处理，不单独触发转换
+                continue
+            if self.manifest is not None:
+                self.manifest.forget_image(image_path)
+            changed.update(path for path, deps in self._dependencies.items() if image_path in deps)
+
+        if record_only or not changed:
+            return
+        with self._lock:
+            for path in changed:
+                self._dirty[path] = now
+                self._generations[path] = self._generations.get(path, 0) + 1
+
+    def _read_dependencies(self, path: str) -> Set[str]:
+        """
+        /**
+         * 读取文档引用的本地图片的所有候选路径，图片出现、修改或删除都会触发重新转换
+         *
+         * @param {str} path - Markdown文件路径
+         * @returns {Set[str]} 候选图片绝对路径
+         */
+        """
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                md_content = f.read()
+        except OSError:
+            return set()
+        base_dir = os.path.dirname(path)
+        return {
+            os.path.abspath(candidate)
+            for src in find_image_references(md_content)
+            for candidate in image_candidates(src, self.search_dirs, base_dir)
+        }
+
+    def _submit_ready(self):
+        """
+        /**
+         * 将已稳定debounce秒的文档提交给转换线程，已在队列中的文档不重复提交
+         */
+        """
+        now = time.monotonic()
+        with self._lock:
+            ready = [path for path, changed_at in self._dirty.items() if now - changed_at >= self.debounce]
+            for path in ready:
+                del self._dirty[path]
+                if path not in self._queued:
+                    self._queued.add(path)
+                    self._queue.put(path)
+
+    def _work(self):
+        """
+        /**
+         * 转换线程：依次转换提交的文档
+         */
+        """
+        while True:
+            path = self._queue.get()
+            if path is None:
+                return
+            with self._lock:
+                self._queued.discard(path)
+            if self._stop.is_set():
+                continue
+            try:
+                self._convert(path)
+            except Exception as e:
+                self.logger.error(f"转换失败: {path}: {e}")
+
+    def _output_dir(self) -> str:
+        """
+        /**
+         * @returns {str} 输出目录
+         */
+        """
+        return os.path.dirname(self.output_path) if self.single_file else self.output_path
+
+    def _output_file(self, path: str) -> Tuple[str, str]:
+        """
+        /**
+         * 计算文档的相对路径和输出文件路径，与批量转换的命名规则一致
+         *
+         * @param {str} path - Markdown文件绝对路径
+         * @returns {Tuple[str, str]} (相对路径, 输出文件路径)
+         */
+        """
+        if self.single_file:
+            return os.path.basename(path), self.output_path
+        rel_path = os.path.relpath(path, self.input_path)
+        return rel_path, os.path.join(self.output_path, f"{os.path.splitext(rel_path)[0]}.docx")
+
+    def _convert(self, path: str):
+        """
+        /**
+         * 转换一个文档，转换期间源文件再次变化时丢弃结果
+         *
+         * @param {str} path - Markdown文件绝对路径
+         */
+        """
+        rel_path, output_file = self._output_file(path)
+        with self._lock:
+            generation = self._generations.get(path, 0)
+            if path in self._dirty:
+                # 排队期间文件再次修改，等文件稳定后再转换
+                self.cancelled += 1
+                return
+
+        if not os.path.isfile(path):
+            # 源文件已删除，删除对应的输出
+            if os.path.isfile(output_file):
+                os.remove(output_file)
+                self.logger.info(f"删除过期输出: {output_file}")
+            if self.manifest is not None:
+                self.manifest.forget(rel_path)
+                self.manifest.save()
+            return
+
+        # 临时文件与最终文件同名，耗时报告等按文件名生成的附属文件名称不变
+        temp_dir = os.path.join(self._output_dir(), WATCH_TEMP_DIRNAME, str(threading.get_ident()))
+        os.makedirs(temp_dir, exist_ok=True)
+        temp_file = os.path.join(temp_dir, os.path.basename(output_file))
+        source_hash = self.manifest.source_hash(path) if self.manifest is not None else None
+
+        start = time.perf_counter()
+        self.converter.convert_file(path, temp_file, self.keep_html)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            superseded = self._generations.get(path, 0) != generation or path in self._dirty
+        if superseded:
+            os.remove(temp_file)
+            self.cancelled += 1
+            self.logger.info(f"转换期间文件再次修改，丢弃本次结果: {rel_path}")
+            return
+
+        os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+        os.replace(temp_file, output_file)
+        self.converted += 1
+        if self.manifest is not None:
+            self.manifest.record(rel_path, source_hash, output_file)
+            self.manifest.save()
+        self.logger.info(f"已更新: {rel_path} -> {output_file}（{elapsed:.2f}秒）")
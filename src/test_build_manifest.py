@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+增量构建清单测试
+验证未变化的文件被跳过，源文件、引用图片和配置变化时重新转换，以及删除源文件后清理输出
+"""
+
+import os
+import sys
+import copy
+import logging
+
+import pytest
+
+# 添加当前目录到系统路径，以便导入当前目录的模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import Config
+from src.modules.build_manifest import BuildManifest
+from src.modules.converter import Converter
+
+@pytest.fixture
+def config():
+    config = copy.deepcopy(Config().config)
+    config['image_cache']['enabled'] = False
+    config['debug']['timing'] = False
+    config['document']['generate_toc'] = False
+    return config
+
+@pytest.fixture
+def tree(tmp_path):
+    """
+    创建两个文档，其中a.md引用一张图片
+    """
+    input_dir = tmp_path / 'docs'
+    output_dir = tmp_path / 'out'
+    input_dir.mkdir()
+    output_dir.mkdir()
+    (input_dir / 'a.md').write_text('# 甲\n\n![图](img.png)\n', encoding='utf-8')
+    (input_dir / 'b.md').write_text('# 乙\n', encoding='utf-8')
+    (input_dir / 'img.png').write_bytes(b'image v1')
+    return input_dir, output_dir
+
+def build(input_dir, output_dir, config, keep_html=False):
+    """
+    模拟一次增量构建：返回需要转换的文件，并记录全部文件后保存清单
+    """
+    manifest = BuildManifest(str(output_dir), config, keep_html).load()
+    pending = []
+    for name in ('a.md', 'b.md'):
+        output_file = output_dir / name.replace('.md', '.docx')
+        source_hash = manifest.source_hash(str(input_dir / name))
+        if not manifest.is_up_to_date(name, source_hash, str(output_file)):
+            pending.append(name)
+            output_file.write_bytes(b'docx')
+        manifest.record(name, source_hash, str(output_file))
+    manifest.save()
+    return pending
+
+def test_unchanged_tree_skips_everything(tree, config):
+    input_dir, output_dir = tree
+    assert build(input_dir, output_dir, config) == ['a.md', 'b.md']
+    assert build(input_dir, output_dir, config) == []
+
+def test_source_edit_invalidates_only_that_file(tree, config):
+    input_dir, output_dir = tree
+    build(input_dir, output_dir, config)
+    (input_dir / 'b.md').write_text('# 乙\n\n新段落\n', encoding='utf-8')
+    assert build(input_dir, output_dir, config) == ['b.md']
+
+def test_image_edit_invalidates_referencing_documents(tree, config):
+    input_dir, output_dir = tree
+    build(input_dir, output_dir, config)
+    (input_dir / 'img.png').write_bytes(b'image v2')
+    assert build(input_dir, output_dir, config) == ['a.md']
+
+def test_missing_output_is_rebuilt(tree, config):
+    input_dir, output_dir = tree
+    build(input_dir, output_dir, config)
+    (output_dir / 'a.docx').unlink()
+    assert build(input_dir, output_dir, config) == ['a.md']
+
+def test_config_change_invalidates_everything(tree, config):
+    input_dir, output_dir = tree
+    build(input_dir, output_dir, config)
+    # 调试和批量处理配置不影响输出
+    config['debug']['enabled'] = not config['debug'].get('enabled', False)
+    config['batch']['jobs'] = 3
+    assert build(input_dir, output_dir, config) == []
+    config['chinese']['convert_to_traditional'] = not config['chinese']['convert_to_traditional']
+    assert build(input_dir, output_dir, config) == ['a.md', 'b.md']
+
+def test_keep_html_invalidates_everything(tree, config):
+    input_dir, output_dir = tree
+    build(input_dir, output_dir, config)
+    assert build(input_dir, output_dir, config, keep_html=True) == ['a.md', 'b.md']
+    assert build(input_dir, output_dir, config, keep_html=True) == []
+
+def test_batch_convert_removes_outputs_of_removed_sources(tree, config):
+    input_dir, output_dir = tree
+    converter = Converter(config)
+    logging.disable(logging.CRITICAL)
+    try:
+        converter.batch_convert(str(input_dir), str(output_dir), jobs=1, incremental=True)
+        assert (output_dir / 'b.docx').is_file()
+        (input_dir / 'b.md').unlink()
+        results = converter.batch_convert(str(input_dir), str(output_dir), jobs=1, incremental=True)
+    finally:
+        logging.disable(logging.NOTSET)
+    assert list(results) == ['a.md']
+    assert (output_dir / 'a.docx').is_file()
+    assert not (output_dir / 'b.docx').exists()
+    assert set(BuildManifest(str(output_dir), config).load().entries) == {'a.md'}
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+简繁转换后端测试
+验证预编译词典后端与opencc-python-reimplemented的输出逐字节相同，以及预编译文件无效或缓存目录不可写时的处理
+"""
+
+import os
+import sys
+import glob
+import random
+import marshal
+import logging
+
+import pytest
+
+# 添加当前目录到系统路径，以便导入当前目录的模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip('opencc')
+
+from src.modules import chinese_converter
+from src.modules.chinese_converter import CompiledDictBackend, OpenCCBackend, COMPILED_FORMAT_VERSION
+
+MD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'md')
+
+# 与词典条目和分句符混合的ASCII片段
+ASCII_PIECES = ['a', 'Z9', ' ', '-', '.', ',', '?', '!', '*', 'http://x.y', '\t', '\n', 'Office', '2024']
+PUNCTUATION = ['，', '。', '、', '；', '：', '？', '！', '…', '“', '”', '「', '」', '（', '）', '《', '》', '　']
+
+@pytest.fixture(autouse=True)
+def fresh_tables(monkeypatch):
+    """
+    每个测试使用空的进程内词典缓存，保证从磁盘读取或重新编译
+    """
+    monkeypatch.setattr(chinese_converter, '_loaded_tables', {})
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+@pytest.fixture(scope='module')
+def opencc_backend():
+    return OpenCCBackend('s2t')
+
+def cache_files(cache_dir):
+    return glob.glob(os.path.join(str(cache_dir), 'opencc-s2t-*.marshal'))
+
+def random_texts(backend, count=300, seed=20240601):
+    """
+    由词典条目、词典条目的片段、单字、标点和ASCII随机拼接的文本
+    """
+    rng = random.Random(seed)
+    phrases = sorted(key for group in backend.chain for entries, _ in group
+                     for key, value in entries.items() if value is not None and len(key) > 1)
+    pieces_by_kind = [
+        lambda: rng.choice(phrases),
+        lambda: rng.choice(phrases)[:rng.randint(1, 2)],
+        lambda: chr(rng.randint(0x4e00, 0x9fa5)),
+        lambda: rng.choice(PUNCTUATION),
+        lambda: rng.choice(ASCII_PIECES),
+    ]
+    return [''.join(rng.choice(pieces_by_kind)() for _ in range(rng.randint(1, 40))) for _ in range(count)]
+
+def test_compiled_matches_opencc_on_documents(tmp_path, opencc_backend):
+    backend = CompiledDictBackend('s2t', str(tmp_path))
+    paths = sorted(glob.glob(os.path.join(MD_DIR, '*.md')))
+    assert paths
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        assert backend.convert(text) == opencc_backend.convert(text), path
+        for line in text.splitlines():
+            assert backend.convert(line) == opencc_backend.convert(line)
+
+def test_compiled_matches_opencc_on_random_text(tmp_path, opencc_backend):
+    backend = CompiledDictBackend('s2t', str(tmp_path))
+    for text in random_texts(backend):
+        assert backend.convert(text) == opencc_backend.convert(text), text
+
+def test_compiled_file_is_reused(tmp_path, opencc_backend, monkeypatch):
+    CompiledDictBackend('s2t', str(tmp_path))
+    assert len(cache_files(tmp_path)) == 1
+
+    # 新进程直接读取预编译文件，不再编译
+    monkeypatch.setattr(chinese_converter, '_loaded_tables', {})
+    monkeypatch.setattr(chinese_converter, '_compile_dictionary',
+                        lambda path: pytest.fail(f'不应重新编译: {path}'))
+    backend = CompiledDictBackend('s2t', str(tmp_path))
+    assert backend.convert('简体中文') == opencc_backend.convert('简体中文')
+
+@pytest.mark.parametrize('content', [
+    b'not a marshal file',
+    b'',
+    marshal.dumps({'version': COMPILED_FORMAT_VERSION, 'digest': 'stale', 'chain': [], 'ascii_passthrough': True}),
+    marshal.dumps({'version': COMPILED_FORMAT_VERSION - 1}),
+    marshal.dumps([1, 2, 3]),
+], ids=['garbage', 'empty', 'stale_digest', 'old_version', 'wrong_type'])
+def test_invalid_compiled_file_is_recompiled(tmp_path, opencc_backend, monkeypatch, content):
+    CompiledDictBackend('s2t', str(tmp_path))
+    (cache_file,) = cache_files(tmp_path)
+    with open(cache_file, 'wb') as f:
+        f.write(content)
+
+    monkeypatch.setattr(chinese_converter, '_loaded_tables', {})
+    backend = CompiledDictBackend('s2t', str(tmp_path))
+    text = '这里的头发和发展都很重要，干燥的干部'
+    assert backend.convert(text) == opencc_backend.convert(text)
+
+    # 重新编译的结果写回缓存文件
+    with open(cache_file, 'rb') as f:
+        data = marshal.loads(f.read())
+    assert data['version'] == COMPILED_FORMAT_VERSION
+    assert data['chain']
+
+def test_unwritable_cache_dir_still_converts(tmp_path, opencc_backend):
+    # 缓存目录的上级是普通文件，无法创建目录（以root运行时也不可写）
+    blocker = tmp_path / 'blocker'
+    blocker.write_text('', encoding='utf-8')
+    cache_dir = blocker / 'cache'
+    backend = CompiledDictBackend('s2t', str(cache_dir))
+    text = '简体中文转换为繁体中文'
+    assert backend.convert(text) == opencc_backend.convert(text)
+    assert not cache_dir.exists()
+    assert os.listdir(tmp_path) == ['blocker']
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Word文档保存测试
+验证各压缩级别的输出与document.save()内容一致，以及保存到文件描述符、标准输出和原子写入失败时的清理
+"""
+
+import io
+import os
+import sys
+import stat
+import zipfile
+
+import pytest
+
+# 添加当前目录到系统路径，以便导入当前目录的模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+
+from src.modules.html_to_word import docx_writer
+from src.modules.html_to_word.docx_writer import document_to_bytes, save_document
+
+def create_document():
+    document = Document()
+    document.add_heading('标题', level=1)
+    for i in range(50):
+        document.add_paragraph(f'第{i}段，重复的正文内容便于压缩。' * 5)
+    return document
+
+def members(data):
+    """
+    读取zip中各成员的名称、压缩方式和内容
+    """
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        return [(info.filename, info.compress_type, zf.read(info)) for info in zf.infolist()]
+
+def paragraphs(data):
+    return [p.text for p in Document(io.BytesIO(data)).paragraphs]
+
+@pytest.mark.parametrize('compression, compress_type', [
+    ('stored', zipfile.ZIP_STORED),
+    ('fast', zipfile.ZIP_DEFLATED),
+    ('max', zipfile.ZIP_DEFLATED),
+])
+def test_compression_matches_document_save(compression, compress_type):
+    document = create_document()
+    reference = io.BytesIO()
+    document.save(reference)
+    expected = members(reference.getvalue())
+
+    data = document_to_bytes(document, compression)
+    actual = members(data)
+    # 部件顺序和内容与document.save()相同，只有压缩方式不同
+    assert [(name, blob) for name, _, blob in actual] == [(name, blob) for name, _, blob in expected]
+    assert {compress for _, compress, _ in actual} == {compress_type}
+    assert paragraphs(data) == paragraphs(reference.getvalue())
+
+def test_compression_levels_order_sizes():
+    document = create_document()
+    sizes = {name: len(document_to_bytes(document, name)) for name in ('stored', 'fast', 'default', 'max')}
+    assert sizes['stored'] > sizes['fast'] >= sizes['max']
+    assert sizes['default'] >= sizes['max']
+
+def test_unknown_compression_falls_back_to_default():
+    document = create_document()
+    assert members(document_to_bytes(document, 'bogus')) == members(document_to_bytes(document, 'default'))
+
+def test_save_to_file_descriptor(tmp_path):
+    path = tmp_path / 'fd.docx'
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | getattr(os, 'O_BINARY', 0))
+    try:
+        save_document(create_document(), fd, 'fast')
+    finally:
+        os.close(fd)
+    assert paragraphs(path.read_bytes())[0] == '标题'
+
+def test_save_to_stdout(monkeypatch):
+    buffer = io.BytesIO()
+    monkeypatch.setattr(sys, 'stdout', io.TextIOWrapper(buffer))
+    save_document(create_document(), docx_writer.STDOUT, 'stored')
+    assert paragraphs(buffer.getvalue())[0] == '标题'
+
+def test_atomic_failure_leaves_target_untouched(tmp_path, monkeypatch):
+    target = tmp_path / 'out.docx'
+    target.write_bytes(b'previous')
+
+    def fail(document, stream, compression):
+        stream.write(b'partial')
+        raise OSError('disk full')
+
+    monkeypatch.setattr(docx_writer, 'write_package', fail)
+    with pytest.raises(OSError):
+        save_document(create_document(), str(target))
+    assert target.read_bytes() == b'previous'
+    assert os.listdir(tmp_path) == ['out.docx']
+
+@pytest.mark.skipif(os.name != 'posix', reason='文件权限只在POSIX上检查')
+def test_atomic_file_mode(tmp_path):
+    # 新文件的权限与open()新建的文件相同
+    reference = tmp_path / 'reference'
+    reference.write_bytes(b'')
+    target = tmp_path / 'new.docx'
+    save_document(create_document(), str(target))
+    assert stat.S_IMODE(target.stat().st_mode) == stat.S_IMODE(reference.stat().st_mode)
+
+    # 覆盖已有文件时保留其权限
+    os.chmod(target, 0o640)
+    save_document(create_document(), str(target))
+    assert stat.S_IMODE(target.stat().st_mode) == 0o640
+    assert paragraphs(target.read_bytes())[0] == '标题'
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__, '-q']))
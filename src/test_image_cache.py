@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+图片缓存测试
+使用本地HTTP服务验证缓存命中、ETag重新验证、按大小淘汰以及写入失败时不留下临时文件
+"""
+
+import os
+import sys
+import time
+import hashlib
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+# 添加当前目录到系统路径，以便导入当前目录的模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules.image_cache import ImageCache, prefetch_images
+
+pytest.importorskip('requests')
+
+class _ImageHandler(BaseHTTPRequestHandler):
+    """按ETag返回内存中图片的处理器，记录每个请求的路径和状态码"""
+
+    def do_GET(self):
+        # 在发送应答前记录请求，客户端收到应答时记录已经完成
+        server = self.server
+        if self.path == '/broken.png':
+            server.requests.append((self.path, 200))
+            # 声明的长度大于实际发送的内容，客户端读取时出错
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/png')
+            self.send_header('Content-Length', '100000')
+            self.end_headers()
+            self.wfile.write(b'x' * 1000)
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        body = server.files.get(self.path)
+        if body is None:
+            server.requests.append((self.path, 404))
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        else:
+            etag = '"%s"' % hashlib.sha256(body).hexdigest()[:16]
+            status = 304 if self.headers.get('If-None-Match') == etag else 200
+            server.requests.append((self.path, status))
+            self.send_response(status)
+            self.send_header('ETag', etag)
+            if status == 200:
+                self.send_header('Content-Type', 'image/png')
+                self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if status == 200:
+                self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def image_server():
+    """
+    在后台线程中运行的图片服务，端口随机分配
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _ImageHandler)
+    server.files = {}
+    server.requests = []
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+def test_cache_hit_does_not_contact_server(tmp_path, image_server):
+    image_server.files['/a.png'] = b'image a'
+    cache = ImageCache(str(tmp_path), revalidate_after=3600)
+    first = cache.fetch(image_server.url + '/a.png')
+    second = cache.fetch(image_server.url + '/a.png')
+    assert first == second
+    assert first.endswith('.png')
+    assert read(first) == b'image a'
+    assert image_server.requests == [('/a.png', 200)]
+
+    # 新的缓存实例（如另一个进程）使用同一个缓存目录
+    assert ImageCache(str(tmp_path)).fetch(image_server.url + '/a.png') == first
+    assert len(image_server.requests) == 1
+
+def test_expired_entry_is_revalidated_with_etag(tmp_path, image_server):
+    image_server.files['/a.png'] = b'image a'
+    cache = ImageCache(str(tmp_path), revalidate_after=0)
+    first = cache.fetch(image_server.url + '/a.png')
+    assert cache.fetch(image_server.url + '/a.png') == first
+    assert image_server.requests == [('/a.png', 200), ('/a.png', 304)]
+
+    # 服务器上的图片变化后下载新内容
+    image_server.files['/a.png'] = b'image a v2'
+    updated = cache.fetch(image_server.url + '/a.png')
+    assert updated != first
+    assert read(updated) == b'image a v2'
+    assert image_server.requests[-1] == ('/a.png', 200)
+
+def test_evict_removes_least_recently_used_entries(tmp_path, image_server):
+    for name in ('a', 'b', 'c'):
+        image_server.files[f'/{name}.png'] = name.encode('ascii') * 2048
+    image_server.files['/a-copy.png'] = b'a' * 2048
+    cache = ImageCache(str(tmp_path), max_size_mb=5 * 1024 / (1024 * 1024))
+
+    a = cache.fetch(image_server.url + '/a.png')
+    # 相同内容的不同地址共享同一个图片文件
+    assert cache.fetch(image_server.url + '/a-copy.png') == a
+    b = cache.fetch(image_server.url + '/b.png')
+    # 让a的两个条目成为最久未使用的条目
+    past = time.time() - 60
+    for name in os.listdir(cache.entries_dir):
+        entry = cache._read_entry(os.path.join(cache.entries_dir, name))
+        if entry['digest'] in a:
+            os.utime(os.path.join(cache.entries_dir, name), (past, past))
+
+    c = cache.fetch(image_server.url + '/c.png')
+    assert not os.path.exists(a)
+    assert os.path.isfile(b)
+    assert os.path.isfile(c)
+    assert len(os.listdir(cache.entries_dir)) == 2
+
+def test_store_below_limit_does_not_scan_entries(tmp_path, image_server, monkeypatch):
+    for i in range(20):
+        image_server.files[f'/{i}.png'] = b'%d' % i * 100
+    cache = ImageCache(str(tmp_path), max_size_mb=1)
+    reads = []
+    read_entry = cache._read_entry
+    monkeypatch.setattr(cache, '_read_entry', lambda path: reads.append(path) or read_entry(path))
+    for i in range(20):
+        assert cache.fetch(f'{image_server.url}/{i}.png')
+    # 每次下载只读取自己的条目，不扫描整个缓存
+    assert len(reads) == 20
+
+def test_prefetched_images_are_pinned_until_unpinned(tmp_path, image_server):
+    for name in ('a', 'b', 'c', 'd'):
+        image_server.files[f'/{name}.png'] = name.encode('ascii') * 2048
+    cache = ImageCache(str(tmp_path), max_size_mb=5 * 1024 / (1024 * 1024))
+    resolved = prefetch_images(cache, [image_server.url + '/a.png', image_server.url + '/b.png'], max_workers=1)
+    a, b = resolved.values()
+
+    # 超过上限，但预取的图片在写入文档前不会被淘汰
+    c = cache.fetch(image_server.url + '/c.png')
+    assert os.path.isfile(a) and os.path.isfile(b) and os.path.isfile(c)
+
+    cache.unpin(resolved.values())
+    cache.fetch(image_server.url + '/d.png')
+    assert not os.path.exists(a)
+    assert not os.path.exists(b)
+
+def test_store_failure_leaves_no_partial_files(tmp_path, image_server):
+    cache = ImageCache(str(tmp_path))
+    assert cache.fetch(image_server.url + '/broken.png') is None
+    assert os.listdir(cache.objects_dir) == []
+    assert not os.path.isdir(cache.entries_dir) or os.listdir(cache.entries_dir) == []
+
+def test_store_failure_keeps_previous_entry(tmp_path, image_server, monkeypatch):
+    image_server.files['/a.png'] = b'image a'
+    cache = ImageCache(str(tmp_path), revalidate_after=0)
+    first = cache.fetch(image_server.url + '/a.png')
+    image_server.files['/a.png'] = b'image a v2'
+
+    def fail(*args, **kwargs):
+        raise OSError('disk full')
+
+    # 写入图片时出错：不留下临时文件，继续使用已缓存的图片
+    monkeypatch.setattr('src.modules.image_cache.os.replace', fail)
+    assert cache.fetch(image_server.url + '/a.png') == first
+    assert sorted(os.listdir(cache.objects_dir)) == [os.path.basename(first)]
+    assert read(first) == b'image a'
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__, '-q']))
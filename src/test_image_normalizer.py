@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+图片规范化测试
+验证按EXIF方向旋转后再计算宽度，以及无需缩小的图片也会去除元数据
+"""
+
+import os
+import sys
+
+import pytest
+
+# 添加当前目录到系统路径，以便导入当前目录的模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules.image_normalizer import ImageNormalizer
+
+Image = pytest.importorskip('PIL.Image')
+
+# 150 DPI下2.54厘米对应150像素
+WIDTH_CM = 2.54
+
+def create_normalizer(tmp_path):
+    """
+    创建使用临时缓存目录的规范化器
+    """
+    return ImageNormalizer({'image_normalize': {'enabled': True, 'dpi': 150, 'cache_dir': str(tmp_path / 'cache')}})
+
+def save_jpeg(path, size, orientation=None, comment=None):
+    """
+    保存带有可选EXIF方向和注释的JPEG
+    """
+    image = Image.new('RGB', size, (200, 30, 30))
+    params = {}
+    if orientation is not None:
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        params['exif'] = exif.tobytes()
+    if comment is not None:
+        params['comment'] = comment
+    image.save(path, format='JPEG', **params)
+    return str(path)
+
+def test_rotated_jpeg_uses_display_width(tmp_path):
+    """
+    测试方向为6的照片先旋转，宽度按旋转后的尺寸缩小
+    """
+    # 原始300x100，旋转后100x300，显示宽度100不超过150，不需要缩小
+    source = save_jpeg(tmp_path / 'rotated.jpg', (300, 100), orientation=6)
+    output = create_normalizer(tmp_path).normalize(source, WIDTH_CM)
+    assert output != source
+    with Image.open(output) as image:
+        assert image.size == (100, 300)
+        assert 'exif' not in image.info
+
+def test_rotated_jpeg_is_downscaled_after_rotation(tmp_path):
+    """
+    测试旋转后宽度超过目标宽度的照片被缩小
+    """
+    source = save_jpeg(tmp_path / 'large.jpg', (900, 300), orientation=6)
+    output = create_normalizer(tmp_path).normalize(source, WIDTH_CM)
+    with Image.open(output) as image:
+        assert image.size == (150, 450)
+
+def test_small_image_metadata_is_stripped(tmp_path):
+    """
+    测试无需缩小但带有元数据的图片重新编码并去除元数据
+    """
+    source = save_jpeg(tmp_path / 'small.jpg', (50, 50), orientation=1, comment=b'secret')
+    output = create_normalizer(tmp_path).normalize(source, WIDTH_CM)
+    assert output != source
+    with Image.open(output) as image:
+        assert image.size == (50, 50)
+        assert 'exif' not in image.info
+        assert 'comment' not in image.info
+
+def test_small_image_without_metadata_is_unchanged(tmp_path):
+    """
+    测试无需缩小且没有元数据的图片直接使用原始文件
+    """
+    source = save_jpeg(tmp_path / 'plain.jpg', (50, 50))
+    assert create_normalizer(tmp_path).normalize(source, WIDTH_CM) == source
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__, '-q']))
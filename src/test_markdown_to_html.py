@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Markdown实例选择测试
+验证按内容选择的Markdown实例（没有代码块时不加载代码块扩展）与始终启用代码块扩展的实例输出完全相同
+"""
+
+import os
+import sys
+import copy
+import glob
+import logging
+
+import pytest
+
+# 添加当前目录到系统路径，以便导入当前目录的模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import Config
+from src.modules.markdown_to_html import MarkdownToHtml, _CODE_BLOCK_LINE_RE
+
+MD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'md')
+
+# 各种形式的缩进代码块
+INDENTED_CODE = {
+    'list_item': '- 列表项\n\n        code = 1\n',
+    'five_spaces': '段落\n\n     code = 1\n',
+    'spaces_then_tab': '段落\n\n  \tcode = 1\n',
+    'blockquote': '> 引用\n>\n>     code = 1\n',
+    'tab': '段落\n\n\tcode = 1\n',
+}
+
+@pytest.fixture(scope='module')
+def md_to_html():
+    logging.disable(logging.CRITICAL)
+    try:
+        yield MarkdownToHtml(copy.deepcopy(Config().config))
+    finally:
+        logging.disable(logging.NOTSET)
+
+def selected_and_always_on(md_to_html, text):
+    """
+    分别使用按内容选择的实例和始终启用代码块扩展的实例转换
+    """
+    selected = md_to_html._get_markdown(_CODE_BLOCK_LINE_RE.search(text) is not None)
+    return selected.reset().convert(text), md_to_html._get_markdown(True).reset().convert(text)
+
+@pytest.mark.parametrize('name', sorted(INDENTED_CODE))
+def test_indented_code_uses_code_extensions(md_to_html, name):
+    text = INDENTED_CODE[name]
+    assert _CODE_BLOCK_LINE_RE.search(text)
+    selected, always_on = selected_and_always_on(md_to_html, text)
+    assert selected == always_on
+    assert 'codehilite' in selected
+
+@pytest.mark.parametrize('path', sorted(glob.glob(os.path.join(MD_DIR, '*.md'))), ids=os.path.basename)
+def test_documents_match_always_on_instance(md_to_html, path):
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    selected, always_on = selected_and_always_on(md_to_html, text)
+    assert selected == always_on
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__, '-q']))
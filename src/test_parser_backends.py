@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+HTML解析器差异测试
+在基准测试语料上分别使用lxml和html.parser转换，验证生成的Word文档完全相同
+"""
+
+import os
+import sys
+import copy
+import logging
+import zipfile
+
+import pytest
+
+# 添加当前目录到系统路径，以便导入当前目录的模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate_corpus
+from src.config import Config
+from src.modules.converter import Converter
+
+pytest.importorskip('lxml')
+
+# 每次保存都会变化的部分（创建和修改时间）
+VOLATILE_PARTS = ('docProps/core.xml',)
+
+def read_docx_parts(path):
+    """
+    读取Word文档中除时间戳以外的所有部件
+    """
+    with zipfile.ZipFile(path) as archive:
+        return {name: archive.read(name) for name in archive.namelist() if name not in VOLATILE_PARTS}
+
+def create_converter(parser):
+    """
+    创建使用指定HTML解析器的转换器
+    """
+    config = copy.deepcopy(Config().config)
+    config['html'] = {'parser': parser}
+    config['image_cache']['enabled'] = False
+    config['debug']['timing'] = False
+    converter = Converter(config)
+    assert converter.md_to_html.html_parser == parser
+    assert converter.html_to_word.html_parser == parser
+    return converter
+
+def test_parsers_produce_identical_docx(tmp_path):
+    """
+    测试lxml和html.parser在全部语料上生成相同的Word文档
+    """
+    logging.disable(logging.CRITICAL)
+    try:
+        corpus = generate_corpus(str(tmp_path / 'corpus'), seed=1, scale=0.1)
+        converters = {parser: create_converter(parser) for parser in ('lxml', 'html.parser')}
+        for profile, info in corpus['documents'].items():
+            parts = {}
+            for parser, converter in converters.items():
+                output_file = str(tmp_path / f"{profile}.{parser}.docx")
+                converter.convert_file(info['path'], output_file, False)
+                parts[parser] = read_docx_parts(output_file)
+            assert sorted(parts['lxml']) == sorted(parts['html.parser']), profile
+            for name, content in parts['html.parser'].items():
+                assert parts['lxml'][name] == content, f"{profile}: {name} 不同"
+    finally:
+        logging.disable(logging.NOTSET)
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,253 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+转换服务测试
+直接调用ConversionServer.handle_line，通过内存中的应答通道检查JSON-RPC应答
+"""
+
+import io
+import os
+import sys
+import copy
+import json
+import base64
+import socket
+import logging
+import threading
+
+import pytest
+
+# 添加当前目录到系统路径，以便导入当前目录的模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+
+from src.config import Config
+from src.modules.server import (ConversionServer, PARSE_ERROR, INVALID_REQUEST, METHOD_NOT_FOUND,
+                                INVALID_PARAMS, SERVER_BUSY, SHUTTING_DOWN)
+
+class MemoryChannel:
+    """
+    记录所有应答和通知的内存通道
+    """
+
+    def __init__(self):
+        self.messages = []
+        self._lock = threading.Lock()
+
+    def send(self, message):
+        with self._lock:
+            self.messages.append(json.loads(json.dumps(message, ensure_ascii=False, default=str)))
+
+    def response(self, request_id):
+        """
+        获取指定请求的应答（不含通知）
+        """
+        with self._lock:
+            matches = [m for m in self.messages if 'method' not in m and m.get('id') == request_id]
+        assert len(matches) == 1, self.messages
+        return matches[0]
+
+def request(request_id, method, **params):
+    """
+    构造一行JSON-RPC请求
+    """
+    message = {'jsonrpc': '2.0', 'id': request_id, 'method': method}
+    if params:
+        message['params'] = params
+    return json.dumps(message, ensure_ascii=False)
+
+def create_server(max_concurrency=2, max_pending=4):
+    """
+    创建不使用图片缓存和耗时统计的服务
+    """
+    config = copy.deepcopy(Config().config)
+    config['image_cache']['enabled'] = False
+    config['debug']['timing'] = False
+    config['document']['generate_toc'] = False
+    return ConversionServer(config, max_concurrency, max_pending)
+
+@pytest.fixture(autouse=True)
+def quiet_logging():
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+@pytest.fixture
+def blocking_convert(monkeypatch):
+    """
+    将转换替换为等待事件后返回，用于控制请求的执行时机
+    """
+    started = threading.Semaphore(0)
+    release = threading.Event()
+
+    def convert(self, params, notify):
+        notify('started')
+        started.release()
+        assert release.wait(10)
+        return {'elapsed': 0.0}
+
+    monkeypatch.setattr(ConversionServer, '_convert', convert)
+    return started, release
+
+def test_ping_and_stats():
+    server = create_server()
+    channel = MemoryChannel()
+    server.handle_line(request(1, 'ping'), channel)
+    server.handle_line(request(2, 'stats'), channel)
+    server.close()
+
+    assert channel.response(1)['result'] == {'pong': True}
+    stats = channel.response(2)['result']
+    assert stats['completed'] == 0
+    assert stats['max_concurrency'] == 2
+    assert stats['converters']['created'] == 0
+
+def test_protocol_errors():
+    server = create_server()
+    channel = MemoryChannel()
+    server.handle_line('not json', channel)
+    server.handle_line('[1, 2]', channel)
+    server.handle_line(json.dumps({'jsonrpc': '2.0', 'id': 3}), channel)
+    server.handle_line(request(4, 'unknown'), channel)
+    server.handle_line(request(5, 'convert', input='a.md', markdown='# a'), channel)
+    server.handle_line(json.dumps({'jsonrpc': '2.0', 'id': 6, 'method': 'convert', 'params': [1]}), channel)
+    server.close()
+
+    errors = [m['error']['code'] for m in channel.messages if m.get('id') is None and 'error' in m]
+    assert errors == [PARSE_ERROR, INVALID_REQUEST]
+    assert channel.response(3)['error']['code'] == INVALID_REQUEST
+    assert channel.response(4)['error']['code'] == METHOD_NOT_FOUND
+    assert channel.response(5)['error']['code'] == INVALID_PARAMS
+    assert channel.response(6)['error']['code'] == INVALID_PARAMS
+
+def test_convert_input_markdown_and_inline(tmp_path):
+    source = tmp_path / 'doc.md'
+    source.write_text('# 标题\n\n正文\n', encoding='utf-8')
+    server = create_server()
+    channel = MemoryChannel()
+    server.handle_line(request(1, 'convert', input='doc.md', cwd=str(tmp_path)), channel)
+    server.handle_line(request(2, 'convert', markdown='# 文本'), channel)
+    server.handle_line(request(3, 'convert', markdown='# 内存', inline=True), channel)
+    server.handle_line(request(4, 'convert', input='doc.md', cwd=str(tmp_path), inline=True, output='x.docx'), channel)
+    server.close()
+
+    output = channel.response(1)['result']['output']
+    assert output == str(tmp_path / 'doc.docx')
+    assert [p.text for p in Document(output).paragraphs if p.text] == ['標題', '正文']
+
+    assert '文本' in channel.response(2)['result']['html']
+
+    data = base64.b64decode(channel.response(3)['result']['docx'])
+    assert '內存' in [p.text for p in Document(io.BytesIO(data)).paragraphs]
+
+    assert channel.response(4)['error']['code'] == INVALID_PARAMS
+
+    # 进度通知
+    states = [m['params']['state'] for m in channel.messages
+              if m.get('method') == 'progress' and m['params']['id'] == 1]
+    assert states == ['queued', 'started', 'finished']
+    assert server.stats()['completed'] == 3
+
+def test_server_busy(blocking_convert):
+    started, release = blocking_convert
+    server = create_server(max_concurrency=1, max_pending=1)
+    channel = MemoryChannel()
+    server.handle_line(request(1, 'convert', markdown='a'), channel)
+    assert started.acquire(timeout=10)
+    # 一个在执行，一个排队，第三个超出上限
+    server.handle_line(request(2, 'convert', markdown='b'), channel)
+    server.handle_line(request(3, 'convert', markdown='c'), channel)
+    assert channel.response(3)['error']['code'] == SERVER_BUSY
+    release.set()
+    server.close()
+
+    assert 'result' in channel.response(1)
+    assert 'result' in channel.response(2)
+    assert server.stats()['rejected'] == 1
+
+def test_shutdown_drains_in_flight_work(blocking_convert):
+    started, release = blocking_convert
+    server = create_server()
+    channel = MemoryChannel()
+    server.handle_line(request(1, 'convert', markdown='a'), channel)
+    assert started.acquire(timeout=10)
+    server.handle_line(request(2, 'shutdown'), channel)
+    server.handle_line(request(3, 'convert', markdown='b'), channel)
+    assert channel.response(2)['result'] == {'shutting_down': True}
+    assert channel.response(3)['error']['code'] == SHUTTING_DOWN
+
+    closer = threading.Thread(target=server.close)
+    closer.start()
+    closer.join(0.2)
+    # 进行中的请求完成前close不会返回
+    assert closer.is_alive()
+    release.set()
+    closer.join(10)
+    assert not closer.is_alive()
+    assert channel.response(1)['result'] == {'elapsed': 0.0}
+
+unix_socket = pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason='当前平台不支持Unix套接字')
+
+def serve_in_thread(server, path):
+    """
+    在后台线程中通过Unix套接字提供服务，等待服务开始监听
+    """
+    thread = threading.Thread(target=server.serve_unix, args=(path,), daemon=True)
+    thread.start()
+    for _ in range(200):
+        if not thread.is_alive():
+            break
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(path)
+                break
+            except OSError:
+                pass
+        threading.Event().wait(0.05)
+    return thread
+
+def shutdown_over_socket(path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(path)
+        client.sendall((request(1, 'shutdown') + '\n').encode('utf-8'))
+        reply = client.makefile('r', encoding='utf-8').readline()
+    assert json.loads(reply)['result'] == {'shutting_down': True}
+
+@unix_socket
+def test_serve_unix_refuses_to_remove_regular_file(tmp_path):
+    path = tmp_path / 's'
+    path.write_text('用户文件', encoding='utf-8')
+    server = create_server()
+    with pytest.raises(FileExistsError):
+        server.serve_unix(str(path))
+    server.close()
+    assert path.read_text(encoding='utf-8') == '用户文件'
+
+@unix_socket
+def test_serve_unix_replaces_stale_socket_and_refuses_live_one(tmp_path):
+    path = str(tmp_path / 's')
+    # 遗留的套接字文件：已绑定但没有进程监听
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()
+
+    server = create_server()
+    thread = serve_in_thread(server, path)
+    assert thread.is_alive()
+
+    # 已有服务在监听时拒绝启动，也不删除正在使用的套接字
+    other = create_server()
+    with pytest.raises(OSError, match='已有转换服务'):
+        other.serve_unix(path)
+    other.close()
+    assert os.path.exists(path)
+
+    shutdown_over_socket(path)
+    thread.join(10)
+    assert not thread.is_alive()
+    assert not os.path.exists(path)
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Word模板与样式模式测试
+将样式模式生成的文档修改命名样式后作为模板，再次转换时应沿用模板中的样式而不是重复定义
+"""
+
+import os
+import sys
+import copy
+import logging
+
+import pytest
+
+# 添加当前目录到系统路径，以便导入当前目录的模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from docx.shared import Pt
+
+from src.config import Config
+from src.modules.converter import Converter
+from src.modules.html_to_word.template_cache import clear_template_cache
+
+MARKDOWN = "# 标题\n\n第一段正文，包含`代码`和[链接](https://example.com)。\n\n- 列表项\n\n> 引用\n"
+
+def create_converter(template=''):
+    """
+    创建样式模式的转换器
+    """
+    config = copy.deepcopy(Config().config)
+    config['document']['style_mode'] = 'styles'
+    config['document']['template'] = template
+    config['image_cache']['enabled'] = False
+    config['debug']['timing'] = False
+    return Converter(config)
+
+@pytest.fixture(autouse=True)
+def quiet_logging():
+    logging.disable(logging.CRITICAL)
+    clear_template_cache()
+    yield
+    clear_template_cache()
+    logging.disable(logging.NOTSET)
+
+def test_styles_mode_round_trip_through_template(tmp_path):
+    """
+    测试模板中已有的命名样式被沿用，并保留模板中的格式
+    """
+    first = str(tmp_path / 'first.docx')
+    create_converter().convert_text(MARKDOWN, first)
+
+    # 在模板中自定义MD Body样式
+    template = str(tmp_path / 'template.docx')
+    document = Document(first)
+    document.styles['MD Body'].paragraph_format.space_after = Pt(42)
+    document.save(template)
+
+    second = str(tmp_path / 'second.docx')
+    create_converter(template).convert_text(MARKDOWN, second)
+
+    result = Document(second)
+    names = [style.name for style in result.styles]
+    for name in ('MD Body', 'MD List', 'MD Quote', 'MD Text', 'MD Code', 'MD Link'):
+        assert names.count(name) == 1, name
+    body = result.styles['MD Body']
+    assert body.paragraph_format.space_after == Pt(42)
+
+    # 模板的正文内容被清空，正文段落引用模板中的MD Body
+    body_paragraphs = [p for p in result.paragraphs if '第一段正文' in p.text]
+    assert len(body_paragraphs) == 1
+    assert body_paragraphs[0].style.style_id == body.style_id
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+耗时统计测试
+验证嵌套处理器只记录自身耗时，以及经由处理器工厂分发的嵌套元素也按处理器类计数
+"""
+
+import os
+import sys
+import copy
+import time
+import logging
+
+import pytest
+
+# 添加当前目录到系统路径，以便导入当前目录的模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import Config
+from src.modules import timing
+from src.modules.converter import Converter
+
+MARKDOWN = """# 标题
+
+第一段**粗体**文本。
+
+第二段文本。
+
+- 列表项一
+- 列表项二
+
+> 引用
+>
+> | a | b |
+> |---|---|
+> | 1 | 2 |
+"""
+
+def test_nested_processor_self_time():
+    """
+    测试外层处理器的耗时扣除嵌套处理器的耗时
+    """
+    report = timing.TimingReport('nested')
+    with timing.activate(report):
+        with timing.processor('Outer'):
+            time.sleep(0.02)
+            with timing.processor('Inner'):
+                time.sleep(0.05)
+    outer = report.processors['Outer']
+    inner = report.processors['Inner']
+    assert inner['wall'] >= 0.05
+    assert 0.02 <= outer['wall'] < inner['wall']
+    assert outer['wall'] + inner['wall'] <= report.wall
+
+def test_nested_elements_are_counted_per_processor(tmp_path):
+    """
+    测试段落和列表项中的内联内容、引用块中的表格都按各自的处理器记录
+    """
+    config = copy.deepcopy(Config().config)
+    config['image_cache']['enabled'] = False
+    config['debug']['timing'] = True
+    config['document']['generate_toc'] = False
+    logging.disable(logging.CRITICAL)
+    try:
+        converter = Converter(config)
+        source = tmp_path / 'doc.md'
+        source.write_text(MARKDOWN, encoding='utf-8')
+        converter.convert_file(str(source), str(tmp_path / 'doc.docx'))
+    finally:
+        logging.disable(logging.NOTSET)
+
+    report = converter.last_timing_report
+    processors = report['processors']
+    # 两个段落、两个列表项和标题的内联内容
+    assert processors['InlineProcessor']['count'] >= 5
+    # 引用块由段落处理器处理，其中的表格经由处理器工厂交给表格处理器
+    assert processors['TableProcessor']['count'] == 1
+    assert sum(entry['wall'] for entry in processors.values()) <= report['wall']
+
+def test_token_cache_stats_are_reported(tmp_path):
+    """
+    测试按词法单元渲染代码块时报告词法单元缓存的命中情况
+    """
+    pytest.importorskip('pygments')
+    config = copy.deepcopy(Config().config)
+    config['image_cache']['enabled'] = False
+    config['debug']['timing'] = True
+    config['document']['generate_toc'] = False
+    config['code_blocks']['rendering'] = 'tokens'
+    source = tmp_path / 'code.md'
+    source.write_text('```python\nprint(1)\n```\n\n```python\nprint(1)\n```\n', encoding='utf-8')
+    logging.disable(logging.CRITICAL)
+    try:
+        converter = Converter(config)
+        converter.convert_file(str(source), str(tmp_path / 'code.docx'))
+    finally:
+        logging.disable(logging.NOTSET)
+
+    cache = converter.last_timing_report['extra']['token_cache']
+    # 两个相同的代码块，第二个命中缓存
+    assert cache['hits'] >= 1
+    assert 0.0 < cache['hit_rate'] <= 1.0
+    assert 'opencc_cache' in converter.last_timing_report['extra']
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+文档树遍历测试
+验证批量替换节点后文档顺序链接（next_element、previous_element）和兄弟链接与子节点列表一致，
+结果与逐个调用replace_with相同
+"""
+
+import os
+import sys
+
+import pytest
+
+# 添加当前目录到系统路径，以便导入当前目录的模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup, NavigableString, Tag
+
+from src.modules.tree_walker import TreeVisitor, walk_tree, replace_nodes
+
+HTML = ('<body><p>甲<b>乙<i>丙</i>丁</b>戊</p><ul><li>一</li><li>二<ul><li>三</li></ul></li></ul>'
+        '<p><span>深<span>层<span>嵌套</span>结束</span></span>尾</p><p>只有文本</p></body>')
+
+class _TextCollector(TreeVisitor):
+    """收集所有文本节点，替换为加上前缀的文本"""
+
+    def __init__(self):
+        self.replacements = []
+
+    def enter(self, node):
+        if isinstance(node, NavigableString):
+            self.replacements.append((node, f"[{node}]"))
+        return True
+
+def document_order(root):
+    """
+    按子节点列表计算的文档顺序，不依赖next_element链接
+    """
+    order = [root]
+    stack = [iter(root.contents)]
+    while stack:
+        node = next(stack[-1], None)
+        if node is None:
+            stack.pop()
+            continue
+        order.append(node)
+        if isinstance(node, Tag):
+            stack.append(iter(node.contents))
+    return order
+
+def assert_links_consistent(soup):
+    """
+    检查文档顺序链接、兄弟链接和父节点与子节点列表一致
+    """
+    # BeautifulSoup对象本身不在next_element链接中
+    order = document_order(soup)[1:]
+    for previous, node in zip(order, order[1:]):
+        assert previous.next_element is node
+        assert node.previous_element is previous
+    assert order[-1].next_element is None
+    for node in [soup] + order:
+        if not isinstance(node, Tag):
+            continue
+        children = node.contents
+        for i, child in enumerate(children):
+            assert child.parent is node
+            assert child.previous_sibling is (children[i - 1] if i > 0 else None)
+            assert child.next_sibling is (children[i + 1] if i + 1 < len(children) else None)
+    # 沿next_element链接遍历得到相同的节点序列
+    assert list(soup.descendants) == order
+
+@pytest.mark.parametrize('parser', ['html.parser', 'lxml'])
+def test_replace_strings_keeps_links(parser):
+    if parser == 'lxml':
+        pytest.importorskip('lxml')
+    soup = BeautifulSoup(HTML, parser)
+    expected = BeautifulSoup(HTML, parser)
+
+    visitor = _TextCollector()
+    walk_tree(soup, visitor)
+    replace_nodes(visitor.replacements)
+
+    visitor = _TextCollector()
+    walk_tree(expected, visitor)
+    for node, text in visitor.replacements:
+        node.replace_with(text)
+
+    assert str(soup) == str(expected)
+    assert '[甲]' in soup.get_text() and '[嵌套]' in soup.get_text()
+    assert_links_consistent(soup)
+
+def test_replace_tags_and_wide_parent():
+    soup = BeautifulSoup('<p>' + 'a<b>b</b>' * 200 + '</p>', 'html.parser')
+    p = soup.p
+    replacements = []
+    for child in list(p.contents):
+        if isinstance(child, NavigableString):
+            replacements.append((child, child.upper()))
+        else:
+            em = soup.new_tag('em')
+            em.string = 'x'
+            replacements.append((child, em))
+    replace_nodes(replacements)
+
+    assert str(p) == '<p>' + 'A<em>x</em>' * 200 + '</p>'
+    assert_links_consistent(soup)
+
+def test_replaced_string_is_detached():
+    soup = BeautifulSoup('<p>前<b>中</b>后</p>', 'html.parser')
+    old = soup.p.contents[0]
+    replace_nodes([(old, '新')])
+    assert old.parent is None
+    assert old.next_element is None and old.previous_element is None
+    assert old.next_sibling is None and old.previous_sibling is None
+    assert soup.p.contents[0] == '新'
+    assert_links_consistent(soup)
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__, '-q']))
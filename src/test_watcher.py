@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+文件监视测试
+直接调用DocumentWatcher的轮询、提交和转换步骤，验证防抖、图片依赖、过期结果丢弃和删除源文件后的清理
+"""
+
+import os
+import sys
+import copy
+import time
+import logging
+
+import pytest
+
+# 添加当前目录到系统路径，以便导入当前目录的模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+
+from src.config import Config
+from src.modules.converter import Converter
+from src.modules.watcher import DocumentWatcher
+
+DEBOUNCE = 0.2
+
+@pytest.fixture(autouse=True)
+def quiet_logging():
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+@pytest.fixture
+def tree(tmp_path):
+    """
+    创建输入目录、输出目录和已记录初始签名的监视器
+    """
+    input_dir = tmp_path / 'docs'
+    output_dir = tmp_path / 'out'
+    input_dir.mkdir()
+    output_dir.mkdir()
+    (input_dir / 'a.md').write_text('# 甲\n\n![图](img.png)\n', encoding='utf-8')
+    (input_dir / 'b.md').write_text('# 乙\n', encoding='utf-8')
+    (input_dir / 'img.png').write_bytes(b'not an image')
+
+    config = copy.deepcopy(Config().config)
+    config['image_cache']['enabled'] = False
+    config['debug']['timing'] = False
+    config['document']['generate_toc'] = False
+    watcher = DocumentWatcher(Converter(config), str(input_dir), str(output_dir), interval=0, debounce=DEBOUNCE)
+    watcher._scan(record_only=True)
+    return watcher, input_dir, output_dir
+
+def modify(path, text=None):
+    """
+    修改文件内容并推后修改时间，保证签名变化
+    """
+    if text is not None:
+        path.write_text(text, encoding='utf-8')
+    else:
+        path.write_bytes(path.read_bytes() + b'!')
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+def submitted(watcher):
+    """
+    取出已提交给转换线程的文档
+    """
+    paths = []
+    while not watcher._queue.empty():
+        paths.append(watcher._queue.get_nowait())
+    return sorted(os.path.basename(path) for path in paths)
+
+def test_changes_are_submitted_after_debounce(tree):
+    watcher, input_dir, _ = tree
+    modify(input_dir / 'b.md', '# 乙\n\n新段落\n')
+    watcher._scan()
+    watcher._submit_ready()
+    assert submitted(watcher) == []
+
+    time.sleep(DEBOUNCE / 2)
+    # 防抖期间再次修改，重新计时
+    modify(input_dir / 'b.md', '# 乙\n\n再次修改\n')
+    watcher._scan()
+    time.sleep(DEBOUNCE / 2 + 0.05)
+    watcher._submit_ready()
+    assert submitted(watcher) == []
+
+    time.sleep(DEBOUNCE / 2)
+    watcher._scan()
+    watcher._submit_ready()
+    assert submitted(watcher) == ['b.md']
+
+def test_image_change_reconverts_referencing_documents(tree):
+    watcher, input_dir, output_dir = tree
+    modify(input_dir / 'img.png')
+    watcher._scan()
+    time.sleep(DEBOUNCE)
+    watcher._submit_ready()
+    assert submitted(watcher) == ['a.md']
+
+    watcher._convert(str(input_dir / 'a.md'))
+    assert watcher.converted == 1
+    assert (output_dir / 'a.docx').is_file()
+    assert not (output_dir / 'b.docx').exists()
+    assert 'a.md' in watcher.manifest.entries
+
+def test_superseded_result_is_discarded(tree, monkeypatch):
+    watcher, input_dir, output_dir = tree
+    source = input_dir / 'b.md'
+    convert_file = watcher.converter.convert_file
+
+    def convert_and_modify(*args, **kwargs):
+        # 转换期间源文件再次修改
+        result = convert_file(*args, **kwargs)
+        modify(source, '# 乙\n\n转换期间修改\n')
+        watcher._scan()
+        return result
+
+    monkeypatch.setattr(watcher.converter, 'convert_file', convert_and_modify)
+    watcher._convert(str(source))
+    assert watcher.cancelled == 1
+    assert watcher.converted == 0
+    assert not (output_dir / 'b.docx').exists()
+    assert 'b.md' not in watcher.manifest.entries
+
+    # 文件稳定后转换最新内容
+    monkeypatch.setattr(watcher.converter, 'convert_file', convert_file)
+    time.sleep(DEBOUNCE)
+    watcher._submit_ready()
+    assert submitted(watcher) == ['b.md']
+    watcher._convert(str(source))
+    assert watcher.converted == 1
+    assert '轉換期間修改' in [p.text for p in Document(str(output_dir / 'b.docx')).paragraphs]
+
+def test_deleted_source_removes_output(tree):
+    watcher, input_dir, output_dir = tree
+    source = input_dir / 'b.md'
+    watcher._convert(str(source))
+    assert (output_dir / 'b.docx').is_file()
+    assert 'b.md' in watcher.manifest.entries
+
+    source.unlink()
+    watcher._scan()
+    time.sleep(DEBOUNCE)
+    watcher._submit_ready()
+    assert submitted(watcher) == ['b.md']
+    watcher._convert(str(source))
+    assert not (output_dir / 'b.docx').exists()
+    assert 'b.md' not in watcher.manifest.entries
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__, '-q']))